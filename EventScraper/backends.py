@@ -0,0 +1,130 @@
+"""
+Rendering backends for RenderMiddleware.
+
+A backend turns a URL and a recipe name ("listing", "event") into rendered
+HTML. RENDER_BACKEND picks the implementation by import path:
+
+- `EventScraper.backends.SeleniumBackend` (default): the recipes in
+  EventScraper.rendering run on a pool of Chrome drivers in the reactor's
+  thread pool, one page per driver at a time.
+- `EventScraper.playwright_backend.PlaywrightBackend`: asyncio recipes
+  running many pages concurrently in a single Playwright browser context.
+  Needs the `playwright` package and Scrapy's asyncio reactor.
+"""
+
+import logging
+
+from scrapy.utils.defer import maybe_deferred_to_future
+from selenium.common.exceptions import WebDriverException
+from twisted.internet import threads
+from urllib3.exceptions import HTTPError
+
+from EventScraper.driver_pool import DriverPool
+from EventScraper.provisioning import ChromeProvisioner, build_chrome_options
+from EventScraper.rendering import (
+    RENDERERS,
+    WaitProfiler,
+    block_resources,
+    blocked_url_patterns,
+    transferred_bytes,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenderResult:
+    """Rendered page source plus what the recipe extracted and measured"""
+
+    def __init__(self, page_source, extracted, waits, transferred=0):
+        self.page_source = page_source
+        self.extracted = extracted
+        self.waits = waits
+        self.transferred = transferred
+
+
+class RenderBackend:
+    """
+    Interface for rendering backends.
+
+    `render()` is a coroutine returning a RenderResult. `recipes` names the
+    recipes the backend knows, and `concurrency` is how many pages it
+    renders at once. `transient_errors` are the exceptions worth retrying a
+    render for (timeouts, a crashed browser); anything else is a bug.
+    """
+
+    recipes = ()
+    concurrency = 1
+    transient_errors = (TimeoutError,)
+    # Browsers replaced after crashing or failing a health check
+    restarts = 0
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.blocked_patterns = {
+            profile: blocked_url_patterns(groups)
+            for profile, groups in settings.getdict("RENDER_BLOCKED_RESOURCES").items()
+        }
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings)
+
+    async def render(self, recipe, url, profile):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class SeleniumBackend(RenderBackend):
+    """Sync recipes on a DriverPool, run in the reactor thread pool"""
+
+    recipes = tuple(RENDERERS)
+    # WebDriverException covers page load timeouts and crashed tabs; urllib3
+    # and connection errors mean chromedriver itself went away
+    transient_errors = (WebDriverException, HTTPError, ConnectionError, TimeoutError)
+
+    def __init__(self, settings, pool):
+        super().__init__(settings)
+        self.pool = pool
+        self.concurrency = pool.size
+
+    @property
+    def restarts(self):
+        return self.pool.restarts
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        chrome_options = build_chrome_options(
+            page_load_strategy=settings.get("RENDER_PAGE_LOAD_STRATEGY", "normal"),
+            disable_images=settings.getbool("RENDER_DISABLE_IMAGES"),
+        )
+        provisioner = ChromeProvisioner.from_settings(settings, chrome_options)
+        size = settings.getint("SELENIUM_POOL_SIZE", 1)
+        if provisioner.debugger_address and size > 1:
+            # Every driver would drive the same browser
+            logger.warning(f"Attaching to Chrome at {provisioner.debugger_address}, using a single driver")
+            size = 1
+        pool = DriverPool(
+            size=size,
+            max_pages_per_driver=settings.getint("SELENIUM_MAX_PAGES_PER_DRIVER", 0),
+            driver_factory=provisioner,
+        )
+        return cls(settings, pool)
+
+    async def render(self, recipe, url, profile):
+        return await maybe_deferred_to_future(
+            threads.deferToThread(self._render, RENDERERS[recipe], url, self.blocked_patterns.get(profile, []))
+        )
+
+    def _render(self, render, url, blocked):
+        with self.pool.driver() as driver:
+            block_resources(driver, blocked)
+            waits = WaitProfiler.from_settings(driver, self.settings)
+            page_source, extracted = render(driver, url, waits)
+            return RenderResult(page_source, extracted, waits, transferred_bytes(driver))
+
+    async def close(self):
+        self.pool.close()
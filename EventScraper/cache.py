@@ -0,0 +1,132 @@
+"""
+Persistent cache of scraped events for incremental crawls.
+
+Most events on the listing pages are unchanged from one daily run to the
+next, so every event the spider scrapes is stored in a local SQLite database
+keyed on its registration URL, together with a content fingerprint, when it
+was last scraped and when it was last seen on a listing. On the next run an
+event scraped within the TTL is replayed from the cache instead of being
+rendered again. Events are also stored with a fingerprint of their listing
+card, so an event whose card is unchanged since its page was last rendered
+can be replayed without rendering it again, within the same TTL.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+EVENT_FIELDS = ('event_name', 'date', 'time', 'location', 'registration_url')
+
+
+def _digest(values):
+    payload = json.dumps(values, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def fingerprint(event):
+    """Stable hash of an event's scraped fields"""
+    return _digest([event.get(field, '') for field in EVENT_FIELDS])
+
+
+def card_fingerprint(card):
+    """Stable hash of a listing card's title and text"""
+    return _digest([card.get('title', ''), card.get('lines') or []])
+
+
+class EventCache:
+    """SQLite-backed store of events keyed by registration URL"""
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Sharded runs share the cache between processes; wait out their writes
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                registration_url TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                item TEXT NOT NULL,
+                scraped_at REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                card_fingerprint TEXT
+            )
+            """
+        )
+        # Caches restored from before card fingerprints were stored
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(events)")}
+        if 'card_fingerprint' not in columns:
+            self.db.execute("ALTER TABLE events ADD COLUMN card_fingerprint TEXT")
+        self.db.commit()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get("EVENT_CACHE_PATH", ".cache/events.sqlite3"),
+            settings.getfloat("EVENT_CACHE_TTL", 3 * 24 * 3600),
+        )
+
+    def get_fresh(self, url, now=None):
+        """
+        Return the cached event for `url` if it was scraped within the TTL,
+        marking it as seen; otherwise None.
+        """
+        now = time.time() if now is None else now
+        row = self.db.execute(
+            "SELECT item, scraped_at FROM events WHERE registration_url = ?", (url,)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl:
+            return None
+        self.db.execute("UPDATE events SET last_seen = ? WHERE registration_url = ?", (now, url))
+        self.db.commit()
+        return json.loads(row[0])
+
+    def get_unchanged(self, url, card_fingerprint, now=None):
+        """
+        Return the cached event for `url` if it was stored with the same card
+        fingerprint and scraped within the TTL, marking it as seen; otherwise
+        None. An unchanged card does not mean the page behind it is unchanged,
+        so the TTL still bounds how long an event is replayed.
+        """
+        now = time.time() if now is None else now
+        row = self.db.execute(
+            "SELECT item, card_fingerprint, scraped_at FROM events WHERE registration_url = ?", (url,)
+        ).fetchone()
+        if row is None or row[1] != card_fingerprint or now - row[2] > self.ttl:
+            return None
+        self.db.execute("UPDATE events SET last_seen = ? WHERE registration_url = ?", (now, url))
+        self.db.commit()
+        return json.loads(row[0])
+
+    def store(self, event, now=None, card_fingerprint=None):
+        """Insert or refresh a freshly scraped event; returns True if its content changed"""
+        now = time.time() if now is None else now
+        url = event['registration_url']
+        new_fingerprint = fingerprint(event)
+        row = self.db.execute(
+            "SELECT fingerprint FROM events WHERE registration_url = ?", (url,)
+        ).fetchone()
+        self.db.execute(
+            """
+            INSERT INTO events (registration_url, fingerprint, item, scraped_at, last_seen, card_fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (registration_url) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                item = excluded.item,
+                scraped_at = excluded.scraped_at,
+                last_seen = excluded.last_seen,
+                card_fingerprint = excluded.card_fingerprint
+            """,
+            (url, new_fingerprint, json.dumps(dict(event), ensure_ascii=False), now, now, card_fingerprint),
+        )
+        self.db.commit()
+        return row is None or row[0] != new_fingerprint
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,131 @@
+"""
+Checkpoint of an in-progress crawl, so an interrupted run can be resumed.
+
+While the spider runs, every listing it has finished parsing, every event
+page it has requested and every event it has scraped is written to a local
+SQLite file. If the run dies (a driver crash, a timeout, a killed worker),
+the next run of the same crawl (the same start URLs and fetch mode) started
+within CRAWL_CHECKPOINT_MAX_AGE picks the file up:
+scraped events are replayed from it, finished listings are not requested
+again, and only event pages that never completed are requested. A crawl
+that finishes cleanly deletes its checkpoint.
+
+Unlike the event cache, which outlives runs and replays events by TTL, the
+checkpoint only ever holds the state of one crawl.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+def crawl_fingerprint(start_urls, mode):
+    """Identifies a crawl by what it crawls, so a checkpoint is only resumed by the same crawl"""
+    payload = json.dumps({"start_urls": list(start_urls), "mode": mode})
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CrawlCheckpoint:
+    """SQLite-backed frontier and results of a single crawl"""
+
+    def __init__(self, path, max_age, crawl=''):
+        self.path = path
+        self.max_age = max_age
+        self.crawl = crawl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoint (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS listings (url TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS events (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                meta TEXT NOT NULL,
+                item TEXT
+            );
+            """
+        )
+        state = dict(self.db.execute("SELECT key, value FROM checkpoint"))
+        if 'started_at' in state and time.time() - float(state['started_at']) > max_age:
+            # Left over from an older run, resuming it would replay stale events
+            self._reset()
+        elif state.get('crawl', '') != crawl:
+            # Left over from a crawl of other listings (or in another mode), whose
+            # events and pages don't belong in this one
+            self._reset()
+        self.db.executemany(
+            "INSERT OR IGNORE INTO checkpoint (key, value) VALUES (?, ?)",
+            [('started_at', str(time.time())), ('crawl', crawl)],
+        )
+        self.db.commit()
+
+    @classmethod
+    def from_settings(cls, settings, crawl=''):
+        return cls(
+            settings.get("CRAWL_CHECKPOINT_PATH", ".cache/checkpoint.sqlite3"),
+            settings.getfloat("CRAWL_CHECKPOINT_MAX_AGE", 6 * 3600),
+            crawl,
+        )
+
+    @property
+    def resumed(self):
+        """True if the checkpoint holds progress from an earlier, interrupted run"""
+        return self.db.execute("SELECT 1 FROM listings UNION ALL SELECT 1 FROM events LIMIT 1").fetchone() is not None
+
+    def listing_done(self, url):
+        """Record that a listing was parsed and all of its events were requested or scraped"""
+        self.db.execute("INSERT OR IGNORE INTO listings (url) VALUES (?)", (url,))
+        self.db.commit()
+
+    def is_listing_done(self, url):
+        return self.db.execute("SELECT 1 FROM listings WHERE url = ?", (url,)).fetchone() is not None
+
+    def add_request(self, key, url, meta=None):
+        """Record an event page request under its normalized URL `key`"""
+        self.db.execute(
+            "INSERT OR IGNORE INTO events (key, url, meta) VALUES (?, ?, ?)",
+            (key, url, json.dumps(meta or {})),
+        )
+        self.db.commit()
+
+    def complete(self, key, event):
+        """Record the event scraped for `key`, requested or not"""
+        self.db.execute(
+            """
+            INSERT INTO events (key, url, meta, item) VALUES (?, ?, '{}', ?)
+            ON CONFLICT (key) DO UPDATE SET item = excluded.item
+            """,
+            (key, event['registration_url'], json.dumps(dict(event), ensure_ascii=False)),
+        )
+        self.db.commit()
+
+    def keys(self):
+        """Normalized URLs of every event requested or scraped so far"""
+        return {row[0] for row in self.db.execute("SELECT key FROM events")}
+
+    def pending(self):
+        """(url, meta) of event pages requested but never completed"""
+        return [
+            (url, json.loads(meta))
+            for url, meta in self.db.execute("SELECT url, meta FROM events WHERE item IS NULL ORDER BY rowid")
+        ]
+
+    def completed(self):
+        """Every event scraped so far, in scrape order"""
+        return [json.loads(row[0]) for row in self.db.execute(
+            "SELECT item FROM events WHERE item IS NOT NULL ORDER BY rowid"
+        )]
+
+    def _reset(self):
+        self.db.executescript("DELETE FROM checkpoint; DELETE FROM listings; DELETE FROM events;")
+
+    def close(self, finished=False):
+        """Close the checkpoint, deleting it if the crawl finished"""
+        self.db.close()
+        if finished and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,144 @@
+"""
+Bounded pool of headless Chrome drivers.
+
+Rendering a page with Selenium is slow and blocking, so instead of sharing a
+single driver between every callback the spider hands pages out to a small
+pool of browsers. Each driver is health-checked before it is handed out and
+recycled after a fixed number of pages or as soon as it crashes.
+"""
+
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+
+from EventScraper.provisioning import ChromeProvisioner
+
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """A driver checked out of the pool, its pool slot and how many pages it has rendered"""
+
+    def __init__(self, driver, slot=0):
+        self.driver = driver
+        self.slot = slot
+        self.pages = 0
+
+    def is_healthy(self):
+        """Cheap round trip to make sure the browser is still responding"""
+        try:
+            self.driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error while quitting Chrome driver: {str(e)}")
+
+
+class DriverPool:
+    """
+    Thread-safe pool of at most `size` Chrome drivers.
+
+    Drivers are started lazily, so a pool that is never used never launches
+    a browser. `acquire()` blocks until a driver is free. Each live driver
+    holds one of `size` numbered slots, passed to `driver_factory(slot)` so
+    per-browser resources such as profile directories can be reused.
+    """
+
+    def __init__(self, size, max_pages_per_driver=0, driver_factory=None):
+        if size < 1:
+            raise ValueError(f"Driver pool size must be at least 1, got {size}")
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.driver_factory = driver_factory or ChromeProvisioner()
+        self.restarts = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._free_slots = list(range(size - 1, -1, -1))
+        self._lock = threading.Lock()
+        self._all = set()
+        self._closed = False
+
+    def acquire(self):
+        """Check out a healthy driver, starting or replacing one if needed"""
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._start()
+                if pooled.is_healthy():
+                    return pooled
+                logger.warning("Pooled Chrome driver failed health check, replacing it")
+                self._discard(pooled)
+                self.restarts += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled, crashed=False):
+        """Return a driver to the pool, recycling it if it crashed or is worn out"""
+        try:
+            pooled.pages += 1
+            worn_out = self.max_pages_per_driver and pooled.pages >= self.max_pages_per_driver
+            if crashed or worn_out or self._closed:
+                if crashed:
+                    logger.warning("Recycling Chrome driver after a crash")
+                    self.restarts += 1
+                elif worn_out:
+                    logger.info(f"Recycling Chrome driver after {pooled.pages} pages")
+                self._discard(pooled)
+            else:
+                self._idle.put(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """Context manager yielding a raw WebDriver; any exception recycles it"""
+        pooled = self.acquire()
+        try:
+            yield pooled.driver
+        except Exception:
+            self.release(pooled, crashed=True)
+            raise
+        else:
+            self.release(pooled)
+
+    def close(self):
+        """Quit every driver the pool has started"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+            self._all.clear()
+        for pooled in drivers:
+            pooled.quit()
+        if drivers:
+            logger.info(f"Closed {len(drivers)} Chrome driver(s)")
+
+    def _start(self):
+        with self._lock:
+            slot = self._free_slots.pop()
+        try:
+            pooled = PooledDriver(self.driver_factory(slot), slot)
+        except Exception:
+            with self._lock:
+                self._free_slots.append(slot)
+            raise
+        with self._lock:
+            self._all.add(pooled)
+        return pooled
+
+    def _discard(self, pooled):
+        pooled.quit()
+        with self._lock:
+            if pooled in self._all:
+                self._all.discard(pooled)
+                self._free_slots.append(pooled.slot)
@@ -0,0 +1,134 @@
+"""
+Crawl instrumentation.
+
+CrawlReport collects, for every response, where its time went: the render
+stages recorded by RenderMiddleware (navigation, load_wait, scrolling,
+extraction), the waits inside them, the pages a listing loaded while
+scrolling, the time spent in the spider callback (measured by
+ParseTimingMiddleware), page sizes, and the items and requests it produced.
+At the end of the run it writes everything, with totals per stage and the
+crawler stats, to a JSON report (CRAWL_REPORT_PATH) that can be diffed
+between runs.
+"""
+
+import datetime
+import json
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+# Sent by ParseTimingMiddleware once a callback's output is exhausted
+response_parsed = object()
+
+REPORT_VERSION = 1
+
+
+def _json_safe(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, float):
+        return round(value, 3)
+    return value
+
+
+class CrawlReport:
+    """Per-URL timing and volume records, written as JSON when the spider closes"""
+
+    def __init__(self, path, stats):
+        self.path = path
+        self.stats = stats
+        self.records = []
+        self.started = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("CRAWL_REPORT_PATH")
+        if not path:
+            raise NotConfigured("CRAWL_REPORT_PATH is not set")
+        ext = cls(path, crawler.stats)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_dropped, signal=signals.item_dropped)
+        crawler.signals.connect(ext.response_parsed, signal=response_parsed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+
+    def response_received(self, response, request, spider):
+        meta = request.meta
+        record = {
+            "url": response.url,
+            "recipe": meta.get("render"),
+            "status": response.status,
+            "stages": dict(meta.get("render_stages") or {}),
+            "listing_scroll": meta.get("listing_scroll"),
+            "wait_seconds": round(sum(w["seconds"] for w in meta.get("render_waits") or []), 3),
+            "wait_timeouts": sum(1 for w in meta.get("render_waits") or [] if not w["met"]),
+            "render_retries": meta.get("render_retries", 0),
+            "page_bytes": meta.get("render_page_bytes", len(response.body)),
+            "transferred_bytes": meta.get("render_transferred_bytes"),
+            "download_latency": _json_safe(meta.get("download_latency")),
+            "parse_seconds": 0.0,
+            "items": 0,
+            "requests": 0,
+            "items_dropped": 0,
+        }
+        meta["crawl_report"] = record
+        self.records.append(record)
+
+    def response_parsed(self, response, seconds, items, requests):
+        record = response.meta.get("crawl_report")
+        if record is not None:
+            record["parse_seconds"] = round(record["parse_seconds"] + seconds, 4)
+            record["items"] += items
+            record["requests"] += requests
+
+    def item_dropped(self, item, response, exception, spider):
+        record = response.meta.get("crawl_report") if response is not None else None
+        if record is not None:
+            record["items_dropped"] += 1
+
+    def spider_closed(self, spider, reason):
+        report = {
+            "version": REPORT_VERSION,
+            "spider": spider.name,
+            "finish_reason": reason,
+            "elapsed_seconds": round(time.monotonic() - self.started, 3) if self.started else None,
+            "totals": self._totals(),
+            "stats": {key: _json_safe(value) for key, value in sorted(self.stats.get_stats().items())},
+            "urls": self.records,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        spider.logger.info(f"Wrote crawl report for {len(self.records)} responses to {self.path}")
+
+    def _totals(self):
+        totals = {
+            "responses": len(self.records),
+            "stages": {},
+            "wait_seconds": 0.0,
+            "parse_seconds": 0.0,
+            "page_bytes": 0,
+            "transferred_bytes": 0,
+            "items": 0,
+            "items_dropped": 0,
+            "requests": 0,
+            "driver_restarts": self.stats.get_value("render/driver_restarts", 0),
+            "render_retries": self.stats.get_value("render/retries", 0),
+            "render_failures": sum(
+                value for key, value in self.stats.get_stats().items()
+                if key.startswith("render/") and key.endswith("/failed")
+            ),
+        }
+        for record in self.records:
+            for stage, seconds in record["stages"].items():
+                totals["stages"][stage] = round(totals["stages"].get(stage, 0) + seconds, 3)
+            for key in ("wait_seconds", "parse_seconds", "page_bytes", "items", "items_dropped", "requests"):
+                totals[key] += record[key]
+            totals["transferred_bytes"] += record["transferred_bytes"] or 0
+        totals["wait_seconds"] = round(totals["wait_seconds"], 3)
+        totals["parse_seconds"] = round(totals["parse_seconds"], 4)
+        return totals
@@ -0,0 +1,271 @@
+"""
+Browser-free extraction of event data from the initial HTML of a page.
+
+aws-experience.com pages are rendered client-side, but the HTML the server
+sends already embeds the data the client renders from: event links inside
+hydration state (`__NEXT_DATA__`, `window.__INITIAL_STATE__` and similar) and
+schema.org `Event` objects in `application/ld+json` blocks. These helpers read
+that data with plain string/JSON parsing so the spider's HTTP mode can skip
+Chrome entirely, and operate on raw HTML so they can be run against recorded
+fixture pages.
+
+The event banner of a rendered page is read by `extract_event_details`, with
+XPath expressions compiled once at import.
+"""
+
+import datetime
+import json
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from lxml import etree
+from parsel import Selector
+
+from EventScraper.regions import is_known_location
+from excel_convert import DATE_RE, OFFSET_RE, TIME_RANGE_RE
+
+
+# Event links, also when JSON-escaped as "\/apj\/smb\/e\/..."
+EVENT_PATH_RE = re.compile(r'(?:https?:(?:\\?/){2}[\w.-]+)?(?:\\?/)apj(?:\\?/)smb(?:\\?/)e(?:\\?/)[^"\'\s<>?#\\]+')
+
+# Locale path segments such as "en", "en-US" or "zh_tw"
+LOCALE_SEGMENT_RE = re.compile(r'^[a-z]{2}(?:[-_][a-z]{2,4})?$', re.IGNORECASE)
+
+SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+
+# window.__INITIAL_STATE__ = {...}; and friends
+STATE_ASSIGNMENT_RE = re.compile(r'window\.(__[A-Z_]+__)\s*=\s*')
+
+# Every node extract_event_details reads, in document order: headings, and
+# inside banner entries, each entry heading and the value container after it
+EVENT_DETAILS_XPATH = etree.XPath(
+    '//h1 | //div[contains(@class, "BannerInformationEntry")]/descendant::*['
+    'self::span[contains(@class, "BannerInformationEntryHeading")]'
+    ' or self::div[contains(@class, "BannerInformationEntryValueContainer")]]'
+)
+
+def extract_event_links(html, base_url):
+    """Return the absolute URLs of every event linked from `html`"""
+    links = set()
+    for match in EVENT_PATH_RE.finditer(html):
+        links.add(urljoin(base_url, match.group(0).replace('\\/', '/')))
+    return links
+
+
+def normalize_event_url(url):
+    """
+    Canonical form of an event URL, for spotting the same event linked from
+    several listings: lowercase scheme and host, no query string, fragment
+    or trailing slash, and no locale segments before the `/e/` part of the
+    path (`/en-au/apj/smb/e/x/?ref=nz` -> `/apj/smb/e/x`).
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    event_index = segments.index('e') if 'e' in segments else len(segments)
+    segments = [
+        segment for i, segment in enumerate(segments)
+        if i >= event_index or not LOCALE_SEGMENT_RE.match(segment)
+    ]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), '/' + '/'.join(segments), '', ''))
+
+
+def iter_embedded_json(html):
+    """Yield every JSON document embedded in the page's script tags"""
+    for attrs, body in SCRIPT_RE.findall(html):
+        body = body.strip()
+        if not body:
+            continue
+        if 'application/ld+json' in attrs or 'application/json' in attrs:
+            try:
+                yield json.loads(body)
+            except ValueError:
+                continue
+            continue
+        for match in STATE_ASSIGNMENT_RE.finditer(body):
+            try:
+                value, _ = json.JSONDecoder().raw_decode(body, match.end())
+            except ValueError:
+                continue
+            yield value
+
+
+def iter_objects(data):
+    """Depth-first walk over every dict nested in a JSON document"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _ordinal(day):
+    if 11 <= day % 100 <= 13:
+        return f"{day}th"
+    return f"{day}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th') }"
+
+
+def _format_offset(dt):
+    """'GMT+13' / 'GMT+5:30' / 'UTC' for an aware datetime"""
+    offset = dt.utcoffset()
+    if not offset:
+        return "UTC"
+    minutes = int(offset.total_seconds() // 60)
+    sign = '+' if minutes >= 0 else '-'
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"GMT{sign}{hours}" + (f":{minutes:02d}" if minutes else "")
+
+
+def format_event_datetimes(start, end=None):
+    """
+    Render ISO start/end timestamps the way event pages display them, e.g.
+    ('Tuesday 24th February 2026', '12:00 - 16:00 GMT+13'), so downstream
+    date parsing and time zone conversion treat both sources the same.
+    """
+    start_dt = datetime.datetime.fromisoformat(start)
+    end_dt = datetime.datetime.fromisoformat(end) if end else None
+
+    def day(dt):
+        return f"{dt.strftime('%A')} {_ordinal(dt.day)} {dt.strftime('%B %Y')}"
+
+    date = day(start_dt)
+    if end_dt and end_dt.date() != start_dt.date():
+        date = f"{date} - {day(end_dt)}"
+
+    time_str = start_dt.strftime('%H:%M')
+    if end_dt:
+        time_str = f"{time_str} - {end_dt.strftime('%H:%M')}"
+    if start_dt.tzinfo:
+        time_str = f"{time_str} {_format_offset(start_dt)}"
+    return date, time_str
+
+
+def _format_location(location):
+    """Flatten a schema.org location into the 'Country - address' page format"""
+    if isinstance(location, list):
+        location = location[0] if location else None
+    if isinstance(location, str):
+        return location
+    if not isinstance(location, dict):
+        return ''
+    if location.get('@type') == 'VirtualLocation':
+        return 'Online'
+
+    address = location.get('address') or {}
+    if isinstance(address, str):
+        return ' - '.join(part for part in (location.get('name'), address) if part)
+
+    country = address.get('addressCountry')
+    if isinstance(country, dict):
+        country = country.get('name')
+    parts = [location.get('name'), address.get('streetAddress'), address.get('addressLocality')]
+    place = ', '.join(part for part in parts if part)
+    return ' - '.join(part for part in (country, place) if part)
+
+
+def extract_event_from_json(html, url):
+    """
+    Build an event dict from a schema.org Event embedded in `html`.
+
+    Returns None if the page carries no usable event data, so callers can
+    fall back to rendering the page.
+    """
+    for document in iter_embedded_json(html):
+        for obj in iter_objects(document):
+            event_type = obj.get('@type')
+            if event_type != 'Event' and not (isinstance(event_type, list) and 'Event' in event_type):
+                continue
+            name = obj.get('name')
+            if not name or not obj.get('startDate'):
+                continue
+            try:
+                date, time_str = format_event_datetimes(obj['startDate'], obj.get('endDate'))
+            except ValueError:
+                date, time_str = '', ''
+            return {
+                'event_name': name.strip(),
+                'date': date,
+                'time': time_str,
+                'location': _format_location(obj.get('location')),
+                'registration_url': url,
+            }
+    return None
+
+
+def _own_text(element):
+    """First non-blank text node directly inside `element`"""
+    for text in [element.text] + [child.tail for child in element]:
+        if text and text.strip():
+            return text.strip()
+    return ''
+
+
+def extract_event_details(source, url):
+    """
+    Name, date, time and location from an event page's banner.
+
+    `source` is HTML (a whole page, or just the fragment the event recipe
+    cuts out) or an already parsed Selector. All heading and value nodes are
+    fetched with one precompiled XPath query and paired up in document
+    order. Missing fields are left empty.
+    """
+    if isinstance(source, str):
+        source = Selector(text=source)
+    event = {
+        'event_name': '',
+        'date': '',
+        'time': '',
+        'location': '',
+        'registration_url': url,
+    }
+    heading = None
+    for node in EVENT_DETAILS_XPATH(source.root):
+        if node.tag == 'h1':
+            if not event['event_name']:
+                event['event_name'] = _own_text(node)
+        elif node.tag == 'span':
+            heading = _own_text(node)
+        elif heading:
+            value = ' '.join(t.strip() for t in node.itertext() if t.strip())
+            if value:
+                if 'Location' in heading:
+                    event['location'] = value
+                elif 'Date' in heading:
+                    event['date'] = value
+                elif 'Time' in heading:
+                    event['time'] = value
+            heading = None
+    return event
+
+
+def extract_card_fields(card):
+    """
+    Event fields found on a listing card collected by the listing recipe;
+    fields missing from the card are left empty.
+
+    Card lines are only accepted in the formats the event banner uses, so
+    date parsing and time zone conversion work on them unchanged. A line is
+    only taken as the location if it is an online location or starts with a
+    known country; otherwise the location stays empty and the event page is
+    rendered for it. The spider takes the event straight from the card only
+    when every field was found.
+    """
+    event = {
+        'event_name': (card.get('title') or '').strip(),
+        'date': '',
+        'time': '',
+        'location': '',
+        'registration_url': card['url'],
+    }
+    for line in card.get('lines') or []:
+        if line == event['event_name']:
+            continue
+        if not event['time'] and TIME_RANGE_RE.search(line) and OFFSET_RE.search(line):
+            event['time'] = line
+        elif not event['date'] and DATE_RE.search(line):
+            event['date'] = line
+        elif not event['location'] and is_known_location(line):
+            event['location'] = line
+    return event
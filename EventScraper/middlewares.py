@@ -3,11 +3,21 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-from scrapy import signals
+import time
+
+from scrapy import Request, signals
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from scrapy.utils.misc import load_object
+from twisted.internet.defer import DeferredSemaphore
+from twisted.internet.task import deferLater
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from EventScraper.extensions import response_parsed
+
 
 class EventscraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -53,48 +63,198 @@ class EventscraperSpiderMiddleware:
         spider.logger.info("Spider opened: %s" % spider.name)
 
 
-class EventscraperDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+class ParseTimingMiddleware:
+    """
+    Spider middleware timing each callback. Only the time spent producing
+    output counts, not what later middlewares and pipelines do with it; the
+    total and the number of items and requests produced are sent with the
+    `response_parsed` signal once the callback is exhausted.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider):
+        seconds = 0.0
+        items = requests = 0
+        output = iter(result)
+        while True:
+            start = time.perf_counter()
+            try:
+                value = next(output)
+            except StopIteration:
+                seconds += time.perf_counter() - start
+                break
+            seconds += time.perf_counter() - start
+            if isinstance(value, Request):
+                requests += 1
+            else:
+                items += 1
+            yield value
+        self.crawler.stats.inc_value("parse/seconds", seconds)
+        self.crawler.signals.send_catch_log(
+            signal=response_parsed, response=response, seconds=seconds, items=items, requests=requests
+        )
+
+
+class RenderMiddleware:
+    """
+    Downloader middleware that renders JavaScript pages in a browser.
+
+    Requests carrying `meta={"render": "<recipe>"}` are never downloaded by
+    Scrapy. Instead the rendering backend chosen by RENDER_BACKEND (see
+    EventScraper.backends) runs the matching recipe, and the rendered DOM
+    comes back as an HtmlResponse, with anything the recipe extracted in the
+    browser (such as the listing's event cards) added to its meta, so spider
+    callbacks only parse. Requests without the flag pass through untouched.
+
+    Before each page the resource groups listed for its render profile in
+    RENDER_BLOCKED_RESOURCES are blocked. The profile is the recipe name
+    unless the request sets `meta["render_profile"]`. The time from spider
+    start to the first rendered page is recorded as the
+    `render/time_to_first_page` stat.
+
+    A render that fails with one of the backend's `transient_errors` (a page
+    load timeout, a crashed browser, which the backend replaces) is retried
+    up to `max_retries` times with exponential backoff, starting at
+    `retry_backoff` seconds. Retries are counted in the `render/retries`
+    stats; a page that still fails is given up on and its error passed on to
+    Scrapy. Any other error is a bug, not bad luck, and is passed on at once.
+
+    Rendered requests never reach Scrapy's downloader slots, so neither
+    CONCURRENT_REQUESTS_PER_DOMAIN nor DOWNLOAD_DELAY applies to them. The
+    middleware enforces both itself: at most `backend.concurrency` pages
+    render at once, and renders start at least `render_delay` seconds apart.
+    """
+
+    def __init__(self, backend, stats, max_retries=2, retry_backoff=2, render_delay=0):
+        self.backend = backend
+        self.stats = stats
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.render_delay = render_delay
+        self.slots = DeferredSemaphore(backend.concurrency)
+        self.next_start = 0.0
+        self.opened_at = None
+        self.first_page_seen = False
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        settings = crawler.settings
+        backend_cls = load_object(settings.get("RENDER_BACKEND", "EventScraper.backends.SeleniumBackend"))
+        s = cls(
+            backend_cls.from_crawler(crawler),
+            crawler.stats,
+            max_retries=settings.getint("RENDER_MAX_RETRIES", 2),
+            retry_backoff=settings.getfloat("RENDER_RETRY_BACKOFF", 2),
+            render_delay=settings.getfloat("DOWNLOAD_DELAY", 0),
+        )
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
-    def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
+    async def process_request(self, request, spider):
+        recipe = request.meta.get("render")
+        if not recipe:
+            return None
+        if recipe not in self.backend.recipes:
+            raise IgnoreRequest(f"Unknown render recipe {recipe!r} for {request.url}")
 
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
-        return None
+        result = await self._render_with_retries(request, recipe, spider)
+        request.meta.update(result.extracted)
+        if not self.first_page_seen:
+            self.first_page_seen = True
+            self._record_first_page(request, spider)
+        self._record_waits(request, recipe, result.waits, spider)
+        self._record_render(request, recipe, result)
+        return HtmlResponse(
+            url=request.url,
+            body=result.page_source,
+            encoding="utf-8",
+            request=request,
+        )
 
-    def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
+    async def _render_with_retries(self, request, recipe, spider):
+        profile = request.meta.get("render_profile", recipe)
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await self._render(recipe, request.url, profile)
+            except self.backend.transient_errors as e:
+                reason = type(e).__name__
+                self.stats.set_value("render/driver_restarts", self.backend.restarts)
+                if attempt == self.max_retries:
+                    spider.logger.error(f"Giving up rendering {request.url} after {attempt + 1} attempts: {reason}")
+                    self.stats.inc_value(f"render/{recipe}/failed")
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                spider.logger.warning(
+                    f"Rendering {request.url} failed ({reason}: {str(e).strip()[:200]}), retrying in {delay:g}s"
+                )
+                self.stats.inc_value("render/retries")
+                self.stats.inc_value(f"render/{recipe}/retries")
+                self.stats.inc_value(f"render/retry_reason/{reason}")
+                await self._sleep(delay)
+            else:
+                request.meta["render_retries"] = attempt
+                return result
 
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
-        return response
+    async def _render(self, recipe, url, profile):
+        """Render one page once a backend slot is free and the delay since the last start has passed"""
+        await maybe_deferred_to_future(self.slots.acquire())
+        try:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.render_delay
+            if start > now:
+                await self._sleep(start - now)
+            return await self.backend.render(recipe, url, profile)
+        finally:
+            self.slots.release()
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
+    async def _sleep(self, seconds):
+        # Imported here so importing this module does not install a reactor
+        from twisted.internet import reactor
 
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
+        await maybe_deferred_to_future(deferLater(reactor, seconds, lambda: None))
+
+    def _record_first_page(self, request, spider):
+        """Time from spider start to the first rendered page, browser startup included"""
+        seconds = round(time.monotonic() - self.opened_at, 3)
+        spider.logger.info(f"First page rendered {seconds:.2f}s after start: {request.url}")
+        self.stats.set_value("render/time_to_first_page", seconds)
+
+    def _record_waits(self, request, recipe, waits, spider):
+        """Expose how long each wait took versus its cap, per page and in aggregate"""
+        request.meta["render_waits"] = waits.waits
+        spider.logger.info(f"Waited {waits.total:.2f}s on {request.url}: {waits.summary()}")
+        self.stats.inc_value(f"render/{recipe}/pages")
+        self.stats.inc_value(f"render/{recipe}/wait_seconds", waits.total)
+        self.stats.max_value(f"render/{recipe}/max_wait_seconds", waits.total)
+        for wait in waits.waits:
+            if not wait["met"]:
+                self.stats.inc_value(f"render/{recipe}/wait_timeouts")
+
+    def _record_render(self, request, recipe, result):
+        """Per-page stage timings and sizes, read by the crawl report"""
+        request.meta["render_stages"] = result.waits.stages
+        request.meta["render_page_bytes"] = len(result.page_source.encode("utf-8"))
+        request.meta["render_transferred_bytes"] = result.transferred
+        self.stats.inc_value(f"render/{recipe}/transferred_bytes", result.transferred)
+        self.stats.inc_value(f"render/{recipe}/page_bytes", request.meta["render_page_bytes"])
+        for stage, seconds in result.waits.stages.items():
+            self.stats.inc_value(f"render/{recipe}/{stage}_seconds", seconds)
+        self.stats.set_value("render/driver_restarts", self.backend.restarts)
 
     def spider_opened(self, spider):
-        spider.logger.info("Spider opened: %s" % spider.name)
+        self.opened_at = time.monotonic()
+        spider.logger.info(
+            f"Rendering with {type(self.backend).__name__}, up to {self.backend.concurrency} page(s) at once"
+        )
+
+    def spider_closed(self, spider):
+        return deferred_from_coro(self.backend.close())
@@ -3,11 +3,108 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import json
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from scrapy.exceptions import DropItem
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from EventScraper.regions import is_wanted_location
+from excel_convert import convert_time_to_nz, hyperlink_cell
+
+
+# Streamed workbook layout: (item field, header, column width). A write-only
+# sheet needs its column widths before the first row, so they are fixed here.
+STREAM_COLUMNS = [
+    ('event_name', 'Event Name', 50),
+    ('date', 'Date', 30),
+    ('time', 'Time', 20),
+    ('location', 'Location', 50),
+    ('registration_url', 'Event Link', 15),
+]
+
+
+def event_key(item):
+    """Dedupe key for an event, the same one the Excel export uses"""
+    adapter = ItemAdapter(item)
+    return tuple(adapter.get(field, '') for field in ('event_name', 'location', 'date', 'time'))
+
 
 class EventscraperPipeline:
+    """
+    Streaming output stage for scraped events.
+
+    Items are filtered to the wanted locations and deduplicated as they
+    arrive, then appended to a JSON Lines file (flushed per item, so a crash
+    mid-crawl still leaves every event scraped so far on disk) and,
+    optionally, to an openpyxl write-only workbook. Only the dedupe keys are
+    kept in memory.
+    """
+
+    def __init__(self, jsonl_path, xlsx_path=None, location_keywords=None):
+        self.jsonl_path = jsonl_path
+        self.xlsx_path = xlsx_path
+        self.location_keywords = location_keywords
+        self.seen = set()
+        self.jsonl_file = None
+        self.workbook = None
+        self.sheet = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            crawler.settings.get("EVENTS_JSONL_PATH", "events_output.jsonl"),
+            crawler.settings.get("EVENTS_XLSX_PATH") or None,
+            crawler.settings.getlist("EVENT_LOCATION_KEYWORDS") or None,
+        )
+
+    def open_spider(self, spider):
+        self.jsonl_file = open(self.jsonl_path, 'w', encoding='utf-8')
+
+        if self.xlsx_path:
+            self.workbook = Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet("Events")
+            for col_idx, (_, _, width) in enumerate(STREAM_COLUMNS, 1):
+                self.sheet.column_dimensions[get_column_letter(col_idx)].width = width
+            self.sheet.append([header for _, header, _ in STREAM_COLUMNS])
+
     def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+
+        if not is_wanted_location(adapter.get('location'), self.location_keywords):
+            raise DropItem(f"Location not wanted: {adapter.get('location')}")
+
+        key = event_key(item)
+        if key in self.seen:
+            raise DropItem(f"Duplicate event: {adapter.get('event_name')}")
+        self.seen.add(key)
+
+        self.jsonl_file.write(json.dumps(adapter.asdict(), ensure_ascii=False) + '\n')
+        self.jsonl_file.flush()
+
+        if self.sheet is not None:
+            self.sheet.append(self._xlsx_row(adapter))
+
         return item
+
+    def close_spider(self, spider):
+        self.jsonl_file.close()
+        spider.logger.info(f"Wrote {len(self.seen)} events to {self.jsonl_path}")
+
+        if self.workbook is not None:
+            self.workbook.save(self.xlsx_path)
+            spider.logger.info(f"Wrote streamed workbook {self.xlsx_path}")
+
+    def _xlsx_row(self, adapter):
+        row = []
+        for field, _, _ in STREAM_COLUMNS:
+            value = adapter.get(field, '')
+            if field == 'registration_url':
+                value = hyperlink_cell(self.sheet, value)
+            elif field == 'time':
+                value = convert_time_to_nz(value, adapter.get('date'))
+            row.append(value)
+        return row
@@ -0,0 +1,304 @@
+"""
+Asyncio Playwright rendering backend.
+
+Runs the listing and event recipes as coroutines in one headless Chromium
+context, with up to PLAYWRIGHT_MAX_PAGES pages open at once. Page scripts,
+selectors and readiness waits are shared with the Selenium recipes in
+EventScraper.rendering, so both backends produce the same meta and wait
+reports.
+
+Enable with:
+
+    RENDER_BACKEND = "EventScraper.playwright_backend.PlaywrightBackend"
+
+This needs `pip install playwright && playwright install chromium`, and the
+asyncio reactor (TWISTED_REACTOR in settings.py), since pages are driven on
+the reactor's own event loop rather than in threads.
+"""
+
+import asyncio
+import logging
+import re
+import time
+
+from scrapy.utils.reactor import is_asyncio_reactor_installed
+
+from EventScraper.backends import RenderBackend, RenderResult
+from EventScraper.provisioning import USER_AGENT
+from EventScraper.rendering import (
+    CARD_TEXT_LINES,
+    COUNT_EVENT_LINKS_JS,
+    EVENT_BANNER_XPATH,
+    EVENT_FRAGMENT_JS,
+    EVENT_LINK_SELECTORS,
+    EXTRACT_EVENT_CARDS_JS,
+    LOAD_MORE_XPATH,
+    OUTER_BANNER_ENTRIES_XPATH,
+    RESOURCE_COUNT_JS,
+    TRANSFERRED_BYTES_JS,
+    ValueStable,
+    WaitProfiler,
+)
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _script(body):
+    """Wrap a Selenium-style script body (using `arguments`) for page.evaluate"""
+    return f"(args) => (function () {{ {body} }}).apply(null, args)"
+
+
+async def run_script(page, body, *args):
+    return await page.evaluate(_script(body), list(args))
+
+
+async def count_event_links(page):
+    """Number of event links currently in the DOM"""
+    return int(await run_script(page, COUNT_EVENT_LINKS_JS, EVENT_LINK_SELECTORS) or 0)
+
+
+def blocked_url_regex(patterns):
+    """One regex matching any CDP-style wildcard pattern in `patterns`, or None"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(
+        '^' + '.*'.join(re.escape(part) for part in pattern.split('*')) + '$' for pattern in patterns
+    ))
+
+
+class AsyncWaitProfiler(WaitProfiler):
+    """
+    WaitProfiler for coroutine conditions, polled on the event loop. Also
+    carries the load state navigations wait for (`load_state`).
+    """
+
+    load_state = "load"
+
+    @classmethod
+    def from_settings(cls, page, settings):
+        waits = super().from_settings(page, settings)
+        if settings.get("RENDER_PAGE_LOAD_STRATEGY") == "eager":
+            waits.load_state = "domcontentloaded"
+        return waits
+
+    async def wait(self, name, condition, cap=None):
+        cap = self.timeout if cap is None else cap
+        start = time.monotonic()
+        met = False
+        while True:
+            try:
+                met = bool(await condition())
+            except PlaywrightError:
+                met = False
+            if met or time.monotonic() - start >= cap:
+                break
+            await asyncio.sleep(self.poll_interval)
+        return self._record(name, start, cap, met)
+
+
+def document_ready(page):
+    async def condition():
+        return await page.evaluate("document.readyState") == "complete"
+    return condition
+
+
+def value_stable(probe, settle):
+    """Coroutine version of rendering.ValueStable"""
+    stable = ValueStable(None, settle)
+
+    async def condition():
+        return stable.observe(await probe())
+    return condition
+
+
+def network_idle(page, settle):
+    return value_stable(lambda: run_script(page, RESOURCE_COUNT_JS), settle)
+
+
+def links_above(page, count):
+    async def condition():
+        return await count_event_links(page) > count
+    return condition
+
+
+async def render_listing(page, url, waits):
+    """Load a listing page, scroll until no more lazy-loaded event cards appear and collect them"""
+    with waits.stage("navigation"):
+        await page.goto(url, wait_until=waits.load_state)
+    logger.info(f"Page title: {await page.title()}")
+
+    with waits.stage("load_wait"):
+        await waits.wait("page_ready", document_ready(page))
+        await waits.wait("network_idle", network_idle(page, waits.settle))
+
+    # Scroll to trigger lazy loading, until steps stop bringing in new links
+    with waits.stage("scrolling"):
+        progress = waits.scroll_progress(await count_event_links(page))
+        while not progress.done:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+            # Check for "Load More" button
+            load_more = page.locator(f"xpath={LOAD_MORE_XPATH}")
+            for index in range(await load_more.count()):
+                try:
+                    if await load_more.nth(index).is_visible():
+                        logger.info("Clicking 'Load More' button")
+                        await load_more.nth(index).click(timeout=waits.step_timeout * 1000)
+                        break
+                except PlaywrightError:
+                    pass
+
+            await waits.wait(f"scroll_{progress.steps + 1}", links_above(page, progress.count), cap=waits.step_timeout)
+            progress.observe(await count_event_links(page))
+    scroll = progress.report()
+    logger.info(
+        f"Loaded {scroll['pages_loaded']} page(s), {scroll['links']} event links in "
+        f"{scroll['steps']} scroll steps ({scroll['seconds']:.2f}s, stopped on {scroll['stopped']})"
+    )
+
+    with waits.stage("extraction"):
+        payload = await run_script(page, EXTRACT_EVENT_CARDS_JS, EVENT_LINK_SELECTORS, CARD_TEXT_LINES)
+        page_source = await page.content()
+    event_cards = (payload or {}).get("cards") or []
+    if event_cards:
+        logger.info(f"Found {len(event_cards)} links with selector: {payload['selector']}")
+    else:
+        logger.warning(f"No event links found on {url}")
+        try:
+            screenshot_path = f"debug_screenshot_{url.split('=')[-1]}.png"
+            await page.screenshot(path=screenshot_path)
+            logger.info(f"Saved debug screenshot to {screenshot_path}")
+        except PlaywrightError:
+            pass
+
+    logger.info(f"Page source length: {len(page_source)} characters")
+    return page_source, {"event_cards": event_cards, "listing_scroll": scroll}
+
+
+async def render_event(page, url, waits):
+    """
+    Load an event page, wait for its banner (date, time, location) to render
+    and cut out the name and banner as `meta["event_fragment"]`
+    """
+    logger.info(f"Loading event page: {url}")
+    with waits.stage("navigation"):
+        await page.goto(url, wait_until=waits.load_state)
+
+    banner = page.locator(f"xpath={EVENT_BANNER_XPATH}")
+    with waits.stage("load_wait"):
+        if not await waits.wait("banner", lambda: banner.count()):
+            logger.warning(f"Timeout loading event content on {url}")
+
+    with waits.stage("extraction"):
+        fragment = await run_script(page, EVENT_FRAGMENT_JS, OUTER_BANNER_ENTRIES_XPATH)
+        return await page.content(), {"event_fragment": fragment}
+
+
+RENDERERS = {
+    "listing": render_listing,
+    "event": render_event,
+}
+
+
+class PlaywrightBackend(RenderBackend):
+    """
+    Renders pages concurrently in one Chromium browser context.
+
+    The browser is launched on the first render and shared by every page;
+    each page gets its own route handler for the resource groups blocked by
+    its render profile. If the browser crashes, the next render launches a
+    new one.
+    """
+
+    recipes = tuple(RENDERERS)
+
+    def __init__(self, settings):
+        if async_playwright is None:
+            raise ImportError(
+                "PlaywrightBackend needs Playwright: pip install playwright && playwright install chromium"
+            )
+        if not is_asyncio_reactor_installed():
+            raise RuntimeError(
+                "PlaywrightBackend needs TWISTED_REACTOR = "
+                "'twisted.internet.asyncioreactor.AsyncioSelectorReactor'"
+            )
+        super().__init__(settings)
+        # Playwright's TimeoutError, and errors from a crashed browser, are all Errors
+        self.transient_errors = (PlaywrightError, TimeoutError)
+        self.concurrency = settings.getint("PLAYWRIGHT_MAX_PAGES", 8)
+        self.disable_images = settings.getbool("RENDER_DISABLE_IMAGES")
+        self.navigation_timeout = settings.getfloat("RENDER_PAGE_LOAD_TIMEOUT", 45)
+        self.blocked_regexes = {
+            profile: blocked_url_regex(patterns) for profile, patterns in self.blocked_patterns.items()
+        }
+        self._pages = asyncio.Semaphore(self.concurrency)
+        self._start_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._context = None
+
+    async def render(self, recipe, url, profile):
+        await self._start()
+        async with self._pages:
+            page = await self._context.new_page()
+            try:
+                page.set_default_navigation_timeout(self.navigation_timeout * 1000)
+                await page.route("**/*", self._route_handler(self.blocked_regexes.get(profile)))
+                waits = AsyncWaitProfiler.from_settings(page, self.settings)
+                page_source, extracted = await RENDERERS[recipe](page, url, waits)
+                transferred = int(await run_script(page, TRANSFERRED_BYTES_JS) or 0)
+                return RenderResult(page_source, extracted, waits, transferred)
+            finally:
+                try:
+                    await page.close()
+                except PlaywrightError:
+                    # The browser went away with the page
+                    pass
+
+    def _route_handler(self, blocked):
+        async def handle(route):
+            request = route.request
+            if (self.disable_images and request.resource_type == "image") or (blocked and blocked.match(request.url)):
+                await route.abort()
+            else:
+                await route.continue_()
+        return handle
+
+    async def _start(self):
+        async with self._start_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._browser is not None:
+                logger.warning("Chromium disconnected, launching a new browser")
+                self.restarts += 1
+                self._context = self._browser = None
+            start = time.monotonic()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu',
+                      '--disable-blink-features=AutomationControlled'],
+            )
+            self._context = await self._browser.new_context(
+                user_agent=USER_AGENT,
+                viewport={"width": 1920, "height": 1080},
+            )
+            logger.info(
+                f"Chromium {self._browser.version} started in {time.monotonic() - start:.2f}s "
+                f"(up to {self.concurrency} concurrent pages)"
+            )
+
+    async def close(self):
+        if self._browser is not None and self._browser.is_connected():
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._context = self._browser = self._playwright = None
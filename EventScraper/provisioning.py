@@ -0,0 +1,209 @@
+"""
+Chrome and ChromeDriver provisioning for the driver pool.
+
+Resolving ChromeDriver through webdriver-manager means a version lookup (and
+possibly a download) on every run, and a cold Chrome start on top of that.
+ChromeProvisioner resolves the driver once and records the result on disk, so
+later runs start Chrome straight from the cached path without touching the
+network. It can also run fully offline, attach to a browser that is already
+running, or give each pool slot a persistent Chrome profile so the browser's
+HTTP cache survives between runs.
+"""
+
+import copy
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.driver_cache import DriverCacheManager
+
+
+logger = logging.getLogger(__name__)
+
+# Resolved driver path and versions, inside the provisioning cache directory
+RESOLVED_DRIVER_FILE = "resolved.json"
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def build_chrome_options(page_load_strategy="normal", disable_images=False):
+    """
+    Chrome options used for every pooled browser.
+
+    `page_load_strategy="eager"` makes `driver.get()` return once the DOM is
+    parsed instead of waiting for every subresource, and `disable_images`
+    stops Chrome from fetching or decoding images at all.
+    """
+    chrome_options = Options()
+    chrome_options.page_load_strategy = page_load_strategy
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    if disable_images:
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option(
+            'prefs', {'profile.managed_default_content_settings.images': 2}
+        )
+    return chrome_options
+
+
+class ChromeProvisioner:
+    """
+    Driver factory for DriverPool: `provisioner(slot)` starts a Chrome for
+    pool slot `slot`.
+
+    ChromeDriver is resolved at most once per process, in this order: the
+    explicit `driver_path`, the path recorded in `cache_dir` by an earlier
+    run, then (unless `offline`) webdriver-manager with its downloads kept in
+    `cache_dir`, and finally `chromedriver` on the PATH. If a cached driver
+    no longer matches the installed Chrome, it is resolved again once.
+
+    Every driver gets `page_load_timeout` (seconds), so a page that never
+    finishes loading raises TimeoutException instead of hanging its slot.
+    """
+
+    def __init__(self, chrome_options=None, cache_dir=None, offline=False, driver_path=None,
+                 debugger_address=None, user_data_dir=None, page_load_timeout=None):
+        self.chrome_options = chrome_options or build_chrome_options()
+        self.page_load_timeout = page_load_timeout
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.driver_path = driver_path
+        self.debugger_address = debugger_address
+        self.user_data_dir = user_data_dir
+        self._resolved = None
+        self._from_cache = False
+        self._versions_recorded = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings, chrome_options=None):
+        return cls(
+            chrome_options,
+            cache_dir=settings.get("CHROMEDRIVER_CACHE_DIR") or None,
+            offline=settings.getbool("CHROMEDRIVER_OFFLINE"),
+            driver_path=settings.get("CHROMEDRIVER_PATH") or None,
+            debugger_address=settings.get("CHROME_DEBUGGER_ADDRESS") or None,
+            user_data_dir=settings.get("CHROME_USER_DATA_DIR") or None,
+            page_load_timeout=settings.getfloat("RENDER_PAGE_LOAD_TIMEOUT") or None,
+        )
+
+    def __call__(self, slot=0):
+        start = time.monotonic()
+        options = self._options(slot)
+        try:
+            driver = webdriver.Chrome(service=Service(self.resolve()), options=options)
+        except SessionNotCreatedException as e:
+            if self.driver_path or not self._from_cache:
+                raise
+            # Chrome was updated since the driver path was cached
+            logger.warning(f"Cached ChromeDriver failed to start Chrome ({e.msg}), resolving it again")
+            self._forget()
+            driver = webdriver.Chrome(service=Service(self.resolve(use_cache=False)), options=options)
+
+        if self.page_load_timeout:
+            driver.set_page_load_timeout(self.page_load_timeout)
+        self._record_versions(driver)
+        logger.info(
+            f"Chrome {driver.capabilities.get('browserVersion', 'unknown')} started "
+            f"in {time.monotonic() - start:.2f}s (slot {slot})"
+        )
+        return driver
+
+    def resolve(self, use_cache=True):
+        """Path of the ChromeDriver binary, resolving it on first use"""
+        with self._lock:
+            if self._resolved is None:
+                self._resolved, self._from_cache = self._resolve(use_cache)
+                logger.info(f"Using ChromeDriver at {self._resolved}")
+            return self._resolved
+
+    def _resolve(self, use_cache):
+        if self.driver_path:
+            return self.driver_path, False
+
+        cached = self._read_cache() if use_cache else {}
+        if _is_executable(cached.get("path")):
+            return cached["path"], True
+
+        path = None
+        if not self.offline:
+            try:
+                # webdriver-manager handles version matching automatically
+                cache_manager = DriverCacheManager(root_dir=self.cache_dir) if self.cache_dir else None
+                path = ChromeDriverManager(cache_manager=cache_manager).install()
+            except Exception as e:
+                logger.warning(f"webdriver-manager failed: {str(e)}, trying system ChromeDriver")
+        path = path or shutil.which('chromedriver')
+        if not path:
+            raise RuntimeError("No ChromeDriver found: webdriver-manager unavailable and none in system PATH")
+
+        self._write_cache({"path": path, "resolved_at": time.time()})
+        return path, False
+
+    def _options(self, slot):
+        if self.debugger_address:
+            # Attach to a running browser; its own flags and profile apply
+            options = Options()
+            options.debugger_address = self.debugger_address
+            return options
+        if not self.user_data_dir:
+            return self.chrome_options
+        # Chrome locks a profile directory, so each pool slot gets its own
+        options = copy.deepcopy(self.chrome_options)
+        options.add_argument(f"--user-data-dir={os.path.abspath(os.path.join(self.user_data_dir, f'slot-{slot}'))}")
+        return options
+
+    def _record_versions(self, driver):
+        """Note which Chrome and ChromeDriver versions the resolved path was used with"""
+        if self.driver_path or self._versions_recorded:
+            return
+        self._versions_recorded = True
+        capabilities = driver.capabilities
+        cached = self._read_cache()
+        cached.update({
+            "browser_version": capabilities.get("browserVersion"),
+            "driver_version": (capabilities.get("chrome") or {}).get("chromedriverVersion", "").split(" ")[0],
+        })
+        self._write_cache(cached)
+
+    def _forget(self):
+        with self._lock:
+            self._resolved = None
+        self._write_cache({})
+
+    @property
+    def _cache_file(self):
+        return os.path.join(self.cache_dir, RESOLVED_DRIVER_FILE) if self.cache_dir else None
+
+    def _read_cache(self):
+        if not self._cache_file or not os.path.exists(self._cache_file):
+            return {}
+        try:
+            with open(self._cache_file, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self, data):
+        if not self._cache_file:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._cache_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
@@ -0,0 +1,69 @@
+"""
+Regions the scraper keeps events for.
+
+One keyword list drives every location filter: the spider (on listing cards,
+before any event page is rendered, and on scraped events), the output
+pipeline and the Excel export. Runs can narrow or widen it with the
+EVENT_LOCATION_KEYWORDS setting.
+"""
+
+import re
+from urllib.parse import parse_qs, urlparse
+
+
+# Only events whose location contains one of these are kept
+LOCATION_KEYWORDS = ['new zealand', 'australia', 'online']
+
+# Countries aws-experience.com/apj holds in-person events in. Event banners
+# show a venue as "<Country> - <address>"; text that merely looks like that
+# (e.g. a "Immersion Day - Hands on" tag line) only counts as a location when
+# it starts with one of these.
+COUNTRIES = [
+    'australia', 'new zealand', 'singapore', 'malaysia', 'indonesia', 'philippines', 'thailand',
+    'vietnam', 'japan', 'korea', 'south korea', 'india', 'hong kong', 'taiwan', 'china',
+    'sri lanka', 'bangladesh', 'pakistan', 'cambodia', 'brunei', 'myanmar', 'mongolia', 'nepal',
+]
+
+# Locations of events that are not held at a venue
+ONLINE_LOCATIONS = ['online', 'virtual']
+
+# Online locations, or "<known country> - venue" like the event banner.
+# Other "Word - text" lines are tag lines, not locations.
+KNOWN_LOCATION_RE = re.compile(
+    r'^(?:' + '|'.join(map(re.escape, ONLINE_LOCATIONS)) + r')$'
+    r'|^(?:' + '|'.join(map(re.escape, sorted(COUNTRIES, key=len, reverse=True))) + r') - \S',
+    re.IGNORECASE,
+)
+
+# Region keyword for each value of the listings' ?location= filter
+LOCATION_QUERY_HINTS = {
+    'virtual': 'online',
+    'au': 'australia',
+    'nz': 'new zealand',
+}
+
+
+def normalize_location(location):
+    """Lowercased location, with every online location (e.g. 'Virtual') as 'online'"""
+    location = (location or '').strip().lower()
+    return 'online' if location in ONLINE_LOCATIONS else location
+
+
+def is_wanted_location(location, keywords=None):
+    """True if an event location contains one of the wanted region keywords"""
+    keywords = LOCATION_KEYWORDS if keywords is None else keywords
+    location = normalize_location(location)
+    return any(keyword.lower() in location for keyword in keywords)
+
+
+def is_known_location(location):
+    """True if a location is online or starts with a known country, e.g. 'New Zealand - Auckland'"""
+    return bool(KNOWN_LOCATION_RE.search((location or '').strip()))
+
+
+def listing_region(url):
+    """Region keyword a listing URL is filtered to by its ?location= query, or None"""
+    values = parse_qs(urlparse(url).query).get('location')
+    if not values:
+        return None
+    return LOCATION_QUERY_HINTS.get(values[0].lower())
@@ -0,0 +1,442 @@
+"""
+Page rendering recipes for the Selenium downloader middleware.
+
+Each recipe drives a pooled Chrome instance to a URL, does whatever the page
+needs before its DOM is complete (scrolling, clicking "Load More", waiting for
+the event banner) and returns the rendered page source together with a dict of
+anything it extracted in the browser, which the middleware merges into the
+response's meta. Requests pick a recipe with `meta={"render": "<name>"}`.
+
+Recipes never sleep for a fixed time. Every wait is an explicit readiness
+condition with a ceiling, run through a WaitProfiler that records how long the
+page actually took compared to that ceiling.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+
+logger = logging.getLogger(__name__)
+
+# XPath fallbacks for event links on a listing page, most specific first
+EVENT_LINK_SELECTORS = [
+    "//a[contains(@href, '/apj/smb/e/')]",
+    "//a[contains(@href, '/e/')]",
+    "//a[contains(@href, 'event')]",
+]
+
+LOAD_MORE_XPATH = "//button[contains(text(), 'Load More') or contains(text(), 'Show More')]"
+
+EVENT_BANNER_XPATH = "//div[contains(@class, 'BannerInformationEntry')]"
+
+# Counts matches of the first selector that matches anything, in one round trip
+COUNT_EVENT_LINKS_JS = """
+for (const xpath of arguments[0]) {
+    const n = document.evaluate('count(' + xpath + ')', document, null,
+                                XPathResult.NUMBER_TYPE, null).numberValue;
+    if (n) { return n; }
+}
+return 0;
+"""
+
+# Collects every event link on a listing in one round trip. The selector
+# fallbacks are evaluated in the page; hrefs are resolved to absolute URLs,
+# stripped of fragments and deduplicated, and each link is returned with the
+# text of its card: the largest ancestor that links to no other event.
+EXTRACT_EVENT_CARDS_JS = """
+const linkUrls = (context, xpath) => {
+    const found = document.evaluate(xpath, context, null,
+                                    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const urls = new Set();
+    for (let i = 0; i < found.snapshotLength; i++) {
+        const href = found.snapshotItem(i).href;
+        if (href) { urls.add(href.split('#')[0]); }
+    }
+    return urls;
+};
+const lines = el => (el.innerText || '').split('\\n')
+    .map(line => line.trim()).filter(line => line).slice(0, arguments[1]);
+
+for (const xpath of arguments[0]) {
+    const anchors = document.evaluate(xpath, document, null,
+                                      XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    if (!anchors.snapshotLength) { continue; }
+
+    const cards = new Map();
+    for (let i = 0; i < anchors.snapshotLength; i++) {
+        const anchor = anchors.snapshotItem(i);
+        const url = (anchor.href || '').split('#')[0];
+        if (!url || cards.has(url)) { continue; }
+        if (!url.includes('/e/') && !url.toLowerCase().includes('event')) { continue; }
+
+        let card = anchor;
+        while (card.parentElement && card.parentElement !== document.body) {
+            const urls = linkUrls(card.parentElement, '.' + xpath);
+            if (urls.size > 1) { break; }
+            card = card.parentElement;
+        }
+        const heading = card.querySelector('h1, h2, h3, h4, h5, [class*="Title"], [class*="title"]');
+        cards.set(url, {
+            url: url,
+            title: ((heading || anchor).innerText || '').trim(),
+            lines: lines(card),
+        });
+    }
+    return {selector: xpath, cards: Array.from(cards.values())};
+}
+return {selector: null, cards: []};
+"""
+
+# Maximum number of text lines returned per listing card
+CARD_TEXT_LINES = 20
+
+# Number of network resources the page has requested so far
+RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length;"
+
+# Bytes transferred for the document and every resource it loaded
+TRANSFERRED_BYTES_JS = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+# An event page's name heading and outermost banner entries (arguments[0]), as
+# one small HTML fragment that the spider parses instead of the whole page
+EVENT_FRAGMENT_JS = """
+const found = document.evaluate(arguments[0], document, null,
+                                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+if (!found.snapshotLength) { return null; }
+const heading = document.querySelector('h1');
+const parts = heading ? [heading.outerHTML] : [];
+for (let i = 0; i < found.snapshotLength; i++) {
+    parts.push(found.snapshotItem(i).outerHTML);
+}
+return '<div>' + parts.join('') + '</div>';
+"""
+OUTER_BANNER_ENTRIES_XPATH = f"{EVENT_BANNER_XPATH}[not(ancestor::div[contains(@class, 'BannerInformationEntry')])]"
+
+# Resource groups a render profile can block, as CDP Network.setBlockedURLs
+# wildcard patterns. Recipes only read DOM text, so none of these are needed
+# except stylesheets on listings, where scrolling and "Load More" visibility
+# depend on layout.
+BLOCKABLE_RESOURCES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*youtube.com/*", "*vimeo.com/*"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com/*", "*fonts.gstatic.com/*"],
+    "stylesheets": ["*.css"],
+    "trackers": [
+        "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+        "*facebook.net/*", "*facebook.com/tr*", "*linkedin.com/px*", "*snap.licdn.com/*",
+        "*hotjar.com/*", "*clarity.ms/*", "*analytics.twitter.com/*", "*bat.bing.com/*",
+        "*demdex.net/*", "*omtrdc.net/*", "*adobedtm.com/*", "*cookielaw.org/*",
+    ],
+}
+
+
+def count_event_links(driver):
+    """Number of event links currently in the DOM"""
+    return int(driver.execute_script(COUNT_EVENT_LINKS_JS, EVENT_LINK_SELECTORS) or 0)
+
+
+def extract_event_cards(driver):
+    """
+    Every event link on the page with its card text, in a single script call.
+
+    Returns a list of {"url", "title", "lines"} dicts, one per unique URL.
+    """
+    payload = driver.execute_script(EXTRACT_EVENT_CARDS_JS, EVENT_LINK_SELECTORS, CARD_TEXT_LINES)
+    if not payload:
+        return []
+    if payload.get("selector"):
+        logger.info(f"Found {len(payload['cards'])} links with selector: {payload['selector']}")
+    return payload.get("cards") or []
+
+
+def event_fragment(driver):
+    """HTML of the event name and banner entries, or None if the banner is missing"""
+    return driver.execute_script(EVENT_FRAGMENT_JS, OUTER_BANNER_ENTRIES_XPATH)
+
+
+def blocked_url_patterns(groups):
+    """CDP URL patterns for a profile's list of BLOCKABLE_RESOURCES groups"""
+    patterns = []
+    for group in groups:
+        if group not in BLOCKABLE_RESOURCES:
+            raise ValueError(f"Unknown resource group {group!r}, expected one of {sorted(BLOCKABLE_RESOURCES)}")
+        patterns.extend(BLOCKABLE_RESOURCES[group])
+    return patterns
+
+
+def block_resources(driver, patterns):
+    """
+    Make the browser fail requests matching `patterns` before they go out.
+    Drivers without the Chrome DevTools protocol load everything.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except (AttributeError, WebDriverException) as e:
+        logger.debug(f"Resource blocking unavailable: {e}")
+
+
+def transferred_bytes(driver):
+    """Bytes the current page has transferred so far, as reported by the browser"""
+    try:
+        return int(driver.execute_script(TRANSFERRED_BYTES_JS) or 0)
+    except WebDriverException:
+        return 0
+
+
+def document_ready(driver):
+    """Condition: the document and its subresources have finished loading"""
+    return driver.execute_script("return document.readyState;") == "complete"
+
+
+class ValueStable:
+    """
+    Condition that holds once `probe(driver)` has returned the same value for
+    `settle` seconds, e.g. no new network requests or no new event links.
+    """
+
+    def __init__(self, probe, settle):
+        self.probe = probe
+        self.settle = settle
+        self._value = None
+        self._since = None
+
+    def __call__(self, driver):
+        return self.observe(self.probe(driver))
+
+    def observe(self, value):
+        """Record the latest probed value; True once it has held for `settle` seconds"""
+        now = time.monotonic()
+        if value != self._value:
+            self._value = value
+            self._since = now
+            return False
+        return now - self._since >= self.settle
+
+
+def network_idle(settle):
+    """Condition: no new resource requests for `settle` seconds"""
+    return ValueStable(lambda driver: driver.execute_script(RESOURCE_COUNT_JS), settle)
+
+
+def links_above(count):
+    """Condition: more event links than `count` are present"""
+    return lambda driver: count_event_links(driver) > count
+
+
+class ScrollProgress:
+    """
+    Bookkeeping for a listing's adaptive scroll / "Load More" loop.
+
+    Each step scrolls (and clicks "Load More" if shown), then reports the
+    event link count with `observe()`. The loop keeps going while steps
+    bring in new links, and is done after `patience` steps in a row add
+    none, or after `max_steps` steps in total.
+    """
+
+    def __init__(self, initial_count, max_steps=30, patience=1):
+        self.count = initial_count
+        self.max_steps = max_steps
+        self.patience = patience
+        self.steps = 0
+        # The initial load counts as the first page
+        self.pages = 1
+        self._idle_steps = 0
+        self._start = time.monotonic()
+
+    @property
+    def done(self):
+        return self._idle_steps >= self.patience or self.steps >= self.max_steps
+
+    def observe(self, count):
+        """Record the event link count after a step"""
+        self.steps += 1
+        if count > self.count:
+            self.pages += 1
+            self._idle_steps = 0
+        else:
+            self._idle_steps += 1
+        self.count = max(count, self.count)
+
+    def report(self):
+        """Pages loaded, steps taken, final link count, why the loop stopped and its duration"""
+        return {
+            "pages_loaded": self.pages,
+            "steps": self.steps,
+            "links": self.count,
+            "stopped": "plateau" if self._idle_steps >= self.patience else "cap",
+            "seconds": round(time.monotonic() - self._start, 3),
+        }
+
+
+class WaitProfiler:
+    """
+    Runs readiness conditions with a ceiling and records, per wait, how long
+    it actually took versus its cap and whether the condition was met.
+
+    Recipes also time their top-level stages (navigation, load_wait,
+    scrolling, extraction) with `stage()`, so a render's wall time can be
+    broken down; waits run inside those stages. The scroll settings for
+    listings travel with it too.
+    """
+
+    def __init__(self, driver, timeout=20, poll_interval=0.25, settle=0.5, step_timeout=2,
+                 max_scroll_steps=30, scroll_patience=1):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.step_timeout = step_timeout
+        self.max_scroll_steps = max_scroll_steps
+        self.scroll_patience = scroll_patience
+        self.waits = []
+        self.stages = {}
+
+    @classmethod
+    def from_settings(cls, driver, settings):
+        return cls(
+            driver,
+            timeout=settings.getfloat("RENDER_WAIT_TIMEOUT", 20),
+            poll_interval=settings.getfloat("RENDER_POLL_INTERVAL", 0.25),
+            settle=settings.getfloat("RENDER_SETTLE_TIME", 0.5),
+            step_timeout=settings.getfloat("RENDER_STEP_TIMEOUT", 2),
+            max_scroll_steps=settings.getint("RENDER_MAX_SCROLL_STEPS", 30),
+            scroll_patience=settings.getint("RENDER_SCROLL_PATIENCE", 1),
+        )
+
+    def wait(self, name, condition, cap=None):
+        """Wait up to `cap` seconds (default: the overall ceiling) for `condition`"""
+        cap = self.timeout if cap is None else cap
+        start = time.monotonic()
+        try:
+            WebDriverWait(self.driver, cap, poll_frequency=self.poll_interval).until(condition)
+            met = True
+        except TimeoutException:
+            met = False
+        return self._record(name, start, cap, met)
+
+    @contextmanager
+    def stage(self, name):
+        """Add the wall time of the enclosed block to stage `name`"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0) + time.monotonic() - start, 3)
+
+    def _record(self, name, start, cap, met):
+        self.waits.append({
+            "name": name,
+            "seconds": round(time.monotonic() - start, 3),
+            "cap": cap,
+            "met": met,
+        })
+        return met
+
+    @property
+    def total(self):
+        return sum(w["seconds"] for w in self.waits)
+
+    def scroll_progress(self, initial_count):
+        return ScrollProgress(initial_count, self.max_scroll_steps, self.scroll_patience)
+
+    def summary(self):
+        """One-line report such as 'page_ready 0.4/20s, banner 1.2/20s (timeout)'"""
+        return ", ".join(
+            f"{w['name']} {w['seconds']:.2f}/{w['cap']:g}s" + ("" if w["met"] else " (timeout)")
+            for w in self.waits
+        )
+
+
+def render_listing(driver, url, waits):
+    """
+    Load a listing page, scroll until no more lazy-loaded event cards appear
+    and collect the event links and card text with one script call
+    """
+    with waits.stage("navigation"):
+        driver.get(url)
+    logger.info("Page loaded with Selenium")
+
+    # Log page title to verify page loaded
+    logger.info(f"Page title: {driver.title}")
+
+    # Wait for content to load
+    with waits.stage("load_wait"):
+        waits.wait("page_ready", document_ready)
+        waits.wait("network_idle", network_idle(waits.settle))
+
+    # Scroll to trigger lazy loading, until steps stop bringing in new links
+    with waits.stage("scrolling"):
+        progress = waits.scroll_progress(count_event_links(driver))
+        while not progress.done:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+            # Check for "Load More" button
+            for load_more in driver.find_elements(By.XPATH, LOAD_MORE_XPATH):
+                try:
+                    if load_more.is_displayed():
+                        logger.info("Clicking 'Load More' button")
+                        load_more.click()
+                        break
+                except Exception:
+                    pass
+
+            waits.wait(f"scroll_{progress.steps + 1}", links_above(progress.count), cap=waits.step_timeout)
+            progress.observe(count_event_links(driver))
+    scroll = progress.report()
+    logger.info(
+        f"Loaded {scroll['pages_loaded']} page(s), {scroll['links']} event links in "
+        f"{scroll['steps']} scroll steps ({scroll['seconds']:.2f}s, stopped on {scroll['stopped']})"
+    )
+
+    with waits.stage("extraction"):
+        event_cards = extract_event_cards(driver)
+        page_source = driver.page_source
+
+    if not event_cards:
+        logger.warning(f"No event links found on {url}")
+        # Save screenshot for debugging
+        try:
+            screenshot_path = f"debug_screenshot_{url.split('=')[-1]}.png"
+            driver.save_screenshot(screenshot_path)
+            logger.info(f"Saved debug screenshot to {screenshot_path}")
+        except Exception:
+            pass
+
+    # Log page source length to verify content
+    logger.info(f"Page source length: {len(page_source)} characters")
+    return page_source, {"event_cards": event_cards, "listing_scroll": scroll}
+
+
+def render_event(driver, url, waits):
+    """
+    Load an event page, wait for its banner (date, time, location) to render
+    and cut out the name and banner as `meta["event_fragment"]`
+    """
+    logger.info(f"Loading event page: {url}")
+
+    with waits.stage("navigation"):
+        driver.get(url)
+
+    # Wait for event content
+    with waits.stage("load_wait"):
+        if not waits.wait("banner", EC.presence_of_element_located((By.XPATH, EVENT_BANNER_XPATH))):
+            logger.warning(f"Timeout loading event content on {url}")
+
+    with waits.stage("extraction"):
+        return driver.page_source, {"event_fragment": event_fragment(driver)}
+
+
+RENDERERS = {
+    "listing": render_listing,
+    "event": render_event,
+}
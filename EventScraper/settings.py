@@ -7,6 +7,10 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+
+from EventScraper.regions import LOCATION_KEYWORDS
+
 BOT_NAME = "EventScraper"
 
 SPIDER_MODULES = ["EventScraper.spiders"]
@@ -21,10 +25,112 @@ ADDONS = {}
 # Obey robots.txt rules
 ROBOTSTXT_OBEY = True
 
+# How EventSpider fetches pages (override per run with `-a mode=http`):
+#   "render" - render every listing and event page with Selenium
+#   "http"   - plain Scrapy requests, reading event links and schema.org event
+#              data embedded in the server HTML; pages where that yields
+#              nothing are re-requested through Selenium
+EVENTS_FETCH_MODE = "render"
+
+# Only events whose location contains one of these keywords are kept. The same
+# list filters listing cards (so out-of-region events are never rendered),
+# scraped events, the output pipeline and the Excel export. Listing URLs whose
+# ?location= filter maps to an unlisted region are not crawled at all.
+EVENT_LOCATION_KEYWORDS = LOCATION_KEYWORDS
+
+# Incremental crawling: events are stored in a local SQLite cache keyed on their
+# registration URL. Events scraped less than EVENT_CACHE_TTL seconds ago are
+# replayed from the cache instead of being rendered again.
+EVENT_CACHE_ENABLED = True
+EVENT_CACHE_PATH = ".cache/events.sqlite3"
+EVENT_CACHE_TTL = 3 * 24 * 3600
+
+# Checkpoint of the running crawl (finished listings, requested event pages,
+# scraped events). A run that is interrupted resumes from it when restarted
+# within CRAWL_CHECKPOINT_MAX_AGE seconds; a run that finishes deletes it.
+CRAWL_CHECKPOINT_ENABLED = True
+CRAWL_CHECKPOINT_PATH = ".cache/checkpoint.sqlite3"
+CRAWL_CHECKPOINT_MAX_AGE = 6 * 3600
+
+# Rendering backend used by RenderMiddleware (see EventScraper/backends.py):
+#   "EventScraper.backends.SeleniumBackend" - pool of Chrome drivers, one page each
+#   "EventScraper.playwright_backend.PlaywrightBackend" - many concurrent pages in
+#       one Playwright browser context (pip install playwright)
+RENDER_BACKEND = "EventScraper.backends.SeleniumBackend"
+# Pages the Playwright backend keeps open at once
+PLAYWRIGHT_MAX_PAGES = 8
+# Playwright drives pages on the reactor's asyncio loop; Selenium works with either
+TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+
+# Selenium driver pool: listing and event pages are rendered concurrently on
+# up to SELENIUM_POOL_SIZE headless Chrome instances. Rendering scales with the
+# number of cores, so the pool defaults to the CPU count (capped at 4 to stay
+# within the memory of a GitHub Actions runner).
+SELENIUM_POOL_SIZE = min(4, os.cpu_count() or 1)
+# Restart a driver after it has rendered this many pages (0 = never)
+SELENIUM_MAX_PAGES_PER_DRIVER = 50
+
+# Driver provisioning (see EventScraper/provisioning.py). ChromeDriver is
+# resolved once and its path recorded under CHROMEDRIVER_CACHE_DIR, together
+# with webdriver-manager's downloads, so later runs start Chrome without any
+# version lookup. CHROMEDRIVER_OFFLINE never touches the network (cached path
+# or `chromedriver` on the PATH); CHROMEDRIVER_PATH skips resolution entirely.
+CHROMEDRIVER_CACHE_DIR = ".cache/chromedriver"
+CHROMEDRIVER_OFFLINE = False
+CHROMEDRIVER_PATH = ""
+# Attach to a Chrome already running with --remote-debugging-port (e.g.
+# "127.0.0.1:9222") instead of starting one; implies a single driver.
+CHROME_DEBUGGER_ADDRESS = ""
+# Keep one persistent Chrome profile per pool slot under this directory, so the
+# browser's HTTP cache of the site's scripts survives between runs.
+CHROME_USER_DATA_DIR = ""
+
+# Rendering waits: pages are polled for explicit readiness conditions (document
+# loaded, network idle, new event links, event banner present) instead of
+# sleeping for a fixed time. Each wait gives up after its ceiling.
+RENDER_WAIT_TIMEOUT = 20
+# Ceiling for a single scroll / "Load More" step to produce new event links
+RENDER_STEP_TIMEOUT = 2
+# Listings scroll until this many steps in a row bring no new event links,
+# for at most RENDER_MAX_SCROLL_STEPS steps
+RENDER_SCROLL_PATIENCE = 1
+RENDER_MAX_SCROLL_STEPS = 30
+# How long the network / link count must stay unchanged to count as settled
+RENDER_SETTLE_TIME = 0.5
+RENDER_POLL_INTERVAL = 0.25
+
+# Render failures. Page loads are aborted after RENDER_PAGE_LOAD_TIMEOUT
+# seconds. A render that fails (page load timeout, browser crash) is retried up
+# to RENDER_MAX_RETRIES times, RENDER_RETRY_BACKOFF seconds after the first
+# failure and twice as long after each next one; crashed browsers are replaced.
+RENDER_PAGE_LOAD_TIMEOUT = 45
+RENDER_MAX_RETRIES = 2
+RENDER_RETRY_BACKOFF = 2
+
+# Lightweight browser profile. Recipes only read the DOM, so Chrome skips
+# images and returns from page loads once the DOM is ready ("eager"); the
+# readiness waits above decide when a page is actually done.
+RENDER_PAGE_LOAD_STRATEGY = "eager"
+RENDER_DISABLE_IMAGES = True
+# Resource groups blocked per render profile (the recipe name, or
+# meta["render_profile"]), see BLOCKABLE_RESOURCES in EventScraper/rendering.py.
+# Listings keep their stylesheets: lazy loading and the "Load More" button
+# depend on layout.
+RENDER_BLOCKED_RESOURCES = {
+    "listing": ["images", "media", "fonts", "trackers"],
+    "event": ["images", "media", "fonts", "stylesheets", "trackers"],
+}
+
 # Concurrency and throttling settings
 #CONCURRENT_REQUESTS = 16
+# These apply to pages Scrapy downloads itself (the HTTP fast path). Rendered
+# pages never reach Scrapy's downloader slots: RenderMiddleware renders as many
+# at once as the backend has drivers or pages (SELENIUM_POOL_SIZE /
+# PLAYWRIGHT_MAX_PAGES) and starts them DOWNLOAD_DELAY seconds apart.
 CONCURRENT_REQUESTS_PER_DOMAIN = 1
 DOWNLOAD_DELAY = 1
+# Rendering runs in the reactor thread pool, which must fit the whole driver pool
+REACTOR_THREADPOOL_MAXSIZE = max(10, SELENIUM_POOL_SIZE)
 
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
@@ -40,27 +146,55 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "EventScraper.middlewares.EventscraperSpiderMiddleware": 543,
-#}
+# ParseTimingMiddleware times spider callbacks for the crawl report
+SPIDER_MIDDLEWARES = {
+    "EventScraper.middlewares.ParseTimingMiddleware": 950,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "EventScraper.middlewares.EventscraperDownloaderMiddleware": 543,
-#}
+# RenderMiddleware renders requests flagged with meta["render"]
+DOWNLOADER_MIDDLEWARES = {
+    "EventScraper.middlewares.RenderMiddleware": 543,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
 #EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
 #}
+# CrawlReport writes per-URL stage timings (navigation, waits, scrolling,
+# extraction, parsing), page sizes, items and crawl stats to CRAWL_REPORT_PATH
+# as JSON at the end of each run. Leave the path empty to disable it.
+EXTENSIONS = {
+    "EventScraper.extensions.CrawlReport": 500,
+}
+CRAWL_REPORT_PATH = "crawl_report.json"
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "EventScraper.pipelines.EventscraperPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "EventScraper.pipelines.EventscraperPipeline": 300,
+}
+
+# EventscraperPipeline streams filtered, deduplicated events to JSON Lines as
+# they are scraped. Set EVENTS_XLSX_PATH to also stream them into a
+# write-only workbook (in scrape order, without the date sorting done by
+# excel_convert.py).
+EVENTS_JSONL_PATH = "events_output.jsonl"
+EVENTS_XLSX_PATH = ""
+
+# run_scraper.py also saves each run's exported events as a Parquet snapshot
+# under EVENT_STORE_PATH/run_date=YYYY-MM-DD/ (needs pyarrow), so
+# `python event_store.py diff <base> <head>` can report what changed between
+# any two runs. Set to "" to skip it.
+EVENT_STORE_PATH = "event_store"
+
+# `run_scraper.py --sharded` crawls each start URL (region listing) in its own
+# process, splitting SELENIUM_POOL_SIZE / PLAYWRIGHT_MAX_PAGES between them.
+# Shards that fail are re-run on their own, up to SHARD_MAX_ATTEMPTS times.
+SHARD_MAX_ATTEMPTS = 3
+SHARD_RETRY_DELAY = 120
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -88,5 +222,3 @@ FEED_EXPORT_ENCODING = "utf-8"
 
 # FEEDS configuration removed - Lambda handler will collect items in memory instead
 
-# No additional middleware configuration needed for Selenium spider
-# For Playwright spider, configuration is handled in spider's custom_settings
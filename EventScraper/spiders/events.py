@@ -1,14 +1,19 @@
 import scrapy
 import datetime
+from urllib.parse import urlparse
 from scrapy.spiders import Spider
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+
+from EventScraper.cache import EventCache, card_fingerprint
+from EventScraper.checkpoint import CrawlCheckpoint, crawl_fingerprint
+from EventScraper.extractors import (
+    extract_card_fields,
+    extract_event_details,
+    extract_event_from_json,
+    extract_event_links,
+    normalize_event_url,
+)
+from EventScraper.regions import is_known_location, is_wanted_location, listing_region
+from EventScraper.rendering import EVENT_LINK_SELECTORS
 
 
 class EventSpider(Spider):
@@ -20,225 +25,286 @@ class EventSpider(Spider):
         "https://aws-experience.com/apj/smb/events?location=AU",
         "https://aws-experience.com/apj/smb/events?location=NZ",
     ]
-    
-    def __init__(self, *args, **kwargs):
+
+    def __init__(self, mode=None, *args, **kwargs):
         super(EventSpider, self).__init__(*args, **kwargs)
-        self.driver = None
-    
+        if isinstance(self.start_urls, str):
+            # `-a start_urls=url1,url2`, e.g. to crawl a local mirror of the site
+            self.start_urls = self.start_urls.split(',')
+            self.allowed_domains = sorted({urlparse(url).hostname for url in self.start_urls})
+        # "render" drives every page through Chrome; "http" reads the data
+        # embedded in the server HTML and only renders pages where that fails
+        self.mode = mode
+        self.cache = None
+        self.checkpoint = None
+        self.location_keywords = None
+        # Normalized URLs of every event page requested, and every event
+        # scraped, so far across listings
+        self.requested_events = set()
+        self.scraped_events = set()
+
     def start_requests(self):
-        """Initialize Selenium driver and start scraping"""
-        self.logger.info("Initializing Chrome driver...")
-        
-        # Setup Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        try:
-            # Try webdriver-manager first (handles version matching automatically)
-            self.logger.info("Attempting to use webdriver-manager for automatic version matching")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.logger.info("Chrome driver initialized successfully with webdriver-manager")
-            self.logger.info(f"Chrome version: {self.driver.capabilities.get('browserVersion', 'unknown')}")
-        except Exception as e:
-            self.logger.warning(f"webdriver-manager failed: {str(e)}, trying system ChromeDriver")
-            try:
-                # Fallback to system ChromeDriver
-                import shutil
-                chromedriver_path = shutil.which('chromedriver')
-                
-                if chromedriver_path:
-                    self.logger.info(f"Using system ChromeDriver at: {chromedriver_path}")
-                    service = Service(chromedriver_path)
-                    self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                    self.logger.info("Chrome driver initialized successfully with system ChromeDriver")
-                else:
-                    raise Exception("No ChromeDriver found in system PATH")
-            except Exception as e2:
-                self.logger.error(f"Failed to initialize Chrome driver: {str(e2)}")
-                raise
-        
-        # Process each URL
+        """Start scraping; rendered pages are handled by RenderMiddleware"""
+        self.mode = self.mode or self.settings.get("EVENTS_FETCH_MODE", "render")
+        if self.mode not in ("render", "http"):
+            raise ValueError(f"Unknown fetch mode {self.mode!r}, expected 'render' or 'http'")
+        self.logger.info(f"Fetch mode: {self.mode}")
+
+        self.location_keywords = self.settings.getlist("EVENT_LOCATION_KEYWORDS") or None
+
+        if self.settings.getbool("EVENT_CACHE_ENABLED"):
+            self.cache = EventCache.from_settings(self.settings)
+            self.logger.info(f"Using event cache {self.cache.path} (TTL {self.cache.ttl:g}s)")
+
+        if self.settings.getbool("CRAWL_CHECKPOINT_ENABLED"):
+            self.checkpoint = CrawlCheckpoint.from_settings(
+                self.settings, crawl_fingerprint(self.start_urls, self.mode)
+            )
+            if self.checkpoint.resumed:
+                yield from self._resume_requests()
+
+        # Process each URL, skipping listings filtered to a region we don't want
         for url in self.start_urls:
-            yield scrapy.Request(url, callback=self.parse, dont_filter=True)
-    
+            region = listing_region(url)
+            if region and not is_wanted_location(region, self.location_keywords):
+                self.logger.info(f"Skipping listing outside the wanted regions: {url}")
+                self.crawler.stats.inc_value("region/listings_skipped")
+                continue
+            if self.checkpoint and self.checkpoint.is_listing_done(url):
+                self.logger.info(f"Skipping listing finished before the crawl was interrupted: {url}")
+                self.crawler.stats.inc_value("checkpoint/listings_skipped")
+                continue
+            yield self._request(url, self.parse, "listing")
+
+    def _resume_requests(self):
+        """
+        Pick an interrupted crawl up from its checkpoint: replay the events it
+        scraped and request the event pages it never finished
+        """
+        completed = self.checkpoint.completed()
+        pending = self.checkpoint.pending()
+        self.logger.info(
+            f"Resuming from checkpoint {self.checkpoint.path}: {len(completed)} events scraped, "
+            f"{len(pending)} event pages unfinished"
+        )
+        self.crawler.stats.set_value("checkpoint/events_replayed", len(completed))
+        self.crawler.stats.set_value("checkpoint/requests_resumed", len(pending))
+        self.requested_events.update(self.checkpoint.keys())
+        self.scraped_events.update(normalize_event_url(event['registration_url']) for event in completed)
+
+        if completed:
+            # Items can only come from callbacks, so replay them from a local data: URL
+            yield scrapy.Request("data:,", callback=self._replay_checkpoint, dont_filter=True,
+                                 cb_kwargs={"events": completed})
+        for url, meta in pending:
+            yield self._request(url, self.parse_event, "event", meta=meta)
+
+    def _replay_checkpoint(self, response, events):
+        for event in events:
+            yield from self._filter_event(event)
+
+    def _request(self, url, callback, recipe, meta=None):
+        """Request `url`, flagged for rendering unless we are in HTTP mode"""
+        meta = dict(meta or {})
+        if self.mode == "render":
+            meta["render"] = recipe
+        return scrapy.Request(url, callback=callback, dont_filter=True, meta=meta)
+
+    def _render_fallback(self, response, recipe):
+        """Re-request a page through Selenium after the HTTP fast path came up empty"""
+        self.logger.info(f"No embedded data on {response.url}, falling back to Selenium")
+        self.crawler.stats.inc_value(f"fast_path/{recipe}_fallbacks")
+        return response.request.replace(meta={**response.request.meta, "render": recipe})
+
     def parse(self, response):
         """Parse the event listing page and extract event links"""
         self.logger.info(f"Parsing URL: {response.url}")
-        
-        try:
-            self.driver.get(response.url)
-            self.logger.info("Page loaded with Selenium")
-            
-            # Log page title to verify page loaded
-            self.logger.info(f"Page title: {self.driver.title}")
-            
-            # Wait for content to load
-            time.sleep(5)
-            
-            # Log page source length to verify content
-            page_source = self.driver.page_source
-            self.logger.info(f"Page source length: {len(page_source)} characters")
-            
-            # Scroll to trigger lazy loading
-            for i in range(5):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                
-                # Check for "Load More" button
-                try:
-                    load_more = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Load More') or contains(text(), 'Show More')]")
-                    if load_more.is_displayed():
-                        self.logger.info("Clicking 'Load More' button")
-                        load_more.click()
-                        time.sleep(2)
-                except:
-                    pass
-            
-            # Scroll back to top
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
-            
-            # Find event links
-            event_links = []
-            try:
-                # Try multiple selectors
-                selectors = [
-                    "//a[contains(@href, '/apj/smb/e/')]",
-                    "//a[contains(@href, '/e/')]",
-                    "//a[contains(@href, 'event')]",
-                ]
-                
-                for selector in selectors:
-                    try:
-                        links = self.driver.find_elements(By.XPATH, selector)
-                        if links:
-                            self.logger.info(f"Found {len(links)} links with selector: {selector}")
-                            event_links.extend(links)
-                            break
-                    except Exception as e:
-                        self.logger.warning(f"Selector {selector} failed: {str(e)}")
-                
-                if not event_links:
-                    self.logger.warning(f"No event links found on {response.url}")
-                    # Save screenshot for debugging
-                    try:
-                        screenshot_path = f"debug_screenshot_{response.url.split('=')[-1]}.png"
-                        self.driver.save_screenshot(screenshot_path)
-                        self.logger.info(f"Saved debug screenshot to {screenshot_path}")
-                    except:
-                        pass
-                    return
-                
-                # Extract unique URLs
-                registration_urls = set()
-                for link in event_links:
-                    try:
-                        href = link.get_attribute('href')
-                        if href and ('/e/' in href or 'event' in href.lower()):
-                            registration_urls.add(href)
-                    except:
-                        pass
-                
-                self.logger.info(f"Found {len(registration_urls)} unique event links on {response.url}")
-                
-                # Yield requests for each event
-                for registration_url in registration_urls:
-                    yield scrapy.Request(
-                        registration_url,
-                        callback=self.parse_event,
-                        dont_filter=True
-                    )
-                    
-            except Exception as e:
-                self.logger.error(f"Error finding event links: {str(e)}")
-                
-        except Exception as e:
-            self.logger.error(f"Error parsing page: {str(e)}")
+
+        scroll = response.meta.get("listing_scroll")
+        if scroll:
+            self._record_scroll(response.url, scroll)
+
+        # Rendered listings come with their event cards already extracted
+        event_cards = response.meta.get("event_cards")
+        if event_cards:
+            self.logger.info(f"Found {len(event_cards)} unique event links on {response.url}")
+            yield from self._parse_cards(event_cards)
+            self._listing_done(response.url)
+            return
+
+        if "render" in response.meta:
+            registration_urls = self._rendered_event_links(response)
+        else:
+            registration_urls = extract_event_links(response.text, response.url)
+            if not registration_urls:
+                yield self._render_fallback(response, "listing")
+                return
+            self.crawler.stats.inc_value("fast_path/listing_hits")
+
+        self.logger.info(f"Found {len(registration_urls)} unique event links on {response.url}")
+
+        # Yield requests for each event, replaying recently scraped ones from the cache
+        for registration_url in registration_urls:
+            cached = self.cache.get_fresh(registration_url) if self.cache else None
+            if cached is not None:
+                self.crawler.stats.inc_value("cache/hits")
+                yield from self._emit(cached)
+                continue
+            if self.cache:
+                self.crawler.stats.inc_value("cache/misses")
+            if self._first_request(registration_url):
+                yield self._event_request(registration_url)
+
+        self._listing_done(response.url)
+
+    def _listing_done(self, url):
+        """Checkpoint a listing once all of its events have been requested or scraped"""
+        if self.checkpoint:
+            self.checkpoint.listing_done(url)
+
+    def _record_scroll(self, url, scroll):
+        """Count the pages a listing loaded while scrolling, and whether it hit the step cap"""
+        self.crawler.stats.inc_value("listing/pages_loaded", scroll['pages_loaded'])
+        self.crawler.stats.inc_value("listing/scroll_steps", scroll['steps'])
+        self.crawler.stats.inc_value("listing/scroll_seconds", scroll['seconds'])
+        if scroll['stopped'] == "cap":
+            self.logger.warning(f"Stopped scrolling {url} at the step cap, more events may be unlisted")
+            self.crawler.stats.inc_value("listing/scroll_cap_reached")
+
+    def _parse_cards(self, event_cards):
+        """
+        Take events straight from complete listing cards. Other events are
+        replayed from the cache if their card is unchanged since their page
+        was last rendered, dropped if their card shows a recognized location
+        (online, or a known country) outside the wanted regions, and rendered
+        otherwise.
+        """
+        for card in event_cards:
+            card_hash = card_fingerprint(card)
+            event = extract_card_fields(card)
+            if all(event.values()):
+                self.crawler.stats.inc_value("cards/complete")
+                self._store(event, card_hash)
+                yield from self._emit(event)
+                continue
+
+            cached = self.cache.get_unchanged(card['url'], card_hash) if self.cache else None
+            if cached is not None:
+                self.crawler.stats.inc_value("cards/unchanged")
+                yield from self._emit(cached)
+                continue
+
+            # Only a location the card clearly states is trusted enough to skip the render
+            location = event['location']
+            if is_known_location(location) and not is_wanted_location(location, self.location_keywords):
+                self.logger.info(f"✗ Skipping event (location filter, not rendered): {event['event_name']}")
+                self.crawler.stats.inc_value("region/renders_saved")
+                continue
+
+            if not self._first_request(card['url']):
+                continue
+            self.crawler.stats.inc_value("cards/rendered")
+            yield self._event_request(card['url'], meta={"card_fingerprint": card_hash})
+
+    def _event_request(self, url, meta=None):
+        """Request an event page, recording it in the checkpoint until it is scraped"""
+        if self.checkpoint:
+            self.checkpoint.add_request(normalize_event_url(url), url, meta)
+        return self._request(url, self.parse_event, "event", meta=meta)
+
+    def _first_request(self, url):
+        """
+        True the first time an event page is requested in this crawl; repeats
+        of the same event listed under another region are counted and skipped
+        """
+        key = normalize_event_url(url)
+        if key not in self.requested_events:
+            self.requested_events.add(key)
+            return True
+        self.logger.info(f"Skipping duplicate event page: {url}")
+        self.crawler.stats.inc_value("dedupe/requests_avoided")
+        if self.mode == "render":
+            self.crawler.stats.inc_value("dedupe/renders_avoided")
+        return False
+
+    def _rendered_event_links(self, response):
+        """Unique event links in a rendered listing page"""
+        # Find event links, trying each selector until one matches
+        event_links = []
+        for selector in EVENT_LINK_SELECTORS:
+            event_links = response.xpath(f"{selector}/@href").getall()
+            if event_links:
+                self.logger.info(f"Found {len(event_links)} links with selector: {selector}")
+                break
+
+        if not event_links:
+            self.logger.warning(f"No event links found on {response.url}")
+
+        # Extract unique URLs
+        registration_urls = set()
+        for href in event_links:
+            if '/e/' in href or 'event' in href.lower():
+                registration_urls.add(response.urljoin(href))
+        return registration_urls
 
     def parse_event(self, response):
         """Parse individual event pages to extract event details"""
-        try:
-            self.logger.info(f"Loading event page: {response.url}")
-            
-            self.driver.get(response.url)
-            time.sleep(3)
-            
-            # Wait for event content
-            try:
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'BannerInformationEntry')]"))
-                )
-            except:
-                self.logger.warning(f"Timeout loading event content on {response.url}")
-            
-            event = {}
-            
-            # Get page source and parse with Scrapy
-            page_source = self.driver.page_source
-            selector = scrapy.Selector(text=page_source)
-            
-            # Event Name
-            event_name = selector.xpath('//h1/text()').get()
-            if not event_name:
-                event_name = selector.xpath('//h1[contains(@class, "Heading")]/text()').get()
-            event['event_name'] = event_name.strip() if event_name else ''
-            
-            # Extract date, time, and location
-            entries = selector.xpath('//div[contains(@class, "BannerInformationEntry")]')
-            
-            location = ''
-            date = ''
-            time_str = ''
-            
-            for entry in entries:
-                heading = entry.xpath('.//span[contains(@class, "BannerInformationEntryHeading")]/text()').get()
-                value_text = entry.xpath('.//div[contains(@class, "BannerInformationEntryValueContainer")]//text()').getall()
-                value = ' '.join([t.strip() for t in value_text if t.strip()])
-                
-                if heading and value:
-                    if 'Location' in heading:
-                        location = value
-                    elif 'Date' in heading:
-                        date = value
-                    elif 'Time' in heading:
-                        time_str = value
-            
-            event['location'] = location
-            event['date'] = date
-            event['time'] = time_str
-            event['registration_url'] = response.url
-
-        except Exception as e:
-            self.logger.error(f"Error parsing event {response.url}: {str(e)}")
-            event = {
-                'event_name': '',
-                'date': '',
-                'time': '',
-                'location': '',
-                'registration_url': response.url
-            }
+        event = self._parse_event_banner(response)
+
+        if not event.get('event_name') and "render" not in response.meta:
+            event = extract_event_from_json(response.text, response.url)
+            if event is None:
+                yield self._render_fallback(response, "event")
+                return
+            self.crawler.stats.inc_value("fast_path/event_hits")
+
+        self._store(event, response.meta.get("card_fingerprint"))
+        yield from self._emit(event)
 
+    def _store(self, event, card_fingerprint=None):
+        """Save a named event to the cache, counting events whose content changed"""
+        if self.cache and event.get('event_name'):
+            if self.cache.store(event, card_fingerprint=card_fingerprint):
+                self.crawler.stats.inc_value("cache/changed")
+
+    def _emit(self, event):
+        """
+        Yield a scraped event if it passes the filters, once per crawl, and
+        record it in the checkpoint
+        """
+        key = normalize_event_url(event['registration_url'])
+        if key in self.scraped_events:
+            return
+        self.scraped_events.add(key)
+        if self.checkpoint:
+            self.checkpoint.complete(key, event)
+        yield from self._filter_event(event)
+
+    def _filter_event(self, event):
+        """Yield `event` if it has a name and is in one of the wanted locations"""
         # Only yield if we have event name and it's in the right location
         if event.get('event_name'):
             location = event.get('location', '').lower()
             self.logger.info(f"Event: {event.get('event_name')}, Location: {location}")
-            if any(keyword.lower() in location for keyword in ['online', 'australia', 'new zealand']):
+            if is_wanted_location(location, self.location_keywords):
                 self.logger.info(f"✓ Yielding event: {event.get('event_name')}")
                 yield event
             else:
                 self.logger.info(f"✗ Skipping event (location filter): {event.get('event_name')}")
+                self.crawler.stats.inc_value("items/filtered_location")
         else:
-            self.logger.warning(f"Skipping event with no name: {response.url}")
-    
+            self.logger.warning(f"Skipping event with no name: {event.get('registration_url')}")
+            self.crawler.stats.inc_value("items/filtered_unnamed")
+
+    def _parse_event_banner(self, response):
+        """Extract name, date, time and location from an event page's banner"""
+        # Rendered event pages come with the banner already cut out of the DOM
+        fragment = response.meta.get("event_fragment")
+        return extract_event_details(fragment or response.selector, response.url)
+
     def closed(self, reason):
-        """Clean up Selenium driver when spider closes"""
-        if self.driver:
-            self.driver.quit()
-            self.logger.info("Chrome driver closed")
+        """Close the event cache, and the checkpoint (deleted unless the crawl was interrupted)"""
+        if self.cache:
+            self.cache.close()
+        if self.checkpoint:
+            self.checkpoint.close(finished=reason == "finished")
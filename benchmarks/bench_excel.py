@@ -0,0 +1,77 @@
+"""
+Benchmark for convert_data_to_excel_bytes.
+
+Converts synthetic scraped events (generated like the mock site's, including
+out-of-region ones the export filters out) at several dataset sizes. Each
+size runs in a fresh process, so the reported peak memory belongs to that
+size alone.
+
+    python -m benchmarks.bench_excel
+    python -m benchmarks.bench_excel --sizes 1000 10000 --repeat 5
+"""
+
+import argparse
+import time
+
+from benchmarks.common import peak_rss_mb, run_isolated, summarize, write_results
+from benchmarks.mock_site import generate_events
+
+
+def scraped_events(count, seed=0):
+    """Spider items for `count` generated events"""
+    return [{
+        "event_name": event["name"],
+        "date": event["date"],
+        "time": event["time"],
+        "location": event["location"],
+        "registration_url": f"https://aws-experience.com/apj/smb/e/{event['slug']}",
+    } for event in generate_events(count, seed)]
+
+
+def convert(size, repeat, seed):
+    """Time `repeat` conversions of `size` events in this process"""
+    from excel_convert import convert_data_to_excel_bytes
+
+    data = scraped_events(size, seed)
+    baseline = peak_rss_mb()
+    timings = []
+    output_bytes = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = convert_data_to_excel_bytes(data)
+        timings.append(time.perf_counter() - start)
+        output_bytes = len(output.getvalue())
+    best = min(timings)
+    return {
+        "name": str(size),
+        "rows": size,
+        "rows_per_second": round(size / best, 1),
+        "latency": summarize(timings),
+        "output_bytes": output_bytes,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_increase_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark convert_data_to_excel_bytes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/excel-<commit>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = run_isolated(convert, size, args.repeat, args.seed)
+        print(
+            f"{size:>7} rows: {result['rows_per_second']:>9.1f} rows/s, "
+            f"p50 {result['latency']['p50_ms']:.1f}ms, p90 {result['latency']['p90_ms']:.1f}ms, "
+            f"peak {result['peak_rss_mb']} MiB (+{result['peak_rss_increase_mb']})"
+        )
+        results.append(result)
+    write_results("excel", {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed}, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
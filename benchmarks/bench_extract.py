@@ -0,0 +1,122 @@
+"""
+Micro-benchmark for event-detail extraction.
+
+Parses saved event pages (the mock site's pages, padded with filler markup
+to the size of a rendered page) three ways:
+
+- `selector_page`: a fresh Selector over the whole page and separate
+  relative XPaths per banner entry, as the spider used to;
+- `compiled_page`: extract_event_details over the whole page;
+- `compiled_fragment`: extract_event_details over the name and banner
+  fragment the event recipe cuts out of the rendered DOM.
+
+All three must agree on every page.
+
+    python -m benchmarks.bench_extract --pages 500 --page-kb 300
+"""
+
+import argparse
+import time
+
+from parsel import Selector
+
+from benchmarks.common import summarize, write_results
+from benchmarks.mock_site import MockSite
+from EventScraper.extractors import extract_event_details
+from EventScraper.rendering import OUTER_BANNER_ENTRIES_XPATH
+
+
+FILLER = '<div class="Footer_column__p2Lq8"><a href="/apj/smb/about">About</a><span>{i}</span></div>\n'
+
+
+def extract_with_selector(html, url):
+    """The spider's previous banner parsing, kept as the baseline"""
+    response = Selector(text=html)
+    event = {}
+    event_name = response.xpath('//h1/text()').get()
+    if not event_name:
+        event_name = response.xpath('//h1[contains(@class, "Heading")]/text()').get()
+    event['event_name'] = event_name.strip() if event_name else ''
+    location = date = time_str = ''
+    for entry in response.xpath('//div[contains(@class, "BannerInformationEntry")]'):
+        heading = entry.xpath('.//span[contains(@class, "BannerInformationEntryHeading")]/text()').get()
+        value_text = entry.xpath('.//div[contains(@class, "BannerInformationEntryValueContainer")]//text()').getall()
+        value = ' '.join([t.strip() for t in value_text if t.strip()])
+        if heading and value:
+            if 'Location' in heading:
+                location = value
+            elif 'Date' in heading:
+                date = value
+            elif 'Time' in heading:
+                time_str = value
+    event['date'] = date
+    event['time'] = time_str
+    event['location'] = location
+    event['registration_url'] = url
+    return event
+
+
+def saved_pages(count, page_kb, seed=0):
+    """(url, page html, banner fragment) for `count` mock event pages"""
+    site = MockSite(count, seed)
+    pages = []
+    for event in site.events:
+        html = site.render_event(event)
+        filler, i = [], 0
+        while len(html) + sum(map(len, filler)) < page_kb * 1024:
+            filler.append(FILLER.format(i=i))
+            i += 1
+        html = html.replace('</body>', ''.join(filler) + '</body>')
+        # What EVENT_FRAGMENT_JS returns for the rendered page
+        page = Selector(text=html)
+        fragment = '<div>' + ''.join(page.xpath('//h1').getall()[:1] + page.xpath(OUTER_BANNER_ENTRIES_XPATH).getall()) + '</div>'
+        pages.append((f"https://aws-experience.com/apj/smb/e/{event['slug']}", html, fragment))
+    return pages
+
+
+CASES = {
+    "selector_page": lambda url, html, fragment: extract_with_selector(html, url),
+    "compiled_page": lambda url, html, fragment: extract_event_details(html, url),
+    "compiled_fragment": lambda url, html, fragment: extract_event_details(fragment, url),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event-detail extraction on saved event pages")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--page-kb", type=int, default=200, help="size each saved page is padded to")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/extract-<commit>.json)")
+    args = parser.parse_args()
+
+    pages = saved_pages(args.pages, args.page_kb, args.seed)
+    for url, html, fragment in pages:
+        expected = extract_with_selector(html, url)
+        for name, case in CASES.items():
+            if case(url, html, fragment) != expected:
+                raise SystemExit(f"{name} disagrees with the baseline on {url}")
+
+    results = []
+    for name, case in CASES.items():
+        timings = []
+        for _ in range(args.repeat):
+            for page in pages:
+                start = time.perf_counter()
+                case(*page)
+                timings.append(time.perf_counter() - start)
+        total = sum(timings) / args.repeat
+        result = {
+            "name": name,
+            "pages_per_second": round(len(pages) / total, 1),
+            "latency": summarize(timings),
+        }
+        print(f"{name:<18} {result['pages_per_second']:>9.1f} pages/s, "
+              f"p50 {result['latency']['p50_ms']:.3f}ms, p99 {result['latency']['p99_ms']:.3f}ms")
+        results.append(result)
+    params = {"pages": args.pages, "page_kb": args.page_kb, "repeat": args.repeat, "seed": args.seed}
+    write_results("extract", params, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+End-to-end spider benchmark against the local mock site.
+
+Starts benchmarks.mock_site, runs EventSpider over its listings in a fresh
+process per repetition, and reports crawl throughput (pages and items per
+second), per-page latency percentiles (taken from the crawl report) and the
+crawler's peak memory.
+
+    python -m benchmarks.bench_spider --events 500
+    python -m benchmarks.bench_spider --mode render --backend playwright
+
+HTTP mode needs nothing beyond the project requirements. Render mode needs
+Chrome (or Playwright's Chromium); its peak memory covers the crawler
+process only, not the browser.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import peak_rss_mb, run_isolated, summarize, write_results
+from benchmarks.mock_site import MockSite
+
+
+BACKENDS = {
+    "selenium": "EventScraper.backends.SeleniumBackend",
+    "playwright": "EventScraper.playwright_backend.PlaywrightBackend",
+}
+
+
+def page_seconds(record):
+    """Time spent fetching (or rendering) and parsing one response"""
+    fetch = sum(record["stages"].values()) if record["stages"] else record["download_latency"] or 0
+    return fetch + record["parse_seconds"]
+
+
+def crawl(params, start_urls):
+    """Run one crawl in this process and return its measurements"""
+    from scrapy.utils.project import get_project_settings
+
+    from run_scraper import run_spider
+
+    workdir = tempfile.mkdtemp(prefix="bench_spider_")
+    report_path = os.path.join(workdir, "crawl_report.json")
+    settings = get_project_settings()
+    settings.setdict({
+        "LOG_LEVEL": params["log_level"],
+        "ROBOTSTXT_OBEY": False,
+        "DOWNLOAD_DELAY": 0,
+        "AUTOTHROTTLE_ENABLED": False,
+        "HTTPCACHE_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+        "EVENT_CACHE_ENABLED": False,
+        # An aborted benchmark must not leave mock events for the next real run to resume
+        "CRAWL_CHECKPOINT_ENABLED": False,
+        "EVENTS_JSONL_PATH": os.path.join(workdir, "events.jsonl"),
+        "CRAWL_REPORT_PATH": report_path,
+        "RENDER_BACKEND": BACKENDS[params["backend"]],
+        "CONCURRENT_REQUESTS": params["concurrency"],
+        "CONCURRENT_REQUESTS_PER_DOMAIN": params["concurrency"],
+        "SELENIUM_POOL_SIZE": params["concurrency"],
+        "PLAYWRIGHT_MAX_PAGES": params["concurrency"],
+    }, priority="cmdline")
+
+    start = time.perf_counter()
+    items, stats = run_spider(settings=settings, mode=params["mode"], start_urls=",".join(start_urls))
+    elapsed = time.perf_counter() - start
+
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    records = report["urls"]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "finish_reason": stats.get("finish_reason"),
+        "responses": len(records),
+        "items": len(items),
+        "pages_per_second": round(len(records) / elapsed, 2),
+        "items_per_second": round(len(items) / elapsed, 2),
+        "page_latency": summarize([page_seconds(record) for record in records]),
+        "parse_latency": summarize([record["parse_seconds"] for record in records]),
+        "peak_rss_mb": peak_rss_mb(),
+        "totals": report["totals"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EventSpider against a local mock site")
+    parser.add_argument("--mode", choices=["http", "render"], default="http")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="selenium")
+    parser.add_argument("--events", type=int, default=200, help="events on the mock site")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cards", choices=["partial", "full", "none"], default="partial",
+                        help="what listing cards show (see MockSite)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/spider-<commit>.json)")
+    args = parser.parse_args()
+
+    params = {
+        "mode": args.mode,
+        "backend": args.backend,
+        "events": args.events,
+        "seed": args.seed,
+        "cards": args.cards,
+        "latency": args.latency,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "log_level": args.log_level,
+    }
+    runs = []
+    with MockSite(args.events, args.seed, args.cards, args.latency) as site:
+        for i in range(args.repeat):
+            result = run_isolated(crawl, params, site.listing_urls)
+            print(
+                f"run {i + 1}/{args.repeat}: {result['responses']} pages, {result['items']} items "
+                f"in {result['elapsed_seconds']:.2f}s ({result['pages_per_second']:.1f} pages/s), "
+                f"p50 {result['page_latency'].get('p50_ms')}ms, peak {result['peak_rss_mb']} MiB"
+            )
+            runs.append(result)
+
+    # The fastest run is the least disturbed by the rest of the machine
+    best = min(runs, key=lambda run: run["elapsed_seconds"])
+    results = [{"name": f"{args.mode}-{args.backend}" if args.mode == "render" else args.mode, **best,
+                "elapsed_seconds_all": [run["elapsed_seconds"] for run in runs]}]
+    write_results("spider", params, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark for the Parquet event store (event_store.py).
+
+Writes a year of daily snapshots of synthetic events into a temporary store.
+Each day a few events drop off the listing, new ones appear and some change
+date, time or location. The benchmark then times a diff between the first
+and last snapshot and a day-by-day diff across the whole year.
+
+    python -m benchmarks.bench_store
+    python -m benchmarks.bench_store --days 365 --events 2000 --churn 0.05
+"""
+
+import argparse
+import datetime
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_excel import scraped_events
+from benchmarks.common import summarize, write_results
+from event_store import diff_runs, iter_diffs, write_events_snapshot
+
+
+def daily_snapshots(days, events, churn, seed=0):
+    """(run date, scraped events) for `days` consecutive runs"""
+    rng = random.Random(seed)
+    replaced = max(1, int(events * churn))
+    pool = scraped_events(events + days * replaced, seed)
+    start = datetime.date(2026, 1, 1)
+    for day in range(days):
+        current = [dict(event) for event in pool[day * replaced:day * replaced + events]]
+        for event in rng.sample(current, replaced):
+            event['time'] = rng.choice(["09:00 - 12:00 GMT+11", "13:00 - 17:00 GMT+13", "01:00 - 03:00 UTC"])
+        yield start + datetime.timedelta(days=day), current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Parquet event store")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--events", type=int, default=1000, help="events listed on each day")
+    parser.add_argument("--churn", type=float, default=0.02,
+                        help="share of events added, removed and changed each day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/store-<commit>.json)")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_store_")
+    try:
+        write_timings = []
+        dates = []
+        for run_date, events in daily_snapshots(args.days, args.events, args.churn, args.seed):
+            start = time.perf_counter()
+            write_events_snapshot(events, root, run_date)
+            write_timings.append(time.perf_counter() - start)
+            dates.append(run_date)
+        store_bytes = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, names in os.walk(root) for name in names
+        )
+
+        start = time.perf_counter()
+        diff = diff_runs(root, dates[0], dates[-1])
+        first_last_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        diff_timings, changes = [], 0
+        previous = start
+        for _, _, day_diff in iter_diffs(root):
+            now = time.perf_counter()
+            diff_timings.append(now - previous)
+            previous = now
+            changes += sum(len(rows) for rows in day_diff.values())
+        year_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(root)
+
+    results = [
+        {"name": "write", "snapshots": len(dates), "store_bytes": store_bytes, "latency": summarize(write_timings)},
+        {"name": "diff_first_last", "seconds": round(first_last_seconds, 4),
+         "changes": sum(len(rows) for rows in diff.values())},
+        {"name": "diff_daily", "seconds": round(year_seconds, 3), "changes": changes,
+         "latency": summarize(diff_timings)},
+    ]
+    print(f"write:           {len(dates)} snapshots, {store_bytes / 1024:.0f} KiB, "
+          f"p50 {results[0]['latency']['p50_ms']:.1f}ms")
+    print(f"diff first/last: {first_last_seconds:.3f}s, {results[1]['changes']} changes")
+    print(f"diff daily:      {year_seconds:.3f}s for {len(diff_timings)} diffs, {changes} changes")
+    params = {"days": args.days, "events": args.events, "churn": args.churn, "seed": args.seed}
+    write_results("store", params, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Shared helpers for the benchmarks: timing summaries, peak memory and result
+files that can be compared across commits.
+
+Every benchmark writes one JSON file to benchmarks/results/ named after the
+benchmark and the current commit, recording the environment it ran in next
+to its results, so `python -m benchmarks.compare` can diff two runs.
+"""
+
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of `values` (pct in 0-100)"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = (len(values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def summarize(seconds):
+    """Latency summary, in milliseconds, of a list of timings in seconds"""
+    if not seconds:
+        return {}
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3),
+        "min_ms": round(min(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision():
+    """(commit, dirty) of the working tree, or (None, None) outside git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def write_results(benchmark, params, results, output=None):
+    """Save a benchmark run with its environment; returns the file path"""
+    commit, dirty = git_revision()
+    run = {
+        "benchmark": benchmark,
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{benchmark}-{commit or 'nogit'}{'-dirty' if dirty else ''}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {output}")
+    return output
+
+
+def run_isolated(func, *args):
+    """
+    Call `func(*args)` in a fresh interpreter and return its result, so
+    peak memory is measured per run and each crawl gets its own reactor.
+    """
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args).result()
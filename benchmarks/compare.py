@@ -0,0 +1,65 @@
+"""
+Compare two benchmark result files, e.g. before and after a change:
+
+    python -m benchmarks.compare benchmarks/results/excel-abc123.json benchmarks/results/excel-def456.json
+
+Prints every numeric metric both runs recorded for each result, with the
+relative change.
+"""
+
+import argparse
+import json
+
+
+def flatten(result, prefix=""):
+    """Numeric metrics of a result as {"dotted.key": value}"""
+    metrics = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[f"{prefix}{key}"] = value
+    return metrics
+
+
+def compare(base, head):
+    """Rows of (result, metric, base value, head value, change in %)"""
+    head_results = {result["name"]: result for result in head["results"]}
+    rows = []
+    for base_result in base["results"]:
+        head_result = head_results.get(base_result["name"])
+        if head_result is None:
+            continue
+        base_metrics, head_metrics = flatten(base_result), flatten(head_result)
+        for metric, before in base_metrics.items():
+            if metric not in head_metrics:
+                continue
+            after = head_metrics[metric]
+            change = (after - before) / before * 100 if before else None
+            rows.append((base_result["name"], metric, before, after, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    if base["benchmark"] != head["benchmark"]:
+        parser.error(f"Cannot compare a {base['benchmark']!r} run with a {head['benchmark']!r} run")
+    if base["params"] != head["params"]:
+        print(f"Warning: parameters differ\n  base: {base['params']}\n  head: {head['params']}")
+
+    print(f"{base['benchmark']}: {base['commit']} -> {head['commit']}")
+    for name, metric, before, after, change in compare(base, head):
+        change_str = f"{change:+.1f}%" if change is not None else "n/a"
+        print(f"  {name:<12} {metric:<32} {before:>14,.3f} {after:>14,.3f} {change_str:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Local mock of the aws-experience.com event pages.
+
+Serves listings at `/apj/smb/events?location=<region>` and event pages at
+`/apj/smb/e/<slug>`, built from the recorded page structure in
+`benchmarks/fixtures/`, so the spider can be run end to end without network
+access and with the same pages on every run.
+
+Events are generated from a seed, so a given (events, seed) pair always
+produces the same site. Listings carry both the rendered cards and the
+`__NEXT_DATA__` hydration state, and event pages both the banner and a
+schema.org ld+json Event, so HTTP and render modes are both exercised.
+
+Run standalone to point a browser or the spider at it:
+
+    python -m benchmarks.mock_site --port 8000 --events 200
+"""
+
+import argparse
+import datetime
+import html
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+from EventScraper.extractors import format_event_datetimes
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# ?location= value -> (display name, UTC offset in hours, share of events)
+REGIONS = {
+    "virtual": ("Online", 13, 0.4),
+    "AU": ("Australia", 11, 0.3),
+    "NZ": ("New Zealand", 13, 0.2),
+    "SG": ("Singapore", 8, 0.1),
+}
+
+VENUES = {
+    "AU": ["AWS Office, 2 Park St, Sydney", "Level 5, 8 Exhibition St, Melbourne", "1 Eagle St, Brisbane"],
+    "NZ": ["AWS Office, 1 Queen St, Auckland", "3 Lambton Quay, Wellington"],
+    "SG": ["23 Church St, Singapore"],
+}
+
+TOPICS = ["Generative AI", "Serverless", "Cost Optimisation", "Security", "Data Analytics",
+          "Migration", "Containers", "Machine Learning", "Startups", "Modernisation"]
+FORMATS = ["Workshop", "Webinar", "Immersion Day", "Roundtable", "Bootcamp", "Office Hours"]
+
+
+def _template(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def generate_events(count, seed=0):
+    """`count` deterministic events spread over REGIONS"""
+    rng = random.Random(seed)
+    regions = list(REGIONS)
+    weights = [REGIONS[region][2] for region in regions]
+    start_day = datetime.date(2026, 1, 5)
+    events = []
+    for i in range(count):
+        region = rng.choices(regions, weights)[0]
+        name, offset, _ = REGIONS[region]
+        tz = datetime.timezone(datetime.timedelta(hours=offset))
+        day = start_day + datetime.timedelta(days=rng.randrange(365))
+        start = datetime.datetime(day.year, day.month, day.day, rng.randrange(8, 17), rng.choice([0, 30]), tzinfo=tz)
+        end = start + datetime.timedelta(hours=rng.choice([1, 2, 4, 8]))
+        date, time_str = format_event_datetimes(start.isoformat(), end.isoformat())
+        location = "Online" if region == "virtual" else f"{name} - {rng.choice(VENUES[region])}"
+        events.append({
+            "slug": f"{rng.choice(TOPICS).lower().replace(' ', '-')}-{i:05d}",
+            "name": f"{rng.choice(TOPICS)} {rng.choice(FORMATS)} #{i}",
+            "region": region,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "date": date,
+            "time": time_str,
+            "location": location,
+        })
+    return events
+
+
+class MockSite:
+    """
+    A threaded HTTP server for a generated set of events.
+
+    `cards` controls what listing cards show: "partial" (date and location,
+    so every wanted event page has to be fetched), "full" (everything the
+    card fast path needs) or "none" (title only). `latency` adds a fixed
+    delay, in seconds, to every response.
+    """
+
+    def __init__(self, events=100, seed=0, cards="partial", latency=0.0, host="127.0.0.1", port=0):
+        self.events = generate_events(events, seed)
+        self.by_slug = {event["slug"]: event for event in self.events}
+        self.cards = cards
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server = None
+        self._thread = None
+        self._listing = _template("listing.html")
+        self._card = _template("card.html")
+        self._event = _template("event.html")
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    @property
+    def listing_urls(self):
+        return [f"{self.base_url}/apj/smb/events?location={region}" for region in REGIONS]
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                status, body = site.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path):
+        """(status, body) for a request path"""
+        url = urlparse(path)
+        if url.path == "/apj/smb/events":
+            region = (parse_qs(url.query).get("location") or [""])[0]
+            if region in REGIONS:
+                return 200, self.render_listing(region).encode("utf-8")
+        elif url.path.startswith("/apj/smb/e/"):
+            event = self.by_slug.get(url.path.rsplit("/", 1)[-1])
+            if event is not None:
+                return 200, self.render_event(event).encode("utf-8")
+        return 404, b"<html><body><h1>Not found</h1></body></html>"
+
+    def render_listing(self, region):
+        events = [event for event in self.events if event["region"] == region]
+        cards = "\n".join(self._card.substitute(
+            path=f"/apj/smb/e/{event['slug']}",
+            slug=event["slug"],
+            name=html.escape(event["name"]),
+            details=self._card_details(event),
+        ) for event in events)
+        next_data = {
+            "props": {"pageProps": {"events": [
+                {"title": event["name"], "url": f"/apj/smb/e/{event['slug']}"} for event in events
+            ]}},
+            "page": "/apj/smb/events",
+        }
+        return self._listing.substitute(
+            region_name=REGIONS[region][0],
+            cards=cards,
+            next_data=json.dumps(next_data).replace("/", "\\/"),
+        )
+
+    def _card_details(self, event):
+        if self.cards == "none":
+            return ""
+        lines = [event["date"]]
+        if self.cards == "full":
+            lines.append(event["time"])
+        lines.append(event["location"])
+        return "\n".join(f'          <div class="EventCard_detail__c7Ls2">{html.escape(line)}</div>' for line in lines)
+
+    def render_event(self, event):
+        location = {"@type": "VirtualLocation"} if event["region"] == "virtual" else {
+            "@type": "Place",
+            "name": event["location"].split(" - ", 1)[1],
+            "address": {"@type": "PostalAddress", "addressCountry": REGIONS[event["region"]][0]},
+        }
+        ld_json = {
+            "@context": "https://schema.org",
+            "@type": "Event",
+            "name": event["name"],
+            "startDate": event["start"],
+            "endDate": event["end"],
+            "location": location,
+        }
+        return self._event.substitute(
+            name=html.escape(event["name"]),
+            date=html.escape(event["date"]),
+            time=html.escape(event["time"]),
+            location=html.escape(event["location"]),
+            description=html.escape(f"Join us for {event['name']}. " * 20),
+            ld_json=json.dumps(ld_json),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local mock of the event listing and event pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cards", choices=["partial", "full", "none"], default="partial")
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    site = MockSite(args.events, args.seed, args.cards, args.latency, args.host, args.port).start()
+    print(f"Serving {len(site.events)} events at {site.base_url}")
+    for url in site.listing_urls:
+        print(f"  {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Columnar history of exported events, for answering "what changed since
+yesterday" without opening archived workbooks.
+
+Each run's normalized events (the same filtered, deduplicated rows the Excel
+export writes, see excel_convert.prepare_events) are saved as one Parquet
+file per run date:
+
+    event_store/run_date=2026-10-17/events.parquet
+
+Rows are keyed on the event's normalized registration URL and carry a
+64-bit hash of the columns that make up the event (name, date, time,
+location), so two snapshots are compared with one lookup of the keys and
+one vectorized hash comparison, without looking at the text.
+
+    python event_store.py runs
+    python event_store.py diff 2026-10-16 2026-10-17
+    python event_store.py history --since 2026-01-01
+
+This needs pyarrow (`pip install pyarrow`).
+"""
+
+import argparse
+import datetime
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from EventScraper.extractors import normalize_event_url
+from excel_convert import prepare_events
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+# Columns compared to decide whether an event changed between two runs
+CONTENT_COLUMNS = ['event_name', 'date', 'time', 'location']
+
+# Columns stored per event, besides `key` and `content_hash`
+STORED_COLUMNS = CONTENT_COLUMNS + ['registration_url', 'start', 'end', 'time_nz']
+
+PARTITION_RE = re.compile(r'^run_date=(\d{4}-\d{2}-\d{2})$')
+SNAPSHOT_FILE = 'events.parquet'
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("The event store needs pyarrow: pip install pyarrow")
+
+
+def _partition_path(root, run_date):
+    return os.path.join(root, f"run_date={run_date:%Y-%m-%d}", SNAPSHOT_FILE)
+
+
+def _as_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+def snapshot_frame(df):
+    """
+    Store layout for events prepared by excel_convert.prepare_events: one row
+    per key, sorted by key, with the content hash.
+    """
+    df = df.reindex(columns=STORED_COLUMNS)
+    for col in CONTENT_COLUMNS + ['registration_url', 'time_nz']:
+        df[col] = df[col].fillna('').astype(str)
+    # Events without a link fall back to the export's own dedupe key
+    fallback = df[CONTENT_COLUMNS].agg('|'.join, axis=1)
+    urls = df['registration_url'].map(lambda url: normalize_event_url(url) if url else '')
+    df.insert(0, 'key', urls.where(urls != '', fallback))
+    df['content_hash'] = pd.util.hash_pandas_object(df[CONTENT_COLUMNS], index=False).to_numpy()
+    df = df.drop_duplicates('key', keep='first').sort_values('key', kind='stable')
+    return df.reset_index(drop=True)
+
+
+def write_snapshot(df, root, run_date=None):
+    """
+    Save events prepared by excel_convert.prepare_events as the snapshot for
+    `run_date` (default: today), replacing an earlier snapshot of the same
+    day. Returns the file written.
+    """
+    _require_pyarrow()
+    run_date = _as_date(run_date or datetime.date.today())
+    path = _partition_path(root, run_date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written aside and moved into place, so readers never see half a file
+    tmp_path = f"{path}.tmp"
+    snapshot_frame(df).to_parquet(tmp_path, engine='pyarrow', index=False, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_events_snapshot(data_list, root, run_date=None, location_keywords=None):
+    """Prepare scraped events like the Excel export does and save them as a snapshot"""
+    df, _ = prepare_events(data_list, location_keywords=location_keywords)
+    return write_snapshot(df, root, run_date)
+
+
+def run_dates(root):
+    """Dates of every snapshot in the store, oldest first"""
+    if not os.path.isdir(root):
+        return []
+    dates = []
+    for name in os.listdir(root):
+        match = PARTITION_RE.match(name)
+        if match and os.path.exists(os.path.join(root, name, SNAPSHOT_FILE)):
+            dates.append(datetime.date.fromisoformat(match.group(1)))
+    return sorted(dates)
+
+
+def load_snapshot(root, run_date, columns=None):
+    """The snapshot saved for `run_date`, optionally reading only some columns"""
+    _require_pyarrow()
+    path = _partition_path(root, _as_date(run_date))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No snapshot for {run_date} in {root}")
+    if columns is not None:
+        columns = list(dict.fromkeys(['key', 'content_hash', *columns]))
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
+def diff_snapshots(base, head):
+    """
+    Events added, removed and changed between two snapshots.
+
+    Returns:
+        {"added": rows only in `head`, "removed": rows only in `base`,
+         "changed": one row per key whose content differs, with each
+         content column as `<column>_before` / `<column>_after`}
+    """
+    # Keys are unique within a snapshot, so one hash lookup matches every base
+    # row to its head row (-1 when it is gone); the rest is positional
+    positions = pd.Index(head['key']).get_indexer(base['key'])
+    kept = positions >= 0
+    in_base = np.zeros(len(head), dtype=bool)
+    in_base[positions[kept]] = True
+
+    base_kept = np.flatnonzero(kept)
+    head_kept = positions[kept]
+    differs = base['content_hash'].to_numpy()[base_kept] != head['content_hash'].to_numpy()[head_kept]
+    before = base.iloc[base_kept[differs]]
+    after = head.iloc[head_kept[differs]]
+    changed = pd.DataFrame({'key': before['key'].to_numpy()})
+    for col in CONTENT_COLUMNS:
+        changed[f'{col}_before'] = before[col].to_numpy()
+        changed[f'{col}_after'] = after[col].to_numpy()
+
+    return {
+        'added': head[~in_base].reset_index(drop=True),
+        'removed': base[~kept].reset_index(drop=True),
+        'changed': changed,
+    }
+
+
+def diff_runs(root, base_date, head_date):
+    """diff_snapshots between the snapshots saved for two run dates"""
+    return diff_snapshots(load_snapshot(root, base_date), load_snapshot(root, head_date))
+
+
+def iter_diffs(root, since=None, until=None):
+    """
+    Yield (base_date, head_date, diff) for each pair of consecutive runs
+    between `since` and `until`, reading every snapshot once.
+    """
+    dates = [
+        run_date for run_date in run_dates(root)
+        if (since is None or run_date >= _as_date(since)) and (until is None or run_date <= _as_date(until))
+    ]
+    previous = None
+    for run_date in dates:
+        snapshot = load_snapshot(root, run_date)
+        if previous is not None:
+            yield previous[0], run_date, diff_snapshots(previous[1], snapshot)
+        previous = (run_date, snapshot)
+
+
+def _print_diff(diff):
+    for row in diff['added'].itertuples():
+        print(f"  + {row.event_name} | {row.date} | {row.location}")
+    for row in diff['removed'].itertuples():
+        print(f"  - {row.event_name} | {row.date} | {row.location}")
+    for row in diff['changed'].to_dict('records'):
+        changes = ', '.join(
+            f"{col}: {row[f'{col}_before']!r} -> {row[f'{col}_after']!r}"
+            for col in CONTENT_COLUMNS if row[f'{col}_before'] != row[f'{col}_after']
+        )
+        print(f"  ~ {row['key']}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the event store")
+    parser.add_argument("--store", default="event_store", help="store directory (EVENT_STORE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("runs", help="list the saved run dates")
+    diff_parser = commands.add_parser("diff", help="events added, removed and changed between two runs")
+    diff_parser.add_argument("base")
+    diff_parser.add_argument("head")
+    history_parser = commands.add_parser("history", help="changes between each pair of consecutive runs")
+    history_parser.add_argument("--since")
+    history_parser.add_argument("--until")
+    args = parser.parse_args()
+
+    if args.command == "runs":
+        for run_date in run_dates(args.store):
+            print(run_date)
+    elif args.command == "diff":
+        try:
+            diff = diff_runs(args.store, args.base, args.head)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        print(f"{args.base} -> {args.head}: {len(diff['added'])} added, "
+              f"{len(diff['removed'])} removed, {len(diff['changed'])} changed")
+        _print_diff(diff)
+    else:
+        for base_date, head_date, diff in iter_diffs(args.store, args.since, args.until):
+            print(f"{base_date} -> {head_date}: {len(diff['added'])} added, "
+                  f"{len(diff['removed'])} removed, {len(diff['changed'])} changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,227 +1,378 @@
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
 import pandas as pd
 import datetime
-import pytz
+import functools
 import re
+from collections import OrderedDict
 from datetime import timezone, timedelta
 from io import BytesIO
+from zoneinfo import ZoneInfo
 
+from EventScraper.regions import LOCATION_KEYWORDS, ONLINE_LOCATIONS
 
-def convert_data_to_excel_bytes(data_list):
+
+# Text shown in the Event Link column
+LINK_TEXT = "Register Here"
+LINK_FONT = Font(color="0563C1", underline="single")
+
+# NZ timezone - automatically handles daylight saving. Scalar conversions use
+# zoneinfo; pandas gets the name so it can use its own vectorized tz database.
+NZ_TZ_NAME = 'Pacific/Auckland'
+NZ_TZ = ZoneInfo(NZ_TZ_NAME)
+
+# First "DD[st|nd|rd|th] Month YYYY" in a date or date range, "HH:MM - HH:MM"
+# time ranges and GMT/UTC offsets
+DATE_PATTERN = r'(\d+)(?:st|nd|rd|th)?\s+([A-Za-z]+)\s+(\d{4})'
+TIME_RANGE_PATTERN = r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})'
+OFFSET_PATTERN = r'GMT([+-])(\d+)(?::?(\d{2}))?|(UTC)'
+
+DATE_RE = re.compile(DATE_PATTERN)
+TIME_RANGE_RE = re.compile(TIME_RANGE_PATTERN)
+OFFSET_RE = re.compile(OFFSET_PATTERN)
+
+
+def hyperlink_cell(ws, url):
     """
-    Convert scraped event data directly to Excel format in memory.
-    Used by GitHub Actions to create Excel file from scraped JSON data.
+    Write-only "Register Here" cell linking to `url`.
+    
+    The link is a HYPERLINK formula rather than a native cell hyperlink, a
+    change from the original export that Excel, LibreOffice and Google Sheets
+    all display as the same clickable text. openpyxl registers each native
+    hyperlink as a sheet relationship in quadratic time (about 7s for 10k
+    rows, 24s for 20k), which would dominate the export for large archives.
+    URLs too long for a formula argument are written as plain text.
+    """
+    cell = WriteOnlyCell(ws)
+    url = str(url or '')
+    if url and len(url) <= 255:  # Excel's limit for formula string arguments
+        cell.value = f'=HYPERLINK("{url.replace(chr(34), chr(34) * 2)}", "{LINK_TEXT}")'
+    else:
+        cell.value = url
+    cell.font = LINK_FONT
+    return cell
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_event_date(date_str):
+    """First day of an event date or date range as a date, or None"""
+    match = DATE_RE.search(date_str or '')
+    if not match:
+        return None
+    try:
+        return datetime.datetime.strptime(' '.join(match.groups()), '%d %B %Y').date()
+    except ValueError:
+        return None
+
+
+def _convert_time(event_date, time_str):
+    """Uncached conversion of one time range on `event_date` to NZ time"""
+    time_range = TIME_RANGE_RE.search(time_str)
+    offset = OFFSET_RE.search(time_str)
+    if not time_range or not offset:
+        # No time range or timezone info, keep as is
+        return time_str
+
+    if offset.group(4):
+        offset_minutes = 0  # UTC
+    else:
+        offset_minutes = int(offset.group(2)) * 60 + int(offset.group(3) or 0)
+        if offset.group(1) == '-':
+            offset_minutes = -offset_minutes
+    event_tz = timezone(timedelta(minutes=offset_minutes))
+
+    start_hour, start_minute, end_hour, end_minute = map(int, time_range.groups())
+    midnight = datetime.datetime.combine(event_date, datetime.time(), tzinfo=event_tz)
+    start_nz = (midnight + timedelta(hours=start_hour, minutes=start_minute)).astimezone(NZ_TZ)
+    end_nz = (midnight + timedelta(hours=end_hour, minutes=end_minute)).astimezone(NZ_TZ)
+
+    # Format as 24-hour time with the timezone label in effect at the start (NZDT or NZST)
+    return f"{start_nz:%H:%M} - {end_nz:%H:%M} {start_nz.tzname()}"
+
+
+class TimeConversionCache:
+    """
+    Bounded LRU cache of NZ time conversions keyed on (event_date, time text).
+
+    Events repeat a handful of time slots, so one cache can be shared across
+    many conversions (e.g. regenerating months of archives); `hits` and
+    `misses` show how effective it was.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def convert(self, event_date, time_str):
+        """NZ-time text for `time_str` on `event_date` (a datetime.date)"""
+        key = (event_date, time_str)
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = _convert_time(event_date, time_str)
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+# Shared by callers that convert one event at a time (e.g. the streaming pipeline)
+DEFAULT_TIME_CACHE = TimeConversionCache()
+
+
+def convert_time_to_nz(value, date_str, cache=None):
+    """
+    Convert an event time such as '12:00 - 16:00 GMT+13' or '01:00 - 03:00 UTC'
+    to 24-hour NZ time with a NZDT/NZST label, using the event's date so that
+    daylight saving is applied correctly. Times without an offset are
+    returned unchanged. Results are memoized in `cache` (default:
+    DEFAULT_TIME_CACHE).
+    """
+    cache = DEFAULT_TIME_CACHE if cache is None else cache
+    try:
+        event_date = parse_event_date(date_str) or datetime.date.today()
+        return cache.convert(event_date, str(value))
+    except Exception as e:
+        print(f"Error converting time '{value}': {e}")
+        return value
+
+
+def normalize_events(df, today=None, time_cache=None):
+    """
+    Parse the free-text date and time columns in one vectorized pass.
+    
+    Adds typed columns to a copy of `df`:
+        start_date: first day of the event (NaT if the date can't be parsed)
+        start, end: event start/end as UTC timestamps (NaT if unknown)
+        time_nz: the Time column rendered in NZ time, e.g. "12:00 - 16:00 NZDT",
+                 or the original text when it has no usable time range/offset
+    
+    Events without a parseable date are converted using `today` (default: the
+    current date), matching how single times have always been handled.
+    
+    Scraped events repeat the same few date and time strings, so the text is
+    factorized and each distinct string is parsed only once; everything else is
+    array arithmetic over the whole column. If a TimeConversionCache is passed
+    as `time_cache`, time_nz is looked up in it once per distinct
+    (event date, time) pair instead, so repeated slots are reused across calls.
+    """
+    df = df.copy()
+    for col in ('date', 'time'):
+        if col not in df:
+            df[col] = ''
+    today = pd.Timestamp(today or datetime.date.today())
+    
+    # Dates: "Tuesday 24th February 2026 - Wednesday 25th February 2026" -> 2026-02-24
+    date_codes, date_values = pd.factorize(df['date'].fillna('').astype(str))
+    parts = pd.Series(date_values, dtype=object).str.extract(DATE_PATTERN)
+    unique_dates = pd.to_datetime(parts[0] + ' ' + parts[1] + ' ' + parts[2], format='%d %B %Y', errors='coerce')
+    df['start_date'] = unique_dates.to_numpy().take(date_codes)
+    
+    # Times: "12:00 - 16:00 GMT+13" -> start/end clock times and a UTC offset
+    time_codes, time_values = pd.factorize(df['time'].fillna('').astype(str))
+    unique_times = pd.Series(time_values, dtype=object)
+    time_range = unique_times.str.extract(TIME_RANGE_PATTERN)
+    offset = unique_times.str.extract(OFFSET_PATTERN)
+    sign = offset[0].map({'+': 1, '-': -1})
+    offset_minutes = sign * (pd.to_numeric(offset[1]) * 60 + pd.to_numeric(offset[2]).fillna(0))
+    offset_minutes = offset_minutes.mask(offset[3].notna(), 0)
+    offset_delta = pd.to_timedelta(offset_minutes, unit='m')
+    clock = time_range.apply(pd.to_numeric)
+    start_delta = (pd.to_timedelta(clock[0] * 60 + clock[1], unit='m') - offset_delta).to_numpy()
+    end_delta = (pd.to_timedelta(clock[2] * 60 + clock[3], unit='m') - offset_delta).to_numpy()
+    
+    base = df['start_date'].fillna(today)
+    df['start'] = (base + start_delta.take(time_codes)).dt.tz_localize('UTC')
+    df['end'] = (base + end_delta.take(time_codes)).dt.tz_localize('UTC')
+    
+    # NZ-local rendering, only where we have both times and an offset
+    df['time_nz'] = df['time']
+    if time_cache is not None and len(df):
+        n_times = len(time_values)
+        pair_codes, pairs = pd.factorize(date_codes.astype('int64') * n_times + time_codes)
+        event_dates = unique_dates.fillna(today).dt.date.to_numpy()
+        converted = [time_cache.convert(event_dates[pair // n_times], time_values[pair % n_times]) for pair in pairs]
+        df['time_nz'] = pd.Series(converted, dtype=object).to_numpy().take(pair_codes)
+        return df
+
+    valid = df['start'].notna() & df['end'].notna()
+    if valid.any():
+        start_nz = df.loc[valid, 'start'].dt.tz_convert(NZ_TZ_NAME)
+        end_nz = df.loc[valid, 'end'].dt.tz_convert(NZ_TZ_NAME)
+        
+        # Minutes past midnight (NZ) and the UTC offset in effect at the start;
+        # distinct combinations are few, so format each one once
+        start_minutes = (start_nz.dt.hour * 60 + start_nz.dt.minute).to_numpy()
+        end_minutes = (end_nz.dt.hour * 60 + end_nz.dt.minute).to_numpy()
+        local_offset = (start_nz.dt.tz_localize(None) - df.loc[valid, 'start'].dt.tz_localize(None)).to_numpy()
+        offset_codes, offsets = pd.factorize(local_offset)
+        keys = (start_minutes * 1440 + end_minutes) * len(offsets) + offset_codes
+        key_codes, _ = pd.factorize(keys)
+        
+        # Label with the abbreviation (NZDT or NZST) in effect at the start time
+        positions = pd.Series(range(len(keys))).groupby(key_codes).first().to_numpy()
+        labels = [
+            f"{start:%H:%M} - {end:%H:%M} {start.tzname()}"
+            for start, end in zip(start_nz.iloc[positions], end_nz.iloc[positions])
+        ]
+        df.loc[valid, 'time_nz'] = pd.Series(labels, dtype=object).to_numpy().take(key_codes)
+    
+    return df
+
+
+def location_pattern(keywords=None):
+    """Regex matching any of the wanted region keywords (see EventScraper.regions)"""
+    keywords = LOCATION_KEYWORDS if keywords is None else keywords
+    return '|'.join(re.escape(keyword.lower()) for keyword in keywords)
+
+
+def prepare_events(data_list, time_cache=None, location_keywords=None):
+    """
+    Filter, normalize, sort and dedupe scraped events for export.
     
     Args:
         data_list: List of dictionaries with keys: event_name, date, time, location, registration_url
+        time_cache: Optional TimeConversionCache (see normalize_events)
+        location_keywords: Region keywords to keep (default: EventScraper.regions.LOCATION_KEYWORDS)
         
     Returns:
-        BytesIO object containing the Excel file
+        (df, data_columns): the prepared DataFrame, including the typed columns
+        added by normalize_events, and the original data columns in order
     """
     
-    # Filter events: only keep New Zealand, Australia, or Online
-    filtered_data = []
-    for event in data_list:
-        location = event.get('location', '').lower()
-        if any(keyword in location for keyword in ['new zealand', 'australia', 'online']):
-            filtered_data.append(event)
-    
     # Convert list of dicts to pandas DataFrame
-    df = pd.DataFrame(filtered_data)
-    
-    # Sort by date (earliest to latest)
-    # Parse dates for sorting
-    def parse_date_for_sort(date_str):
-        """Parse date string to datetime for sorting"""
-        if not date_str:
-            return datetime.datetime.max  # Put empty dates at end
-        
-        try:
-            # Remove ordinal suffixes (st, nd, rd, th) for easier parsing
-            date_clean = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str)
-            
-            # Try different date formats
-            formats = [
-                '%A %d %B %Y',           # Tuesday 24 February 2026
-                '%A %d %B %Y - %A %d %B %Y',  # Range format
-            ]
-            
-            for fmt in formats:
-                try:
-                    parsed = datetime.datetime.strptime(date_clean, fmt)
-                    return parsed
-                except:
-                    continue
-            
-            # If all formats fail, try to extract just the date parts
-            # Format: "Day DDth Month YYYY" or "Day DDth Month YYYY - Day DDth Month YYYY"
-            match = re.search(r'(\d+)\s+(\w+)\s+(\d{4})', date_str)
-            if match:
-                day, month, year = match.groups()
-                date_str_simple = f"{day} {month} {year}"
-                return datetime.datetime.strptime(date_str_simple, '%d %B %Y')
-            
-            return datetime.datetime.max  # If parsing fails, put at end
-        except Exception as e:
-            print(f"Error parsing date '{date_str}': {e}")
-            return datetime.datetime.max
-    
-    df['_sort_date'] = df['date'].apply(parse_date_for_sort)
-    df = df.sort_values('_sort_date').reset_index(drop=True)  # Reset index after sorting
-    df = df.drop('_sort_date', axis=1)  # Remove temporary sort column
+    df = pd.DataFrame(data_list)
+    data_columns = list(df.columns)
+    
+    # Filter events: only keep the wanted regions (New Zealand, Australia, or Online)
+    if len(df):
+        locations = df['location'].fillna('').str.strip().str.lower()
+        # Like regions.is_wanted_location, 'Virtual' counts as online
+        locations = locations.mask(locations.isin(ONLINE_LOCATIONS), 'online')
+        df = df[locations.str.contains(location_pattern(location_keywords))]
+    
+    # Parse dates and times once into typed columns, used for sorting and for the Time column
+    df = normalize_events(df, time_cache=time_cache)
+    
+    # Sort by date (earliest to latest); unparseable or empty dates go last
+    df = df.sort_values(['start_date', 'start'], kind='stable', na_position='last').reset_index(drop=True)
     
     # Remove duplicate events based on event_name, location, date, and time
     # Keep the first occurrence of each unique event
     df = df.drop_duplicates(subset=['event_name', 'location', 'date', 'time'], keep='first')
     df = df.reset_index(drop=True)  # Reset index after deduplication
     
-    # Create a new Excel workbook in memory
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Events"
+    return df, data_columns
+
+
+def write_events_workbook(df, data_columns, output):
+    """
+    Stream prepared events (see prepare_events) into an Excel workbook.
+    
+    Uses openpyxl's write-only mode, so rows are serialized as they are
+    appended instead of being held as cell objects, and one shared link
+    font. Column widths are computed from the data up front, because a
+    write-only sheet needs them before its first row. Links are written as
+    HYPERLINK formulas, see hyperlink_cell.
+    
+    Args:
+        df, data_columns: as returned by prepare_events
+        output: file path or writable binary file object
+    """
+    
+    # Display values: the Time column shows the precomputed NZ time and
+    # registration_url is shown as a "Register Here" link
+    rows = df[data_columns].copy()
+    if 'time' in rows:
+        rows['time'] = df['time_nz']
     
     # Format column names: capitalize and remove underscores
     formatted_columns = []
-    for col in df.columns:
+    for col in data_columns:
         formatted_col = col.replace('_', ' ').title()
         if col == 'registration_url':
             formatted_col = 'Event Link'
         formatted_columns.append(formatted_col)
     
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Events")
+    
+    # Column widths for readability: longest value (or header) + 2, capped at 50
+    for col_idx, (col, header) in enumerate(zip(data_columns, formatted_columns), 1):
+        if not len(rows):
+            max_length = 0
+        elif col == 'registration_url':
+            max_length = len(LINK_TEXT)
+        else:
+            max_length = int(rows[col].astype(str).str.len().max())
+        max_length = max(max_length, len(header))
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
+    
     # Write headers to first row
-    for col_idx, col_name in enumerate(formatted_columns, 1):
-        ws.cell(row=1, column=col_idx, value=col_name)
-    
-    # NZ timezone - automatically handles daylight saving
-    nz_tz = pytz.timezone('Pacific/Auckland')
-    
-    # Write data rows (starting from row 2)
-    for row_idx, row in enumerate(df.itertuples(index=False), start=2):
-        for col_idx, (original_col, value) in enumerate(zip(df.columns, row), start=1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            
-            # Handle registration_url column - make it a clickable hyperlink
-            if original_col == 'registration_url':
-                cell.value = "Register Here"
-                cell.hyperlink = value
-                cell.font = Font(color="0563C1", underline="single")
-            
-            # Handle time column - convert to 24-hour NZ time with timezone label
-            elif original_col == 'time':
-                try:
-                    time_str = str(value)
-                    
-                    # Get event date from the 'date' column for accurate timezone conversion
-                    date_col_idx = list(df.columns).index('date')
-                    date_str = row[date_col_idx]
-                    event_date = datetime.date.today()
-                    
-                    if date_str:
-                        # Remove ordinal suffixes for parsing
-                        date_clean = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str)
-                        # Extract first date if it's a range
-                        match = re.search(r'(\d+)\s+(\w+)\s+(\d{4})', date_clean)
-                        if match:
-                            day, month, year = match.groups()
-                            date_str_simple = f"{day} {month} {year}"
-                            try:
-                                parsed_date = datetime.datetime.strptime(date_str_simple, '%d %B %Y')
-                                event_date = parsed_date.date()
-                            except:
-                                pass
-                    
-                    # Check if time has GMT offset
-                    if 'GMT' in time_str:
-                        # Extract the GMT offset (e.g., +13)
-                        gmt_match = re.search(r'GMT([+-]\d+)', time_str)
-                        if gmt_match:
-                            offset_str = gmt_match.group(1)
-                            offset_hours = int(offset_str)
-                            
-                            # Create timezone with this offset
-                            event_tz = timezone(timedelta(hours=offset_hours))
-                            
-                            # Get time part before GMT
-                            time_part = time_str.split('GMT')[0].strip()
-                            
-                            # Parse start and end times
-                            if ' - ' in time_part:
-                                start_time_str, end_time_str = time_part.split(' - ')
-                                start_time_str = start_time_str.strip()
-                                end_time_str = end_time_str.strip()
-                                
-                                # Convert start time to NZ timezone
-                                start_time_obj = datetime.datetime.strptime(start_time_str, '%H:%M').time()
-                                start_dt = datetime.datetime.combine(event_date, start_time_obj, tzinfo=event_tz)
-                                start_nz = start_dt.astimezone(nz_tz)
-                                
-                                # Convert end time to NZ timezone
-                                end_time_obj = datetime.datetime.strptime(end_time_str, '%H:%M').time()
-                                end_dt = datetime.datetime.combine(event_date, end_time_obj, tzinfo=event_tz)
-                                end_nz = end_dt.astimezone(nz_tz)
-                                
-                                # Get timezone name (NZDT or NZST)
-                                tz_name = start_nz.strftime('%Z')
-                                
-                                # Format as 24-hour time with timezone label
-                                cell.value = f"{start_nz.strftime('%H:%M')} - {end_nz.strftime('%H:%M')} {tz_name}"
-                            else:
-                                cell.value = value
-                        else:
-                            cell.value = value
-                    
-                    # If no GMT offset, assume it's already in UTC and convert to NZ time
-                    elif 'UTC' in time_str:
-                        # Extract time range
-                        time_match = re.search(r'(\d{2}:\d{2})\s*-\s*(\d{2}:\d{2})', time_str)
-                        if time_match:
-                            start_time_str = time_match.group(1)
-                            end_time_str = time_match.group(2)
-                            
-                            # Parse as UTC
-                            utc_tz = pytz.UTC
-                            start_time_obj = datetime.datetime.strptime(start_time_str, '%H:%M').time()
-                            start_dt = datetime.datetime.combine(event_date, start_time_obj, tzinfo=utc_tz)
-                            start_nz = start_dt.astimezone(nz_tz)
-                            
-                            end_time_obj = datetime.datetime.strptime(end_time_str, '%H:%M').time()
-                            end_dt = datetime.datetime.combine(event_date, end_time_obj, tzinfo=utc_tz)
-                            end_nz = end_dt.astimezone(nz_tz)
-                            
-                            # Get timezone name (NZDT or NZST)
-                            tz_name = start_nz.strftime('%Z')
-                            
-                            # Format as 24-hour time with timezone label
-                            cell.value = f"{start_nz.strftime('%H:%M')} - {end_nz.strftime('%H:%M')} {tz_name}"
-                        else:
-                            cell.value = value
-                    else:
-                        # No timezone info, keep as is
-                        cell.value = value
-                        
-                except Exception as e:
-                    print(f"Error converting time '{value}': {e}")
-                    cell.value = value
-            
-            else:
-                cell.value = value
-    
-    # Auto-adjust column widths for readability
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-    
-    # Save workbook to BytesIO (in-memory file)
+    ws.append(formatted_columns)
+    
+    # Write data rows; the link column needs a styled cell, everything else is plain values
+    link_idx = data_columns.index('registration_url') if 'registration_url' in data_columns else None
+    for row in rows.itertuples(index=False, name=None):
+        if link_idx is not None:
+            row = list(row)
+            row[link_idx] = hyperlink_cell(ws, row[link_idx])
+        ws.append(row)
+    
+    wb.save(output)
+
+
+def write_events_excel(data_list, output, time_cache=None, location_keywords=None):
+    """
+    Convert scraped event data to an Excel file written straight to `output`
+    (a file path or writable binary file object).
+    
+    Args:
+        data_list: List of dictionaries with keys: event_name, date, time, location, registration_url
+        output: file path or writable binary file object
+        time_cache: Optional TimeConversionCache to reuse NZ time conversions across calls
+        location_keywords: Region keywords to keep (default: EventScraper.regions.LOCATION_KEYWORDS)
+    """
+    df, data_columns = prepare_events(data_list, time_cache=time_cache, location_keywords=location_keywords)
+    write_events_workbook(df, data_columns, output)
+
+
+def convert_data_to_excel_bytes(data_list, time_cache=None, location_keywords=None):
+    """
+    Convert scraped event data directly to Excel format in memory.
+    Used by GitHub Actions to create Excel file from scraped JSON data.
+    
+    Args:
+        data_list: List of dictionaries with keys: event_name, date, time, location, registration_url
+        time_cache: Optional TimeConversionCache to reuse NZ time conversions across calls;
+                    its hits/misses counters show how often it was used
+        location_keywords: Region keywords to keep (default: EventScraper.regions.LOCATION_KEYWORDS)
+        
+    Returns:
+        BytesIO object containing the Excel file
+    """
     excel_buffer = BytesIO()
-    wb.save(excel_buffer)
+    write_events_excel(data_list, excel_buffer, time_cache=time_cache, location_keywords=location_keywords)
     excel_buffer.seek(0)
     
     return excel_buffer
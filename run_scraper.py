@@ -4,75 +4,255 @@ Simple script to run the scraper and convert output to Excel
 Updated: 2026-01-23 - Added comprehensive debugging
 """
 
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
 import os
-import subprocess
 import sys
+import time
 from datetime import datetime
-from excel_convert import convert_data_to_excel_bytes
-import json
+from urllib.parse import parse_qs, urlparse
+from event_store import write_snapshot
+from excel_convert import prepare_events, write_events_workbook
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.settings import Settings
+from scrapy.utils.project import get_project_settings
+
+from EventScraper.pipelines import event_key
+from EventScraper.spiders.events import EventSpider
+
+
+def run_spider(spider_name="Event", settings=None, **spider_kwargs):
+    """
+    Run a spider in this process and collect its items via signals.
+
+    Spider logs are streamed live by Scrapy's own logging. `settings`
+    defaults to the project settings.
+
+    Returns:
+        (items, stats): list of scraped item dicts and the crawler's stats dict
+    """
+    items = []
+
+    def collect_item(item, response, spider):
+        items.append(dict(item))
+
+    process = CrawlerProcess(settings or get_project_settings())
+    crawler = process.create_crawler(spider_name)
+    crawler.signals.connect(collect_item, signal=signals.item_scraped)
+    process.crawl(crawler, **spider_kwargs)
+    process.start()  # blocks until the crawl is finished
+
+    return items, crawler.stats.get_stats()
+
+
+def shard_name(url, index):
+    """Short name for the shard crawling `url`: its ?location= region, e.g. 'au'"""
+    values = parse_qs(urlparse(url).query).get('location')
+    return values[0].lower() if values else f"shard{index}"
+
+
+def _shard_path(path, shard):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{shard}{ext}"
+
+
+def shard_overrides(settings, shard, shard_count):
+    """
+    Settings for one shard's crawl: its own output, report and checkpoint
+    files and Chrome profiles, and an equal share of the browsers and concurrency of a
+    single-process run.
+    """
+    overrides = {}
+    for key in ("EVENTS_JSONL_PATH", "EVENTS_XLSX_PATH", "CRAWL_REPORT_PATH", "CRAWL_CHECKPOINT_PATH"):
+        if settings.get(key):
+            overrides[key] = _shard_path(settings.get(key), shard)
+    if settings.get("CHROME_USER_DATA_DIR"):
+        overrides["CHROME_USER_DATA_DIR"] = os.path.join(settings.get("CHROME_USER_DATA_DIR"), shard)
+    for key in ("SELENIUM_POOL_SIZE", "PLAYWRIGHT_MAX_PAGES", "CONCURRENT_REQUESTS_PER_DOMAIN"):
+        overrides[key] = max(1, settings.getint(key, 1) // shard_count)
+    return overrides
+
+
+def _crawl_shard(url, values):
+    """Worker process entry point: crawl a single listing with the given settings"""
+    return run_spider(settings=Settings(values), start_urls=url)
+
+
+def run_sharded(settings=None, start_urls=None, crawl=_crawl_shard):
+    """
+    Crawl each start URL (one region listing) in its own worker process,
+    with its own browser, all at the same time.
+
+    A shard that crashes or does not finish cleanly is re-run on its own, up
+    to SHARD_MAX_ATTEMPTS attempts with SHARD_RETRY_DELAY seconds between
+    them, while the shards that succeeded are kept.
+
+    `crawl(url, settings_dict)` runs in the worker and returns (items, stats);
+    it must be a module-level function so it can be sent to the process.
+
+    Returns:
+        (results, failed): {shard: (items, stats)} for the shards that
+        finished, and {shard: url} for those that never did
+    """
+    settings = settings or get_project_settings()
+    start_urls = start_urls or EventSpider.start_urls
+    shards = {}
+    for i, url in enumerate(start_urls):
+        name = shard_name(url, i)
+        shards[name if name not in shards else f"{name}{i}"] = url
+    max_attempts = settings.getint("SHARD_MAX_ATTEMPTS", 3)
+    retry_delay = settings.getfloat("SHARD_RETRY_DELAY", 60)
+    context = multiprocessing.get_context("spawn")
+
+    results = {}
+    pending = dict(shards)
+    for attempt in range(1, max_attempts + 1):
+        print(f"Attempt {attempt} of {max_attempts}: crawling shards {', '.join(pending)}")
+        # One pool per shard, so a worker that dies only breaks its own shard
+        executors = {shard: concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context)
+                     for shard in pending}
+        futures = {
+            shard: executors[shard].submit(
+                crawl, url, {**settings.copy_to_dict(), **shard_overrides(settings, shard, len(shards))}
+            )
+            for shard, url in pending.items()
+        }
+        for shard, future in futures.items():
+            try:
+                items, stats = future.result()
+            except Exception as e:
+                print(f"✗ Shard {shard} failed: {type(e).__name__}: {e}")
+                continue
+            finish_reason = stats.get('finish_reason')
+            if finish_reason != 'finished':
+                print(f"✗ Shard {shard} finished with reason {finish_reason!r}")
+                continue
+            print(f"✓ Shard {shard}: {len(items)} events")
+            results[shard] = (items, stats)
+        for executor in executors.values():
+            executor.shutdown()
+
+        pending = {shard: url for shard, url in pending.items() if shard not in results}
+        if not pending:
+            break
+        if attempt < max_attempts:
+            print(f"Retrying {len(pending)} failed shard(s) in {retry_delay:g}s...")
+            time.sleep(retry_delay)
+
+    # Keep shard order stable regardless of which attempt succeeded
+    return {shard: results[shard] for shard in shards if shard in results}, pending
+
+
+def merge_shards(results):
+    """
+    All shards' events in shard order, keeping the first copy of events
+    listed under more than one region, and their crawl stats added up.
+    """
+    events = []
+    seen = set()
+    stats = {}
+    for items, shard_stats in results.values():
+        for item in items:
+            key = event_key(item)
+            if key not in seen:
+                seen.add(key)
+                events.append(item)
+        for key, value in shard_stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stats[key] = stats.get(key, 0) + value
+    return events, stats
+
+
+def _run_sharded_crawl(settings, crawl=_crawl_shard):
+    """
+    Sharded crawl for main(): merged events and stats.
+
+    The merged events are written to EVENTS_JSONL_PATH even when some shard
+    never succeeded, but the finish reason then names the failed shards, so
+    main() exits without an Excel file or event store snapshot: a workbook
+    missing a whole region would pass for a complete one, and the snapshot
+    would show that region's events as removed.
+    """
+    results, failed = run_sharded(settings, crawl=crawl)
+    events, stats = merge_shards(results)
+
+    # One output file, as from a single-process run; shard files are merged into it
+    output_file = settings.get("EVENTS_JSONL_PATH")
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        for shard in results:
+            shard_file = _shard_path(output_file, shard)
+            if os.path.exists(shard_file):
+                os.remove(shard_file)
+
+    stats['finish_reason'] = 'finished' if not failed else f"shards failed: {', '.join(failed)}"
+    return events, stats
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Scrape AWS events and export them to Excel")
+    parser.add_argument("--sharded", action="store_true",
+                        help="crawl each region listing in its own process, retrying failed shards; "
+                             "no Excel file is written unless every shard succeeds")
+    args = parser.parse_args()
+
     print("Starting AWS Events Scraper...")
     print("=" * 50)
-    
-    # Run the spider
-    output_file = "events_output.json"
-    
-    print(f"Running Scrapy spider...")
-    result = subprocess.run(
-        ["scrapy", "crawl", "Event", "-o", output_file],
-        capture_output=True,
-        text=True
-    )
-    
-    # Print ALL output for debugging
-    if result.stdout:
-        print("\n=== FULL SPIDER OUTPUT ===")
-        print(result.stdout)
-        print("=== END SPIDER OUTPUT ===\n")
-    
-    if result.stderr:
-        print("\n=== SPIDER ERRORS ===")
-        print(result.stderr)
-        print("=== END ERRORS ===\n")
-    
-    if result.returncode != 0:
-        print("Error running spider:")
-        print(result.stderr)
+
+    settings = get_project_settings()
+    if args.sharded:
+        print(f"Running Scrapy spider, one process per region...")
+        events, stats = _run_sharded_crawl(settings)
+    else:
+        print(f"Running Scrapy spider...")
+        events, stats = run_spider(settings=settings)
+
+    print("\n=== CRAWL STATS ===")
+    for key in sorted(stats):
+        print(f"{key}: {stats[key]}")
+    print("=== END CRAWL STATS ===\n")
+
+    finish_reason = stats.get('finish_reason')
+    if finish_reason != 'finished':
+        print(f"Error running spider: finished with reason {finish_reason!r}")
         sys.exit(1)
-    
+
     print(f"✓ Spider completed")
-    
-    # Check if output file exists and has data
-    if not os.path.exists(output_file):
-        print("No output file generated")
-        sys.exit(1)
-    
-    # Load the scraped data
-    with open(output_file, 'r') as f:
-        events = json.load(f)
-    
     print(f"✓ Found {len(events)} events")
-    
+
     if len(events) == 0:
         print("No events found to convert")
         sys.exit(0)
-    
-    # Convert to Excel
+
+    # Convert to Excel, streaming straight to the output file
     print("Converting to Excel...")
-    excel_buffer = convert_data_to_excel_bytes(events)
-    
-    # Save Excel file
     excel_filename = f"aws_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    with open(excel_filename, 'wb') as f:
-        f.write(excel_buffer.getvalue())
-    
+    df, data_columns = prepare_events(events, location_keywords=settings.getlist("EVENT_LOCATION_KEYWORDS") or None)
+    write_events_workbook(df, data_columns, excel_filename)
+
     print(f"✓ Excel file saved: {excel_filename}")
+
+    # The same normalized events, as today's snapshot in the columnar store
+    store_path = settings.get("EVENT_STORE_PATH")
+    if store_path:
+        try:
+            snapshot_file = write_snapshot(df, store_path)
+        except ImportError as e:
+            print(f"✗ Event store snapshot skipped: {e}")
+        else:
+            print(f"✓ Event store snapshot saved: {snapshot_file}")
     print("=" * 50)
     print("Done!")
-    
-    # Clean up JSON file
-    os.remove(output_file)
+
+    # Clean up the streamed JSONL file; it is only kept when a run fails
+    output_file = settings.get("EVENTS_JSONL_PATH")
+    if output_file and os.path.exists(output_file):
+        os.remove(output_file)
 
 if __name__ == "__main__":
     main()
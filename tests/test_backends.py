@@ -0,0 +1,380 @@
+"""
+Both rendering backends against the local mock site (benchmarks.mock_site).
+
+The stub tests run the recipes on a Selenium driver and a Playwright page
+that fetch the mock site's pages over HTTP and answer the recipes' page
+scripts from the static DOM. StaticDocument reimplements those scripts in
+Python, so the stub tests cover the recipes, the backends and the spider
+callbacks, but NOT the JavaScript itself (EXTRACT_EVENT_CARDS_JS,
+EVENT_FRAGMENT_JS, ...).
+
+Only test_real_browser_crawls_mock_site runs that JavaScript, in Chrome and
+Playwright's Chromium. It is skipped where they are not installed, except in
+CI (.github/workflows/tests.yml), which installs both and sets
+REQUIRE_BROWSER_TESTS=1 to fail instead.
+"""
+
+import asyncio
+import importlib.util
+import os
+import shutil
+import urllib.request
+from urllib.parse import urljoin
+
+import lxml.html
+import pytest
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+from selenium.common.exceptions import NoSuchElementException
+
+import EventScraper.playwright_backend as playwright_backend
+from benchmarks.common import run_isolated
+from benchmarks.mock_site import MockSite
+from EventScraper.backends import SeleniumBackend
+from EventScraper.driver_pool import DriverPool
+from EventScraper.regions import is_wanted_location, listing_region
+from EventScraper.rendering import (
+    COUNT_EVENT_LINKS_JS,
+    EVENT_FRAGMENT_JS,
+    EXTRACT_EVENT_CARDS_JS,
+    RENDERERS,
+    RESOURCE_COUNT_JS,
+    TRANSFERRED_BYTES_JS,
+)
+from EventScraper.spiders.events import EventSpider
+
+
+SETTINGS = {
+    "RENDER_WAIT_TIMEOUT": 1,
+    "RENDER_STEP_TIMEOUT": 0.05,
+    "RENDER_POLL_INTERVAL": 0.01,
+    "RENDER_SETTLE_TIME": 0.02,
+    "RENDER_BLOCKED_RESOURCES": {},
+}
+
+CARD_HEADING_XPATH = (
+    './/*[self::h1 or self::h2 or self::h3 or self::h4 or self::h5'
+    ' or contains(@class, "Title") or contains(@class, "title")]'
+)
+
+
+class StaticDocument:
+    """A fetched page, answering the recipes' page scripts like a browser would for static HTML"""
+
+    def __init__(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.html = response.read().decode("utf-8")
+        self.url = url
+        self.root = lxml.html.fromstring(self.html)
+
+    @property
+    def title(self):
+        return self.root.findtext(".//title") or ""
+
+    def run(self, script, args):
+        if script == COUNT_EVENT_LINKS_JS:
+            return next((len(found) for found in map(self.root.xpath, args[0]) if found), 0)
+        if script == EXTRACT_EVENT_CARDS_JS:
+            return self.event_cards(*args)
+        if script == EVENT_FRAGMENT_JS:
+            entries = self.root.xpath(args[0])
+            if not entries:
+                return None
+            parts = self.root.xpath("//h1")[:1] + entries
+            return "<div>" + "".join(lxml.html.tostring(part, encoding="unicode", with_tail=False)
+                                     for part in parts) + "</div>"
+        if script == RESOURCE_COUNT_JS:
+            return 0
+        if script == TRANSFERRED_BYTES_JS:
+            return len(self.html.encode("utf-8"))
+        if "readyState" in script:
+            return "complete"
+        if "scrollTo" in script:
+            return None
+        raise AssertionError(f"Unexpected page script: {script[:80]}")
+
+    def link_urls(self, context, xpath):
+        return {urljoin(self.url, anchor.get("href")).split("#")[0] for anchor in context.xpath(xpath)}
+
+    def event_cards(self, selectors, max_lines):
+        """EXTRACT_EVENT_CARDS_JS: each event link with the text of its card"""
+        body = self.root.find("body")
+        for xpath in selectors:
+            anchors = self.root.xpath(xpath)
+            if not anchors:
+                continue
+            cards = {}
+            for anchor in anchors:
+                url = urljoin(self.url, anchor.get("href")).split("#")[0]
+                if url in cards or ("/e/" not in url and "event" not in url.lower()):
+                    continue
+                card = anchor
+                while card.getparent() is not None and card.getparent() is not body:
+                    if len(self.link_urls(card.getparent(), "." + xpath)) > 1:
+                        break
+                    card = card.getparent()
+                heading = card.xpath(CARD_HEADING_XPATH)
+                lines = [text.strip() for text in card.itertext() if text.strip()]
+                cards[url] = {
+                    "url": url,
+                    "title": (heading[0] if heading else anchor).text_content().strip(),
+                    "lines": lines[:max_lines],
+                }
+            return {"selector": xpath, "cards": list(cards.values())}
+        return {"selector": None, "cards": []}
+
+
+class StubElement:
+    def is_displayed(self):
+        return True
+
+
+class StubDriver:
+    """Selenium WebDriver stand-in over StaticDocument"""
+
+    capabilities = {}
+
+    def __init__(self, slot=0):
+        self.document = None
+
+    def get(self, url):
+        self.document = StaticDocument(url)
+
+    @property
+    def title(self):
+        return self.document.title
+
+    @property
+    def current_url(self):
+        return self.document.url
+
+    @property
+    def page_source(self):
+        return self.document.html
+
+    def execute_script(self, script, *args):
+        return self.document.run(script, args)
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def find_element(self, by, value):
+        if not self.document.root.xpath(value):
+            raise NoSuchElementException(value)
+        return StubElement()
+
+    def find_elements(self, by, value):
+        return [StubElement() for _ in self.document.root.xpath(value)]
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def save_screenshot(self, path):
+        pass
+
+    def quit(self):
+        pass
+
+
+class StubLocator:
+    def __init__(self, page, xpath):
+        self.page = page
+        self.xpath = xpath
+
+    async def count(self):
+        return len(self.page.document.root.xpath(self.xpath))
+
+
+class StubPage:
+    """Playwright Page stand-in over StaticDocument"""
+
+    def __init__(self):
+        self.document = None
+        self.closed = False
+
+    async def goto(self, url, wait_until=None):
+        self.document = StaticDocument(url)
+
+    async def title(self):
+        return self.document.title
+
+    async def content(self):
+        return self.document.html
+
+    async def evaluate(self, expression, args=()):
+        # run_script wraps each Selenium-style script body with _script()
+        for script in (COUNT_EVENT_LINKS_JS, EVENT_FRAGMENT_JS, EXTRACT_EVENT_CARDS_JS,
+                       RESOURCE_COUNT_JS, TRANSFERRED_BYTES_JS):
+            if expression == playwright_backend._script(script):
+                return self.document.run(script, args)
+        return self.document.run(expression, args)
+
+    def locator(self, selector):
+        return StubLocator(self, selector.removeprefix("xpath="))
+
+    def set_default_navigation_timeout(self, milliseconds):
+        pass
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def screenshot(self, path):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class StubContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        self.pages.append(StubPage())
+        return self.pages[-1]
+
+
+class StubBrowser:
+    def is_connected(self):
+        return True
+
+
+@pytest.fixture(scope="module")
+def site():
+    with MockSite(40, cards="partial") as site:
+        yield site
+
+
+def expected_items(site):
+    """The events a crawl of the mock site should yield"""
+    return {
+        f"{site.base_url}/apj/smb/e/{event['slug']}": {
+            "event_name": event["name"],
+            "date": event["date"],
+            "time": event["time"],
+            "location": event["location"],
+            "registration_url": f"{site.base_url}/apj/smb/e/{event['slug']}",
+        }
+        for event in site.events if is_wanted_location(event["location"])
+    }
+
+
+def selenium_backend():
+    return SeleniumBackend(Settings(SETTINGS), DriverPool(size=1, driver_factory=StubDriver))
+
+
+def playwright_stub_backend(monkeypatch):
+    monkeypatch.setattr(playwright_backend, "async_playwright", object())
+    monkeypatch.setattr(playwright_backend, "is_asyncio_reactor_installed", lambda: True)
+    backend = playwright_backend.PlaywrightBackend(Settings(SETTINGS))
+    backend._browser = StubBrowser()
+    backend._context = StubContext()
+    return backend
+
+
+def crawl_with(render, site):
+    """
+    Run the spider's render-mode callbacks over the mock site's listings,
+    rendering every page with `render(recipe, url)`
+    """
+    spider = EventSpider.from_crawler(get_crawler(EventSpider, {
+        "EVENT_CACHE_ENABLED": False, "CRAWL_CHECKPOINT_ENABLED": False,
+    }))
+    spider.mode = "render"
+
+    def response(request_url, recipe):
+        result = render(recipe, request_url)
+        return HtmlResponse(url=request_url, body=result.page_source, encoding="utf-8",
+                            request=spider._request(request_url, None, recipe, meta=result.extracted))
+
+    listings, items, requests = [], [], []
+    for url in site.listing_urls:
+        if not is_wanted_location(listing_region(url)):
+            continue
+        listing = response(url, "listing")
+        listings.append(listing)
+        for output in spider.parse(listing):
+            (items if isinstance(output, dict) else requests).append(output)
+    for request in requests:
+        items.extend(spider.parse_event(response(request.url, "event")))
+    return listings, items
+
+
+@pytest.mark.parametrize("backend_name", ["selenium", "playwright"])
+def test_stub_backend_renders_mock_site(backend_name, site, monkeypatch):
+    if backend_name == "selenium":
+        backend = selenium_backend()
+
+        def render(recipe, url):
+            return backend._render(RENDERERS[recipe], url, [])
+    else:
+        backend = playwright_stub_backend(monkeypatch)
+
+        def render(recipe, url):
+            return asyncio.run(backend.render(recipe, url, recipe))
+
+    listings, items = crawl_with(render, site)
+
+    for listing in listings:
+        cards = listing.meta["event_cards"]
+        listed = [event for event in site.events if listing.url.endswith(f"location={event['region']}")]
+        assert [card["title"] for card in cards] == [event["name"] for event in listed]
+        for card, event in zip(cards, listed):
+            assert card["url"] == f"{site.base_url}/apj/smb/e/{event['slug']}"
+            assert card["lines"] == [event["name"], event["date"], event["location"]]
+        assert listing.meta["listing_scroll"]["links"] == len(listed)
+
+    expected = expected_items(site)
+    assert {item["registration_url"]: item for item in items} == expected
+    assert len(items) == len(expected)
+    if backend_name == "playwright":
+        assert all(page.closed for page in backend._context.pages)
+
+
+def test_stub_event_fragment(site, monkeypatch):
+    event = next(event for event in site.events if event["region"] == "NZ")
+    url = f"{site.base_url}/apj/smb/e/{event['slug']}"
+
+    selenium_result = selenium_backend()._render(RENDERERS["event"], url, [])
+    playwright_result = asyncio.run(playwright_stub_backend(monkeypatch).render("event", url, "event"))
+
+    for result in (selenium_result, playwright_result):
+        fragment = result.extracted["event_fragment"]
+        assert fragment.startswith("<div><h1")
+        assert event["location"] in fragment
+        assert len(fragment) < len(result.page_source) / 2
+        assert result.transferred == len(result.page_source.encode("utf-8"))
+
+
+def chrome_installed():
+    return any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"))
+
+
+def playwright_chromium_installed():
+    if importlib.util.find_spec("playwright") is None:
+        return False
+    from playwright.sync_api import sync_playwright
+    try:
+        with sync_playwright() as playwright:
+            playwright.chromium.launch().close()
+    except Exception:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("backend_name, available", [
+    ("selenium", chrome_installed),
+    ("playwright", playwright_chromium_installed),
+])
+def test_real_browser_crawls_mock_site(backend_name, available, site):
+    if not available():
+        if os.environ.get("REQUIRE_BROWSER_TESTS") == "1":
+            pytest.fail(f"no browser for the {backend_name} backend")
+        pytest.skip(f"no browser for the {backend_name} backend")
+    from benchmarks.bench_spider import crawl
+
+    params = {"mode": "render", "backend": backend_name, "concurrency": 2, "log_level": "ERROR"}
+    result = run_isolated(crawl, params, site.listing_urls)
+    assert result["finish_reason"] == "finished"
+    assert result["items"] == len(expected_items(site))
@@ -0,0 +1,36 @@
+from EventScraper.cache import EventCache, card_fingerprint
+
+
+EVENT = {
+    "event_name": "Serverless Workshop",
+    "date": "Tuesday 24th February 2026",
+    "time": "12:00 - 16:00 GMT+13",
+    "location": "New Zealand - Auckland",
+    "registration_url": "https://aws-experience.com/apj/smb/e/abc123",
+}
+CARD = {"url": EVENT["registration_url"], "title": EVENT["event_name"], "lines": ["Serverless Workshop"]}
+
+
+def test_unchanged_card_replays_within_ttl(tmp_path):
+    cache = EventCache(str(tmp_path / "events.sqlite3"), ttl=3600)
+    cache.store(EVENT, now=1000, card_fingerprint=card_fingerprint(CARD))
+    assert cache.get_unchanged(EVENT["registration_url"], card_fingerprint(CARD), now=2000) == EVENT
+
+
+def test_changed_card_is_not_replayed(tmp_path):
+    cache = EventCache(str(tmp_path / "events.sqlite3"), ttl=3600)
+    cache.store(EVENT, now=1000, card_fingerprint=card_fingerprint(CARD))
+    changed = {**CARD, "lines": ["Serverless Workshop", "Tuesday 3rd March 2026"]}
+    assert cache.get_unchanged(EVENT["registration_url"], card_fingerprint(changed), now=2000) is None
+
+
+def test_unchanged_card_expires_with_ttl(tmp_path):
+    cache = EventCache(str(tmp_path / "events.sqlite3"), ttl=3600)
+    cache.store(EVENT, now=1000, card_fingerprint=card_fingerprint(CARD))
+    assert cache.get_unchanged(EVENT["registration_url"], card_fingerprint(CARD), now=1000 + 3601) is None
+
+
+def test_zero_ttl_never_replays(tmp_path):
+    cache = EventCache(str(tmp_path / "events.sqlite3"), ttl=0)
+    cache.store(EVENT, now=1000, card_fingerprint=card_fingerprint(CARD))
+    assert cache.get_unchanged(EVENT["registration_url"], card_fingerprint(CARD), now=1001) is None
@@ -0,0 +1,65 @@
+from EventScraper.checkpoint import CrawlCheckpoint, crawl_fingerprint
+
+
+ALL_LISTINGS = [
+    "https://aws-experience.com/apj/smb/events?location=virtual",
+    "https://aws-experience.com/apj/smb/events?location=AU",
+    "https://aws-experience.com/apj/smb/events?location=NZ",
+]
+EVENT = {
+    "event_name": "Serverless Workshop",
+    "location": "Online",
+    "registration_url": "https://aws-experience.com/apj/smb/e/abc123",
+}
+
+
+def interrupted_crawl(path, crawl):
+    checkpoint = CrawlCheckpoint(path, max_age=3600, crawl=crawl)
+    checkpoint.listing_done(ALL_LISTINGS[0])
+    checkpoint.add_request("https://aws-experience.com/apj/smb/e/def456", "https://aws-experience.com/apj/smb/e/def456")
+    checkpoint.complete("https://aws-experience.com/apj/smb/e/abc123", EVENT)
+    checkpoint.close(finished=False)
+
+
+def test_same_crawl_resumes(tmp_path):
+    path = str(tmp_path / "checkpoint.sqlite3")
+    crawl = crawl_fingerprint(ALL_LISTINGS, "render")
+    interrupted_crawl(path, crawl)
+
+    checkpoint = CrawlCheckpoint(path, max_age=3600, crawl=crawl)
+    assert checkpoint.resumed
+    assert checkpoint.is_listing_done(ALL_LISTINGS[0])
+    assert checkpoint.completed() == [EVENT]
+    assert [url for url, _ in checkpoint.pending()] == ["https://aws-experience.com/apj/smb/e/def456"]
+
+
+def test_other_listings_start_fresh(tmp_path):
+    path = str(tmp_path / "checkpoint.sqlite3")
+    interrupted_crawl(path, crawl_fingerprint(ALL_LISTINGS, "render"))
+
+    checkpoint = CrawlCheckpoint(path, max_age=3600, crawl=crawl_fingerprint(ALL_LISTINGS[2:], "render"))
+    assert not checkpoint.resumed
+    assert checkpoint.completed() == []
+
+
+def test_other_fetch_mode_starts_fresh(tmp_path):
+    path = str(tmp_path / "checkpoint.sqlite3")
+    interrupted_crawl(path, crawl_fingerprint(ALL_LISTINGS, "render"))
+
+    checkpoint = CrawlCheckpoint(path, max_age=3600, crawl=crawl_fingerprint(ALL_LISTINGS, "http"))
+    assert not checkpoint.resumed
+
+
+def test_expired_checkpoint_starts_fresh(tmp_path):
+    path = str(tmp_path / "checkpoint.sqlite3")
+    crawl = crawl_fingerprint(ALL_LISTINGS, "render")
+    interrupted_crawl(path, crawl)
+
+    checkpoint = CrawlCheckpoint(path, max_age=-1, crawl=crawl)
+    assert not checkpoint.resumed
+
+
+def test_finished_crawl_deletes_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint.sqlite3"
+    CrawlCheckpoint(str(path), max_age=3600).close(finished=True)
+    assert not path.exists()
@@ -0,0 +1,101 @@
+import pytest
+
+from EventScraper.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self, slot):
+        self.slot = slot
+        self.healthy = True
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise ConnectionError("browser is gone")
+        return 1
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeFactory:
+    """driver_factory recording every driver it starts"""
+
+    def __init__(self):
+        self.started = []
+
+    def __call__(self, slot):
+        self.started.append(FakeDriver(slot))
+        return self.started[-1]
+
+
+def render(pool, error=None):
+    """Check a driver out for one page, returning it"""
+    with pool.driver() as driver:
+        if error:
+            raise error
+        return driver
+
+
+def test_drivers_are_reused_and_started_lazily():
+    factory = FakeFactory()
+    pool = DriverPool(size=2, driver_factory=factory)
+    assert factory.started == []
+    first = render(pool)
+    assert render(pool) is first
+    assert len(factory.started) == 1
+
+
+def test_driver_recycled_after_max_pages():
+    factory = FakeFactory()
+    pool = DriverPool(size=1, max_pages_per_driver=2, driver_factory=factory)
+    first = render(pool)
+    assert render(pool) is first
+    assert first.quit_calls == 1  # worn out after its second page
+    second = render(pool)
+    assert second is not first and second.slot == first.slot == 0
+    assert pool.restarts == 0  # recycling a worn out driver is not a restart
+
+
+def test_driver_replaced_after_render_raises():
+    factory = FakeFactory()
+    pool = DriverPool(size=1, driver_factory=factory)
+    with pytest.raises(TimeoutError):
+        render(pool, TimeoutError("page load"))
+    crashed = factory.started[0]
+    assert crashed.quit_calls == 1
+    assert render(pool) is not crashed
+    assert pool.restarts == 1
+
+
+def test_unhealthy_driver_replaced_on_checkout():
+    factory = FakeFactory()
+    pool = DriverPool(size=1, driver_factory=factory)
+    first = render(pool)
+    first.healthy = False
+    second = render(pool)
+    assert second is not first
+    assert first.quit_calls == 1
+    assert pool.restarts == 1
+    assert len(factory.started) == 2
+
+
+def test_failed_start_frees_its_slot():
+    def no_chrome(slot):
+        raise RuntimeError("no chrome")
+
+    pool = DriverPool(size=1, driver_factory=no_chrome)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    pool.driver_factory = FakeFactory()
+    assert render(pool).slot == 0
+
+
+def test_close_quits_every_driver():
+    factory = FakeFactory()
+    pool = DriverPool(size=2, driver_factory=factory)
+    first, second = pool.acquire(), pool.acquire()
+    assert {first.slot, second.slot} == {0, 1}
+    pool.release(first)
+    pool.close()  # also quits the driver still checked out
+    assert [driver.quit_calls for driver in factory.started] == [1, 1]
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+
+import event_store
+from event_store import (
+    diff_runs,
+    diff_snapshots,
+    iter_diffs,
+    load_snapshot,
+    run_dates,
+    snapshot_frame,
+    write_events_snapshot,
+)
+from excel_convert import prepare_events
+
+
+needs_pyarrow = pytest.mark.skipif(event_store.pq is None, reason="the event store needs pyarrow")
+
+
+def event(slug, name=None, date="Tuesday 24th February 2026", time="12:00 - 16:00 GMT+13", location="Online"):
+    return {"event_name": name or f"Event {slug}", "date": date, "time": time, "location": location,
+            "registration_url": f"https://aws-experience.com/apj/smb/e/{slug}"}
+
+
+def snapshot(*events):
+    df, _ = prepare_events(list(events))
+    return snapshot_frame(df)
+
+
+def keys(rows):
+    return [key.rsplit("/", 1)[1] for key in rows["key"]]
+
+
+def test_added_removed_and_changed():
+    base = snapshot(event("kept"), event("gone"), event("moved"), event("renamed"))
+    head = snapshot(
+        event("kept"),
+        event("moved", time="13:00 - 17:00 GMT+13", location="New Zealand - Auckland"),
+        event("renamed", name="Renamed event"),
+        event("new"),
+    )
+    diff = diff_snapshots(base, head)
+
+    assert keys(diff["added"]) == ["new"]
+    assert keys(diff["removed"]) == ["gone"]
+    changed = diff["changed"].set_index("key")
+    assert keys(diff["changed"]) == ["moved", "renamed"]
+    moved = changed.loc["https://aws-experience.com/apj/smb/e/moved"]
+    assert (moved["time_before"], moved["time_after"]) == ("12:00 - 16:00 GMT+13", "13:00 - 17:00 GMT+13")
+    assert (moved["location_before"], moved["location_after"]) == ("Online", "New Zealand - Auckland")
+    assert moved["date_before"] == moved["date_after"]
+    renamed = changed.loc["https://aws-experience.com/apj/smb/e/renamed"]
+    assert (renamed["event_name_before"], renamed["event_name_after"]) == ("Event renamed", "Renamed event")
+
+
+def test_same_event_under_another_url_form_is_unchanged():
+    base = snapshot(event("abc"))
+    relinked = event("abc")
+    relinked["registration_url"] = "https://aws-experience.com/en/apj/smb/e/abc/?ref=nz"
+    diff = diff_snapshots(base, snapshot(relinked))
+    assert all(len(rows) == 0 for rows in diff.values())
+
+
+def test_identical_snapshots():
+    events = [event("a"), event("b", location="Australia - Sydney")]
+    diff = diff_snapshots(snapshot(*events), snapshot(*events))
+    assert all(len(rows) == 0 for rows in diff.values())
+    assert list(diff["changed"].columns) == [
+        "key", "event_name_before", "event_name_after", "date_before", "date_after",
+        "time_before", "time_after", "location_before", "location_after",
+    ]
+
+
+@needs_pyarrow
+def test_first_run_has_nothing_to_diff(tmp_path):
+    root = str(tmp_path / "event_store")
+    assert run_dates(root) == []
+    assert list(iter_diffs(root)) == []
+
+    write_events_snapshot([event("a"), event("b")], root, "2026-10-16")
+    assert run_dates(root) == [datetime.date(2026, 10, 16)]
+    assert list(iter_diffs(root)) == []
+    with pytest.raises(FileNotFoundError):
+        diff_runs(root, "2026-10-15", "2026-10-16")
+
+    # Everything in the first snapshot is new against an empty one
+    first = load_snapshot(root, "2026-10-16")
+    diff = diff_snapshots(first.iloc[:0], first)
+    assert keys(diff["added"]) == ["a", "b"]
+    assert len(diff["removed"]) == len(diff["changed"]) == 0
+
+
+@needs_pyarrow
+def test_diff_between_runs(tmp_path):
+    root = str(tmp_path / "event_store")
+    write_events_snapshot([event("a"), event("b")], root, "2026-10-16")
+    write_events_snapshot([event("b", time="09:00 - 12:00 GMT+13"), event("c")], root, "2026-10-17")
+    write_events_snapshot([event("b", time="09:00 - 12:00 GMT+13"), event("c")], root, "2026-10-18")
+
+    diff = diff_runs(root, "2026-10-16", "2026-10-17")
+    assert (keys(diff["added"]), keys(diff["removed"]), keys(diff["changed"])) == (["c"], ["a"], ["b"])
+
+    history = [(str(base), str(head), {kind: len(rows) for kind, rows in diff.items()})
+               for base, head, diff in iter_diffs(root)]
+    assert history == [
+        ("2026-10-16", "2026-10-17", {"added": 1, "removed": 1, "changed": 1}),
+        ("2026-10-17", "2026-10-18", {"added": 0, "removed": 0, "changed": 0}),
+    ]
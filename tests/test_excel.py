@@ -0,0 +1,233 @@
+import datetime
+import re
+from datetime import timedelta, timezone
+
+import openpyxl
+import pandas as pd
+import pytest
+import pytz
+
+from excel_convert import (
+    TimeConversionCache,
+    convert_data_to_excel_bytes,
+    normalize_events,
+    prepare_events,
+    write_events_excel,
+)
+
+
+TODAY = datetime.date(2026, 7, 1)
+
+
+def baseline_sort_date(date_str):
+    """Sort key of the original row-wise export (parse_date_for_sort)"""
+    if not date_str:
+        return None
+    date_clean = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str)
+    try:
+        return datetime.datetime.strptime(date_clean, '%A %d %B %Y').date()
+    except ValueError:
+        return None
+
+
+def baseline_time_nz(time_str, date_str, today=TODAY):
+    """The Time cell of the original row-wise export, for whole-hour GMT offsets and UTC"""
+    nz_tz = pytz.timezone('Pacific/Auckland')
+    event_date = today
+    match = re.search(r'(\d+)\s+(\w+)\s+(\d{4})', re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str or ''))
+    if match:
+        try:
+            event_date = datetime.datetime.strptime(' '.join(match.groups()), '%d %B %Y').date()
+        except ValueError:
+            pass
+
+    if 'GMT' in time_str:
+        gmt_match = re.search(r'GMT([+-]\d+)', time_str)
+        if not gmt_match or ' - ' not in time_str.split('GMT')[0]:
+            return time_str
+        tz = timezone(timedelta(hours=int(gmt_match.group(1))))
+        start_str, end_str = time_str.split('GMT')[0].strip().split(' - ')
+    elif 'UTC' in time_str:
+        time_match = re.search(r'(\d{2}:\d{2})\s*-\s*(\d{2}:\d{2})', time_str)
+        if not time_match:
+            return time_str
+        tz = pytz.UTC
+        start_str, end_str = time_match.groups()
+    else:
+        return time_str
+
+    def to_nz(clock):
+        time_obj = datetime.datetime.strptime(clock.strip(), '%H:%M').time()
+        return datetime.datetime.combine(event_date, time_obj, tzinfo=tz).astimezone(nz_tz)
+
+    start_nz, end_nz = to_nz(start_str), to_nz(end_str)
+    return f"{start_nz.strftime('%H:%M')} - {end_nz.strftime('%H:%M')} {start_nz.strftime('%Z')}"
+
+
+# (date, time) pairs the original export handled, around both 2026 NZ daylight
+# saving changes (NZDT ends 5 April 03:00, starts 27 September 02:00)
+BASELINE_CASES = [
+    ("Saturday 4th April 2026", "12:00 - 16:00 GMT+13"),
+    ("Sunday 5th April 2026", "01:00 - 04:00 GMT+13"),
+    ("Sunday 5th April 2026", "12:00 - 16:00 GMT+13"),
+    ("Saturday 26th September 2026", "23:00 - 23:59 GMT+12"),
+    ("Sunday 27th September 2026", "01:00 - 04:00 GMT+12"),
+    ("Sunday 27th September 2026", "13:00 - 14:00 GMT+12"),
+    ("Monday 6th April 2026", "01:00 - 03:00 UTC"),
+    ("Monday 28th September 2026", "22:00 - 23:30 UTC"),
+    ("Tuesday 24th February 2026", "15:30 - 21:00 GMT+11"),
+    ("Thursday 5th March 2026", "09:00 - 10:00 GMT-5"),
+    ("Friday 30th January 2026", "14:00 - 21:30"),
+    ("", "12:00 - 16:00 GMT+13"),
+    ("TBC", "01:00 - 03:00 UTC"),
+    ("Tuesday 24th February 2026", ""),
+    ("", ""),
+]
+
+
+def frame(pairs):
+    return pd.DataFrame([{"date": date, "time": time} for date, time in pairs])
+
+
+@pytest.mark.parametrize("time_cache", [None, TimeConversionCache()], ids=["vectorized", "cached"])
+def test_time_nz_matches_row_wise_export(time_cache):
+    df = normalize_events(frame(BASELINE_CASES), today=TODAY, time_cache=time_cache)
+    assert list(df['time_nz']) == [baseline_time_nz(time, date) for date, time in BASELINE_CASES]
+
+
+def test_dst_boundaries():
+    df = normalize_events(frame(BASELINE_CASES[:6]), today=TODAY)
+    assert list(df['time_nz']) == [
+        "12:00 - 16:00 NZDT",
+        "01:00 - 03:00 NZDT",  # the clocks go back at 03:00 NZDT
+        "11:00 - 15:00 NZST",
+        "23:00 - 23:59 NZST",
+        "01:00 - 05:00 NZST",  # the clocks go forward at 02:00 NZST
+        "14:00 - 15:00 NZDT",
+    ]
+
+
+def test_half_hour_offset_keeps_its_minutes():
+    # The row-wise export read GMT+5:30 as GMT+5, half an hour off
+    df = normalize_events(frame([("Tuesday 24th February 2026", "10:00 - 12:00 GMT+5:30")]), today=TODAY)
+    assert df['time_nz'][0] == "17:30 - 19:30 NZDT"
+    assert df['start'][0] == pd.Timestamp("2026-02-24 04:30", tz="UTC")
+    assert df['end'][0] == pd.Timestamp("2026-02-24 06:30", tz="UTC")
+
+
+def test_start_end_are_utc():
+    df = normalize_events(frame([
+        ("Sunday 5th April 2026", "12:00 - 16:00 GMT+13"),
+        ("Monday 6th April 2026", "01:00 - 03:00 UTC"),
+    ]), today=TODAY)
+    assert list(df['start']) == [pd.Timestamp("2026-04-04 23:00", tz="UTC"), pd.Timestamp("2026-04-06 01:00", tz="UTC")]
+    assert list(df['end']) == [pd.Timestamp("2026-04-05 03:00", tz="UTC"), pd.Timestamp("2026-04-06 03:00", tz="UTC")]
+
+
+def test_start_date_matches_row_wise_sort_key():
+    dates = [date for date, _ in BASELINE_CASES]
+    df = normalize_events(frame(BASELINE_CASES), today=TODAY)
+    start_dates = [None if pd.isna(value) else value.date() for value in df['start_date']]
+    assert start_dates == [baseline_sort_date(date) for date in dates]
+
+
+def test_blank_and_unparseable_dates():
+    df = normalize_events(frame([("", "12:00 - 16:00 GMT+13"), ("TBC", "14:00 - 21:30"), (None, None)]), today=TODAY)
+    assert df['start_date'].isna().all()
+    # Times are still converted using today's date, as before
+    assert df['start'][0] == pd.Timestamp("2026-06-30 23:00", tz="UTC")
+    assert df['start'][1:].isna().all()
+    assert list(df['time_nz'][:2]) == ["11:00 - 15:00 NZST", "14:00 - 21:30"]
+
+
+def test_date_range_uses_first_day():
+    df = normalize_events(frame([("Tuesday 24th February 2026 - Wednesday 25th February 2026", "")]), today=TODAY)
+    assert df['start_date'][0] == pd.Timestamp("2026-02-24")
+
+
+def test_past_events_are_kept_and_sorted_first():
+    # Neither the row-wise export nor normalize_events drops events that already happened
+    events = [
+        {"event_name": name, "date": date, "time": "", "location": "Online", "registration_url": ""}
+        for name, date in [("Later", "Tuesday 24th February 2026"), ("Undated", ""), ("Past", "Monday 3rd February 2020")]
+    ]
+    df, _ = prepare_events(events)
+    assert list(df['event_name']) == ["Past", "Later", "Undated"]
+
+
+def test_time_conversion_cache_counts_and_bounds():
+    cache = TimeConversionCache(maxsize=2)
+    feb24, feb25, feb26 = (datetime.date(2026, 2, day) for day in (24, 25, 26))
+
+    assert cache.convert(feb24, "12:00 - 16:00 GMT+13") == "12:00 - 16:00 NZDT"
+    assert cache.convert(feb24, "12:00 - 16:00 GMT+13") == "12:00 - 16:00 NZDT"
+    assert cache.info() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 2}
+
+    cache.convert(feb25, "12:00 - 16:00 GMT+13")
+    cache.convert(feb24, "12:00 - 16:00 GMT+13")  # feb24 is now the most recent
+    cache.convert(feb26, "12:00 - 16:00 GMT+13")  # evicts feb25, the least recent
+    assert cache.info() == {'hits': 2, 'misses': 3, 'size': 2, 'maxsize': 2}
+
+    cache.convert(feb24, "12:00 - 16:00 GMT+13")
+    assert cache.hits == 3
+    cache.convert(feb25, "12:00 - 16:00 GMT+13")
+    assert cache.misses == 4
+    assert cache.info()['size'] == 2
+
+    cache.clear()
+    assert cache.info() == {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2}
+
+
+def test_normalize_events_reuses_cached_slots():
+    cache = TimeConversionCache()
+    pairs = [("Tuesday 24th February 2026", "12:00 - 16:00 GMT+13")] * 3 + [("", "01:00 - 03:00 UTC")]
+    normalize_events(frame(pairs), today=TODAY, time_cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)  # each distinct (date, time) pair is looked up once
+    normalize_events(frame(pairs), today=TODAY, time_cache=cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_streamed_workbook_reads_back(tmp_path):
+    long_url = "https://aws-experience.com/apj/smb/e/" + "x" * 300
+    events = [
+        {"event_name": "Generative AI Immersion Day", "date": "Tuesday 24th February 2026",
+         "time": "12:00 - 16:00 GMT+13", "location": "New Zealand - Auckland",
+         "registration_url": 'https://aws-experience.com/apj/smb/e/abc?q="x"'},
+        {"event_name": "Serverless Day", "date": "Monday 23rd February 2026", "time": "15:30 - 21:00 GMT+11",
+         "location": "Australia - Level 12, 555 Collins St, Melbourne VIC 3000, a long address that is capped",
+         "registration_url": long_url},
+        {"event_name": "Singapore Day", "date": "Monday 23rd February 2026", "time": "",
+         "location": "Singapore - 23 Church St", "registration_url": "https://example.com/sg"},
+    ]
+    path = tmp_path / "events.xlsx"
+    write_events_excel(events, path)
+
+    ws = openpyxl.load_workbook(path)["Events"]
+    rows = list(ws.values)
+    assert rows[0] == ("Event Name", "Date", "Time", "Location", "Event Link")
+    assert len(rows) == 3
+    assert rows[1][:4] == ("Serverless Day", "Monday 23rd February 2026", "17:30 - 23:00 NZDT",
+                           events[1]["location"])
+    assert rows[2][2] == "12:00 - 16:00 NZDT"
+
+    assert rows[2][4] == '=HYPERLINK("https://aws-experience.com/apj/smb/e/abc?q=""x""", "Register Here")'
+    assert rows[1][4] == long_url  # too long for a formula argument
+    link = ws["E3"]
+    assert link.font.color.rgb.endswith("0563C1") and link.font.underline == "single"
+
+    widths = {letter: ws.column_dimensions[letter].width for letter in "ABCDE"}
+    assert widths == {
+        "A": len("Generative AI Immersion Day") + 2,
+        "B": len("Tuesday 24th February 2026") + 2,
+        "C": len("17:30 - 23:00 NZDT") + 2,
+        "D": 50,
+        "E": len("Register Here") + 2,
+    }
+
+
+def test_empty_workbook_has_headers():
+    ws = openpyxl.load_workbook(convert_data_to_excel_bytes([
+        {"event_name": "Singapore Day", "date": "", "time": "", "location": "Singapore", "registration_url": ""},
+    ]))["Events"]
+    assert list(ws.values) == [("Event Name", "Date", "Time", "Location", "Event Link")]
+    assert ws.column_dimensions["A"].width == len("Event Name") + 2
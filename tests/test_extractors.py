@@ -0,0 +1,193 @@
+import json
+import re
+
+import pytest
+
+from benchmarks.mock_site import MockSite
+from EventScraper.extractors import (
+    extract_card_fields,
+    extract_event_from_json,
+    extract_event_links,
+    normalize_event_url,
+)
+
+
+BASE_URL = "https://aws-experience.com/apj/smb/events?location=NZ"
+
+# Listing and event pages rendered from the recorded fixtures in benchmarks/fixtures
+SITE = MockSite(12)
+
+
+def card(*lines, title="Generative AI Immersion Day"):
+    return {"url": "https://aws-experience.com/apj/smb/e/abc123", "title": title, "lines": [title, *lines]}
+
+
+def test_complete_card():
+    event = extract_card_fields(card(
+        "Tuesday 24th February 2026",
+        "12:00 - 16:00 GMT+13",
+        "New Zealand - AWS Office, 1 Queen St, Auckland",
+    ))
+    assert event == {
+        "event_name": "Generative AI Immersion Day",
+        "date": "Tuesday 24th February 2026",
+        "time": "12:00 - 16:00 GMT+13",
+        "location": "New Zealand - AWS Office, 1 Queen St, Auckland",
+        "registration_url": "https://aws-experience.com/apj/smb/e/abc123",
+    }
+
+
+def test_online_card():
+    event = extract_card_fields(card("Online"))
+    assert event["location"] == "Online"
+
+
+def test_tag_line_is_not_a_location():
+    lines = (
+        "Immersion Day - Hands on",
+        "Tuesday 24th February 2026",
+        "12:00 - 16:00 GMT+13",
+        "New Zealand - Auckland",
+    )
+    assert extract_card_fields(card(*lines))["location"] == "New Zealand - Auckland"
+
+
+def test_card_with_only_a_tag_line_is_rendered():
+    event = extract_card_fields(card("Immersion Day - Hands on", "Tuesday 24th February 2026", "12:00 - 16:00 GMT+13"))
+    assert event["location"] == ""
+    assert not all(event.values())
+
+
+def test_card_fields_need_the_banner_formats():
+    event = extract_card_fields(card("New Zealand - Auckland", "12:00 - 16:00", "Tue 24 Feb"))
+    assert event["location"] == "New Zealand - Auckland"
+    # A time without its offset can't be converted to NZ time, and the date has no year
+    assert (event["time"], event["date"]) == ("", "")
+
+
+def test_title_only_card():
+    event = extract_card_fields({"url": "https://aws-experience.com/apj/smb/e/abc123", "title": " Builders Day "})
+    assert event == {
+        "event_name": "Builders Day",
+        "date": "",
+        "time": "",
+        "location": "",
+        "registration_url": "https://aws-experience.com/apj/smb/e/abc123",
+    }
+
+
+def event_url(event):
+    return f"https://aws-experience.com/apj/smb/e/{event['slug']}"
+
+
+def test_links_from_next_data():
+    html = SITE.render_listing("NZ")
+    # Only the JSON-escaped __NEXT_DATA__ state is left, as in the server HTML before hydration
+    html = re.sub(r'<div class="EventsPage_grid__a8Fz1">.*?</main>', '</main>', html, flags=re.DOTALL)
+    assert 'EventCard' not in html and '\\/apj\\/smb\\/e\\/' in html
+    expected = {event_url(event) for event in SITE.events if event["region"] == "NZ"}
+    assert expected and extract_event_links(html, BASE_URL) == expected
+
+
+def test_links_from_initial_state():
+    state = {"events": [{"href": "/apj/smb/e/abc123"}, {"href": "https://aws-experience.com/apj/smb/e/def456"}]}
+    html = f"<html><script>window.__INITIAL_STATE__ = {json.dumps(state)};</script></html>"
+    assert extract_event_links(html, BASE_URL) == {
+        "https://aws-experience.com/apj/smb/e/abc123",
+        "https://aws-experience.com/apj/smb/e/def456",
+    }
+
+
+def test_listing_without_event_links():
+    assert extract_event_links("<html><body><h1>Upcoming events</h1></body></html>", BASE_URL) == set()
+
+
+@pytest.mark.parametrize("event", SITE.events[:6], ids=lambda event: event["region"])
+def test_event_from_ld_json(event):
+    html = SITE.render_event(event)
+    # Drop the banner so the event can only come from the ld+json block
+    html = re.sub(r'<section class="Banner_banner__mS0p2">.*?</section>', '', html, flags=re.DOTALL)
+    assert extract_event_from_json(html, event_url(event)) == {
+        "event_name": event["name"],
+        "date": event["date"],
+        "time": event["time"],
+        "location": "Online" if event["region"] == "virtual" else event["location"],
+        "registration_url": event_url(event),
+    }
+
+
+def test_event_type_list_and_string_location():
+    data = {"@graph": [
+        {"@type": "Organization", "name": "AWS"},
+        {"@type": ["Event", "EducationEvent"], "name": " Builders Day ", "startDate": "2026-02-24T12:00:00+13:00",
+         "location": "New Zealand - Auckland"},
+    ]}
+    html = f'<script type="application/ld+json">{json.dumps(data)}</script>'
+    assert extract_event_from_json(html, "u") == {
+        "event_name": "Builders Day",
+        "date": "Tuesday 24th February 2026",
+        "time": "12:00 GMT+13",
+        "location": "New Zealand - Auckland",
+        "registration_url": "u",
+    }
+
+
+def test_malformed_json_is_skipped():
+    valid = {"@type": "Event", "name": "Builders Day", "startDate": "2026-02-24T12:00:00+13:00",
+             "endDate": "2026-02-24T16:00:00+13:00", "location": {"@type": "VirtualLocation"}}
+    html = (
+        '<script type="application/ld+json">{"@type": "Event", "name": </script>'
+        '<script>window.__INITIAL_STATE__ = {broken;</script>'
+        f'<script type="application/ld+json">{json.dumps(valid)}</script>'
+    )
+    event = extract_event_from_json(html, "u")
+    assert event["time"] == "12:00 - 16:00 GMT+13"
+    assert event["location"] == "Online"
+
+
+def test_bad_start_date_keeps_the_event():
+    html = '<script type="application/ld+json">{"@type": "Event", "name": "Builders Day", "startDate": "soon"}</script>'
+    event = extract_event_from_json(html, "u")
+    assert (event["event_name"], event["date"], event["time"]) == ("Builders Day", "", "")
+
+
+@pytest.mark.parametrize("html", [
+    "<html><body><h1>Builders Day</h1></body></html>",
+    '<script type="application/ld+json">{"@type": "Event", "name": </script>',
+    '<script type="application/ld+json">{"@type": "Event", "name": "No date"}</script>',
+    '<script type="application/ld+json">{"@type": "Organization", "name": "AWS", "startDate": "2026"}</script>',
+], ids=["no-json", "malformed", "no-start-date", "not-an-event"])
+def test_no_event_data_falls_back_to_rendering(html):
+    # None tells the spider to render the page instead
+    assert extract_event_from_json(html, "u") is None
+
+
+@pytest.mark.parametrize("url", [
+    "https://aws-experience.com/apj/smb/e/abc123",
+    "https://aws-experience.com/apj/smb/e/abc123?location=NZ&ref=listing",
+    "https://aws-experience.com/apj/smb/e/abc123#register",
+    "https://aws-experience.com/apj/smb/e/abc123/",
+    "https://aws-experience.com/en/apj/smb/e/abc123",
+    "https://aws-experience.com/en-au/apj/smb/e/abc123/?ref=nz#top",
+    "https://aws-experience.com/zh_tw/apj/smb/e/abc123",
+    "HTTPS://AWS-Experience.com/apj/smb/e/abc123",
+], ids=["plain", "query", "fragment", "trailing-slash", "locale", "everything", "locale-underscore", "case"])
+def test_normalize_event_url(url):
+    assert normalize_event_url(url) == "https://aws-experience.com/apj/smb/e/abc123"
+
+
+@pytest.mark.parametrize("url, key", [
+    # The event id itself is kept as is: ids are case sensitive, and may look like a locale
+    ("https://aws-experience.com/apj/smb/e/ABC123", "https://aws-experience.com/apj/smb/e/ABC123"),
+    ("https://aws-experience.com/apj/smb/e/en", "https://aws-experience.com/apj/smb/e/en"),
+    # Only segments before /e/ can be locales
+    ("https://aws-experience.com/apj/smb/e/abc123/en", "https://aws-experience.com/apj/smb/e/abc123/en"),
+    ("http://localhost:8000/apj/smb/e/abc123", "http://localhost:8000/apj/smb/e/abc123"),
+])
+def test_normalize_event_url_keeps_event_path(url, key):
+    assert normalize_event_url(url) == key
+
+
+def test_different_events_keep_different_keys():
+    assert normalize_event_url("https://aws-experience.com/apj/smb/e/abc123") != \
+        normalize_event_url("https://aws-experience.com/apj/smb/e/abc124")
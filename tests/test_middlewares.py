@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from scrapy import Request
+from scrapy.utils.test import get_crawler
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from EventScraper.backends import RenderBackend, RenderResult, SeleniumBackend
+from EventScraper.middlewares import RenderMiddleware
+from EventScraper.rendering import WaitProfiler
+from EventScraper.spiders.events import EventSpider
+
+
+class StubBackend(RenderBackend):
+    """Fails with each of `errors` in turn, then renders a fixed page"""
+
+    recipes = ("listing", "event")
+    transient_errors = SeleniumBackend.transient_errors
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def render(self, recipe, url, profile):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return RenderResult("<html><body><h1>Event</h1></body></html>", {}, WaitProfiler(None))
+
+
+def render(errors, max_retries=2, retry_backoff=2):
+    """Render one event page through RenderMiddleware, recording the backoff delays instead of sleeping"""
+    crawler = get_crawler(EventSpider)
+    crawler.stats.open_spider(None)
+    backend = StubBackend(errors)
+    middleware = RenderMiddleware(backend, crawler.stats, max_retries=max_retries, retry_backoff=retry_backoff)
+    middleware.first_page_seen = True
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    middleware._sleep = sleep
+    request = Request("https://aws-experience.com/apj/smb/e/abc123", meta={"render": "event"})
+    spider = EventSpider.from_crawler(crawler)
+    try:
+        response = asyncio.run(middleware.process_request(request, spider))
+    except Exception as e:
+        response = e
+    return response, backend, delays, crawler.stats
+
+
+def test_transient_errors_are_retried_with_backoff():
+    response, backend, delays, stats = render([TimeoutException("page load"), WebDriverException("tab crashed")])
+    assert response.url == "https://aws-experience.com/apj/smb/e/abc123"
+    assert response.request.meta["render_retries"] == 2
+    assert backend.calls == 3
+    assert delays == [2, 4]
+    assert stats.get_value("render/retries") == 2
+    assert stats.get_value("render/event/retries") == 2
+    assert stats.get_value("render/retry_reason/TimeoutException") == 1
+    assert stats.get_value("render/retry_reason/WebDriverException") == 1
+
+
+def test_gives_up_after_max_retries():
+    error = TimeoutError("page load")
+    response, backend, delays, stats = render([error] * 4, max_retries=2, retry_backoff=0.5)
+    assert response is error
+    assert backend.calls == 3
+    assert delays == [0.5, 1]
+    assert stats.get_value("render/retries") == 2
+    assert stats.get_value("render/event/failed") == 1
+
+
+@pytest.mark.parametrize("error", [TypeError("bad argument"), KeyError("extracted")])
+def test_other_errors_are_not_retried(error):
+    response, backend, delays, stats = render([error])
+    assert response is error
+    assert backend.calls == 1
+    assert delays == []
+    assert stats.get_value("render/retries") is None
@@ -0,0 +1,29 @@
+from EventScraper.regions import is_known_location, is_wanted_location, listing_region
+
+
+def test_known_locations():
+    assert is_known_location("Online")
+    assert is_known_location("New Zealand - AWS Office, 1 Queen St, Auckland")
+    assert is_known_location("singapore - 23 Church St")
+
+
+def test_tag_lines_are_not_known_locations():
+    assert not is_known_location("Immersion Day - Hands on")
+    assert not is_known_location("Level 300 - Advanced")
+    assert not is_known_location("")
+
+
+def test_wanted_locations():
+    assert is_wanted_location("Australia - Level 12, 555 Collins St, Melbourne VIC 3000")
+    assert not is_wanted_location("Malaysia - KUL Langkawi & Redang Room")
+
+
+def test_listing_region():
+    assert listing_region("https://aws-experience.com/apj/smb/events?location=NZ") == "new zealand"
+    assert listing_region("https://aws-experience.com/apj/smb/events") is None
+
+
+def test_online_locations_are_wanted():
+    assert is_wanted_location("Virtual")
+    assert is_wanted_location(" online ")
+    assert not is_wanted_location("Virtual", keywords=["australia"])
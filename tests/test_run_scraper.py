@@ -0,0 +1,137 @@
+import json
+import os
+import sys
+
+import pytest
+from scrapy.settings import Settings
+
+import run_scraper
+from run_scraper import _run_sharded_crawl, merge_shards, run_sharded, shard_name, shard_overrides
+
+
+START_URLS = [
+    "https://aws-experience.com/apj/smb/events?location=virtual",
+    "https://aws-experience.com/apj/smb/events?location=AU",
+    "https://aws-experience.com/apj/smb/events?location=NZ",
+]
+
+
+def event(slug, location):
+    return {"event_name": f"Event {slug}", "date": "Tuesday 24th February 2026", "time": "12:00 - 16:00 GMT+13",
+            "location": location, "registration_url": f"https://aws-experience.com/apj/smb/e/{slug}"}
+
+
+def fake_crawl(url, values):
+    """
+    Worker standing in for a crawl of one listing: each region lists one event
+    of its own plus one shared by every region. Shards named in
+    TEST_FLAKY_SHARDS crash on their first attempt, those in
+    TEST_FAILING_SHARDS never finish.
+    """
+    shard = url.rsplit("=", 1)[1].lower()
+    marker = os.path.join(values["TEST_MARKER_DIR"], shard)
+    attempts = os.path.getsize(marker) if os.path.exists(marker) else 0
+    with open(marker, "a") as f:
+        f.write("x")
+    if shard in values.get("TEST_FLAKY_SHARDS", ()) and not attempts:
+        raise RuntimeError("Chrome crashed")
+    if shard in values.get("TEST_FAILING_SHARDS", ()):
+        return [], {"finish_reason": "shutdown"}
+    items = [event(shard, "Online"), event("shared", "Online")]
+    stats = {"finish_reason": "finished", "item_scraped_count": len(items), "pool_size": values["SELENIUM_POOL_SIZE"]}
+    return items, stats
+
+
+def attempts(tmp_path):
+    """Times each shard's worker ran"""
+    return {shard: (tmp_path / shard).stat().st_size for shard in ("virtual", "au", "nz") if (tmp_path / shard).exists()}
+
+
+def shard_settings(tmp_path, **values):
+    return Settings({
+        "SHARD_MAX_ATTEMPTS": 3,
+        "SHARD_RETRY_DELAY": 0,
+        "SELENIUM_POOL_SIZE": 6,
+        "TEST_MARKER_DIR": str(tmp_path),
+        **values,
+    })
+
+
+def test_shard_names():
+    assert [shard_name(url, i) for i, url in enumerate(START_URLS)] == ["virtual", "au", "nz"]
+    assert shard_name("https://aws-experience.com/apj/smb/events", 3) == "shard3"
+
+
+def test_shard_overrides():
+    settings = Settings({
+        "EVENTS_JSONL_PATH": "events_output.jsonl",
+        "EVENTS_XLSX_PATH": "",
+        "CRAWL_REPORT_PATH": "reports/crawl_report.json",
+        "CRAWL_CHECKPOINT_PATH": ".cache/checkpoint.sqlite3",
+        "CHROME_USER_DATA_DIR": ".cache/chrome",
+        "SELENIUM_POOL_SIZE": 4,
+        "PLAYWRIGHT_MAX_PAGES": 8,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+    })
+    assert shard_overrides(settings, "au", 3) == {
+        "EVENTS_JSONL_PATH": "events_output.au.jsonl",
+        "CRAWL_REPORT_PATH": "reports/crawl_report.au.json",
+        "CRAWL_CHECKPOINT_PATH": ".cache/checkpoint.au.sqlite3",
+        "CHROME_USER_DATA_DIR": os.path.join(".cache/chrome", "au"),
+        "SELENIUM_POOL_SIZE": 1,
+        "PLAYWRIGHT_MAX_PAGES": 2,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+    }
+
+
+def test_merge_shards_dedupes_and_adds_stats():
+    results = {
+        "au": ([event("au", "Australia - Sydney"), event("shared", "Online")],
+               {"item_scraped_count": 2, "finish_reason": "finished", "elapsed_time_seconds": 1.5}),
+        "nz": ([event("shared", "Online"), event("nz", "New Zealand - Auckland")],
+               {"item_scraped_count": 2, "finish_reason": "finished", "elapsed_time_seconds": 2.0}),
+    }
+    events, stats = merge_shards(results)
+    assert [item["registration_url"].rsplit("/", 1)[1] for item in events] == ["au", "shared", "nz"]
+    assert stats == {"item_scraped_count": 4, "elapsed_time_seconds": 3.5}
+
+
+def test_run_sharded_splits_start_urls(tmp_path):
+    results, failed = run_sharded(shard_settings(tmp_path), START_URLS, crawl=fake_crawl)
+    assert failed == {}
+    assert list(results) == ["virtual", "au", "nz"]
+    for shard, (items, stats) in results.items():
+        assert items[0]["registration_url"].endswith(f"/e/{shard}")
+        assert stats["pool_size"] == 2  # a third of the single-process pool
+    assert attempts(tmp_path) == {"virtual": 1, "au": 1, "nz": 1}
+
+
+def test_failed_shard_is_rerun_alone(tmp_path):
+    results, failed = run_sharded(shard_settings(tmp_path, TEST_FLAKY_SHARDS=["au"]), START_URLS, crawl=fake_crawl)
+    assert failed == {}
+    assert list(results) == ["virtual", "au", "nz"]
+    assert attempts(tmp_path) == {"virtual": 1, "au": 2, "nz": 1}
+
+
+def test_partial_run(tmp_path):
+    output = tmp_path / "events_output.jsonl"
+    settings = shard_settings(tmp_path, TEST_FAILING_SHARDS=["nz"], SHARD_MAX_ATTEMPTS=2,
+                              EVENTS_JSONL_PATH=str(output))
+    events, stats = _run_sharded_crawl(settings, crawl=fake_crawl)
+    assert attempts(tmp_path) == {"virtual": 1, "au": 1, "nz": 2}
+    assert stats["finish_reason"] == "shards failed: nz"
+    # The shards that succeeded are merged and kept for inspection
+    assert [json.loads(line) for line in output.read_text().splitlines()] == events
+    assert [item["registration_url"].rsplit("/", 1)[1] for item in events] == ["virtual", "shared", "au"]
+
+
+def test_partial_run_writes_no_workbook(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["run_scraper.py", "--sharded"])
+    monkeypatch.setattr(run_scraper, "_run_sharded_crawl",
+                        lambda settings: ([event("au", "Online")], {"finish_reason": "shards failed: nz"}))
+    with pytest.raises(SystemExit) as exit_info:
+        run_scraper.main()
+    assert exit_info.value.code == 1
+    assert not list(tmp_path.glob("aws_events_*.xlsx"))
+    assert not (tmp_path / "event_store").exists()
@@ -0,0 +1,80 @@
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from EventScraper.spiders.events import EventSpider
+
+
+def make_spider():
+    crawler = get_crawler(EventSpider, {"EVENT_CACHE_ENABLED": False, "CRAWL_CHECKPOINT_ENABLED": False})
+    spider = EventSpider.from_crawler(crawler)
+    spider.mode = "render"
+    return spider
+
+
+def card(slug, *lines):
+    title = f"Event {slug}"
+    return {"url": f"https://aws-experience.com/apj/smb/e/{slug}", "title": title, "lines": [title, *lines]}
+
+
+def test_tag_line_card_is_rendered_not_dropped():
+    spider = make_spider()
+    output = list(spider._parse_cards([
+        card("tagged", "Immersion Day - Hands on", "Tuesday 24th February 2026", "12:00 - 16:00 GMT+13"),
+    ]))
+    assert [request.url for request in output] == ["https://aws-experience.com/apj/smb/e/tagged"]
+    assert isinstance(output[0], scrapy.Request)
+    assert output[0].meta["render"] == "event"
+    assert spider.crawler.stats.get_value("region/renders_saved") is None
+
+
+def test_tag_line_card_with_location_is_kept():
+    spider = make_spider()
+    output = list(spider._parse_cards([
+        card("nz", "Immersion Day - Hands on", "Tuesday 24th February 2026", "12:00 - 16:00 GMT+13",
+             "New Zealand - Auckland"),
+    ]))
+    assert len(output) == 1
+    assert output[0]["location"] == "New Zealand - Auckland"
+
+
+def test_out_of_region_card_is_dropped_before_rendering():
+    spider = make_spider()
+    output = list(spider._parse_cards([card("sg", "Tuesday 24th February 2026", "Singapore - 23 Church St")]))
+    assert output == []
+    assert spider.crawler.stats.get_value("region/renders_saved") == 1
+
+
+def test_virtual_card_is_kept():
+    spider = make_spider()
+    output = list(spider._parse_cards([card("virtual", "Tuesday 24th February 2026", "Virtual")]))
+    assert [request.url for request in output] == ["https://aws-experience.com/apj/smb/e/virtual"]
+    assert spider.crawler.stats.get_value("region/renders_saved") is None
+
+
+def http_response(url, body):
+    return HtmlResponse(url=url, body=body, encoding="utf-8", request=scrapy.Request(url))
+
+
+def test_http_mode_renders_pages_without_embedded_data():
+    spider = make_spider()
+    spider.mode = "http"
+    listing = http_response("https://aws-experience.com/apj/smb/events?location=NZ", "<html><body></body></html>")
+    event = http_response("https://aws-experience.com/apj/smb/e/abc123", "<html><body><p>Loading</p></body></html>")
+
+    (listing_request,) = spider.parse(listing)
+    (event_request,) = spider.parse_event(event)
+    assert (listing_request.url, listing_request.meta["render"]) == (listing.url, "listing")
+    assert (event_request.url, event_request.meta["render"]) == (event.url, "event")
+    assert spider.crawler.stats.get_value("fast_path/listing_fallbacks") == 1
+    assert spider.crawler.stats.get_value("fast_path/event_fallbacks") == 1
+
+
+def test_http_mode_reads_ld_json():
+    spider = make_spider()
+    spider.mode = "http"
+    body = ('<script type="application/ld+json">{"@type": "Event", "name": "Builders Day",'
+            ' "startDate": "2026-02-24T12:00:00+13:00", "location": {"@type": "VirtualLocation"}}</script>')
+    (item,) = spider.parse_event(http_response("https://aws-experience.com/apj/smb/e/abc123", body))
+    assert (item["event_name"], item["location"]) == ("Builders Day", "Online")
+    assert spider.crawler.stats.get_value("fast_path/event_hits") == 1